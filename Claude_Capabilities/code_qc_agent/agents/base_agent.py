@@ -1,47 +1,122 @@
-"""Base agent — shared Anthropic client, config, and structured-output helper."""
+"""Base agent — access to the shared runtime and the structured-output helper."""
 
-import os
-from pathlib import Path
-from typing import Type, TypeVar
+import json
+import math
+import time
+from typing import Callable, Type, TypeVar
 
 import anthropic
-import yaml
-from dotenv import load_dotenv
-from pydantic import BaseModel
+from pydantic import BaseModel, ValidationError
+
+from agents.runtime import Runtime
+from utils import deferred, metrics
+from utils.deferred import ResultsPending
+from utils.json_stream import FindingsScanner
+from utils.metrics import CallStats
+from utils.models import INCOMPLETE_TITLE, QCFinding
+from utils.payload import estimate_tokens
+from utils.response_cache import ResponseCache
+from utils.routing import ModelRoute, routing_for
 
 T = TypeVar("T", bound=BaseModel)
 
+# The API accepts at most four cache_control breakpoints per request
+_MAX_CACHE_BREAKPOINTS = 4
 
-class BaseAgent:
-    """Provides a shared Anthropic client and a structured-output call helper."""
 
-    def __init__(self) -> None:
-        # Load .env from the project root (parent of agents/)
-        project_root = Path(__file__).parent.parent
-        load_dotenv(project_root / ".env")
+class StructuredOutputError(RuntimeError):
+    """The model's response did not yield the requested structured output."""
+
 
-        # Load settings
-        config_path = project_root / "config" / "settings.yaml"
-        with open(config_path) as f:
-            config = yaml.safe_load(f)
+def structured_output_input(message) -> dict | None:
+    """Return the input of the ``structured_output`` tool call in a message, if any."""
+    for block in message.content:
+        if (
+            hasattr(block, "type")
+            and block.type == "tool_use"
+            and block.name == "structured_output"
+        ):
+            return block.input
+    return None
+
+
+class BaseAgent:
+    """Provides the shared Anthropic client and a structured-output call helper."""
 
-        # Always use claude-opus-4-6 regardless of settings.yaml value
-        self.model: str = "claude-opus-4-6"
-        self.max_tokens: int = config["model"]["max_tokens"]
+    def __init__(self, runtime: Runtime | None = None) -> None:
+        # Config, client and cache come from the shared runtime — nothing is
+        # re-read or re-connected per agent.
+        self.runtime = runtime if runtime is not None else Runtime.default()
+        config = self.runtime.config
 
-        self.client = anthropic.Anthropic(api_key=os.environ.get("ANTHROPIC_API_KEY"))
+        # Model, thinking and max_tokens per agent (``model:`` + ``agents:`` settings)
+        self.routing = routing_for(config, type(self).__name__)
+        self.model: str = self.routing.route.model
+        self.max_tokens: int = self.routing.route.max_tokens
+
+        self.client = self.runtime.client
+        self.cache: ResponseCache = self.runtime.cache
 
     # ------------------------------------------------------------------
     # Content-block helper
     # ------------------------------------------------------------------
 
-    def _make_content_block(self, text: str) -> dict:
-        """Wrap text in an API content block, adding prompt-cache hint if large."""
+    def _make_content_block(self, text: str, cacheable: bool = True) -> dict:
+        """Wrap text in an API content block, adding prompt-cache hint if large.
+
+        Only stable material (raw code, the SOT, ``ParsedDoc``/``ParsedCode``)
+        should be ``cacheable``; put it first so later calls share the prefix.
+        """
         block: dict = {"type": "text", "text": text}
-        if len(text) > 1000:
+        if cacheable and len(text) > 1000:
             block["cache_control"] = {"type": "ephemeral"}
         return block
 
+    @staticmethod
+    def _cap_cache_breakpoints(system: list[dict], messages: list[dict]) -> list[dict]:
+        """Drop cache_control markers beyond the API limit, keeping the earliest."""
+        budget = _MAX_CACHE_BREAKPOINTS
+        capped = []
+        for block in system:
+            budget -= "cache_control" in block
+        for message in messages:
+            content = message["content"]
+            if isinstance(content, list):
+                blocks = []
+                for block in content:
+                    if "cache_control" in block:
+                        if budget <= 0:
+                            block = {k: v for k, v in block.items() if k != "cache_control"}
+                        budget -= 1
+                    blocks.append(block)
+                message = {**message, "content": blocks}
+            capped.append(message)
+        return capped
+
+    # ------------------------------------------------------------------
+    # Pre-flight token count
+    # ------------------------------------------------------------------
+
+    def _count_input_tokens(self, params: dict) -> int:
+        """Count a request's input tokens per ``payload.token_counting``.
+
+        ``estimate`` (default) is offline and instant; ``api`` asks the
+        count_tokens endpoint and falls back to the estimate on any error.
+        """
+        mode = self.runtime.config.get("payload", {}).get("token_counting", "estimate")
+        if mode == "api":
+            try:
+                return self.client.messages.count_tokens(
+                    model=params["model"],
+                    system=params["system"],
+                    messages=params["messages"],
+                    tools=params["tools"],
+                ).input_tokens
+            except Exception:
+                pass
+        text = json.dumps([params["system"], params["messages"], params["tools"]], ensure_ascii=False)
+        return estimate_tokens(text)
+
     # ------------------------------------------------------------------
     # Structured-output call
     # ------------------------------------------------------------------
@@ -51,19 +126,80 @@ class BaseAgent:
         messages: list[dict],
         system: str,
         output_model: Type[T],
+        on_finding: Callable[[QCFinding], None] | None = None,
     ) -> T:
         """Call Claude and return a validated Pydantic instance.
 
-        Uses tool_use to guarantee structured JSON output from the model.
-        Extended thinking (adaptive) is enabled on every call.
+        Uses tool_use to guarantee structured JSON output from the model, with
+        this agent's model, thinking mode and max_tokens (``self.routing``).
+        With a ``fast`` route configured, that route is tried first and the
+        call escalates to the full route when the fast answer fails validation
+        or is WARNING-heavy; findings of a fast answer are passed to
+        ``on_finding`` only once it is accepted.
+        """
+        routing = self.routing
+        if routing.fast is None:
+            return self._call_route(routing.route, messages, system, output_model, on_finding)
+
+        held: list[QCFinding] = []
+        try:
+            result = self._call_route(
+                routing.fast, messages, system, output_model, held.append if on_finding else None
+            )
+        except (ValidationError, StructuredOutputError) as exc:
+            reason = f"fast answer failed validation ({type(exc).__name__})"
+        else:
+            if not routing.low_confidence(result):
+                for finding in held:
+                    on_finding(finding)
+                return result
+            reason = "fast answer mostly WARNING findings"
+
+        run = metrics.current()
+        if run is not None:
+            run.record_escalation(type(self).__name__, reason)
+        return self._call_route(routing.route, messages, system, output_model, on_finding)
+
+    def _call_route(
+        self,
+        route: ModelRoute,
+        messages: list[dict],
+        system: str,
+        output_model: Type[T],
+        on_finding: Callable[[QCFinding], None] | None = None,
+    ) -> T:
+        """Make one structured-output call on ``route``.
+
+        Validated results are served from / stored in the response cache.
+        Calls go through the runtime's scheduler, which paces and retries them.
+
+        The response is streamed.  For outputs with a ``findings`` list, each
+        finding is passed to ``on_finding`` as soon as its JSON is complete.
+        If the ``streaming:`` time or output-token budget runs out, or the
+        connection drops mid-response, the findings received so far are
+        returned (plus a WARNING noting the cut) and nothing is cached.
+
+        Inside ``utils.deferred.collecting`` a cache miss is recorded instead
+        of sent, and ``ResultsPending`` is raised (bulk mode).
         """
         schema = output_model.model_json_schema()
 
-        response = self.client.messages.create(
-            model=self.model,
-            system=system,
-            messages=messages,
-            thinking={"type": "adaptive"},
+        cache_key = ResponseCache.make_key(route.cache_id, system, messages, schema)
+        run = metrics.current()
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            if run is not None:
+                run.record_cache_hit(type(self).__name__)
+            return output_model.model_validate_json(cached)
+
+        # The breakpoint on the system block caches tools + system, which
+        # every call of this agent shares; content blocks marked cacheable
+        # extend that prefix over the raw code / spec.
+        system_blocks = [{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}]
+        params = dict(
+            **route.request_params(),
+            system=system_blocks,
+            messages=self._cap_cache_breakpoints(system_blocks, messages),
             tools=[
                 {
                     "name": "structured_output",
@@ -75,18 +211,132 @@ class BaseAgent:
                 }
             ],
             tool_choice={"type": "tool", "name": "structured_output"},
-            max_tokens=self.max_tokens,
         )
+        collector = deferred.current()
+        if collector is not None:
+            collector.add(cache_key, params)
+            raise ResultsPending(f"{type(self).__name__}: {output_model.__name__} not yet available")
 
-        for block in response.content:
-            if (
-                hasattr(block, "type")
-                and block.type == "tool_use"
-                and block.name == "structured_output"
-            ):
-                return output_model.model_validate(block.input)
+        stats = CallStats(
+            stage=type(self).__name__,
+            model=route.model,
+            preflight_input_tokens=self._count_input_tokens(params),
+        )
+        start = time.perf_counter()
+        response, findings = self.runtime.scheduler.call(
+            lambda: self._consume_stream(params, output_model, on_finding, stats),
+            input_tokens=stats.preflight_input_tokens,
+            on_retry=lambda attempt, delay, exc: setattr(stats, "retries", attempt),
+        )
+        stats.total_s = time.perf_counter() - start
+        if run is not None:
+            run.record_call(stats)
+
+        if response is None:
+            if "findings" not in output_model.model_fields:
+                raise StructuredOutputError(
+                    f"Model call stopped early ({stats.aborted}) and {output_model.__name__} "
+                    f"cannot be returned partially (model={route.model})"
+                )
+            findings.append(
+                QCFinding(
+                    title=INCOMPLETE_TITLE,
+                    status="WARNING",
+                    detail=(
+                        f"The model call was stopped after {stats.total_s:.0f}s ({stats.aborted}). "
+                        f"Only the {stats.findings_streamed} finding(s) received before the stop "
+                        "are reported for this check."
+                    ),
+                    recommendation="Re-run with a larger streaming budget to get the full assessment.",
+                    priority="Medium",
+                )
+            )
+            return output_model(findings=findings)
 
-        raise RuntimeError(
+        tool_input = structured_output_input(response)
+        if tool_input is not None:
+            result = output_model.model_validate(tool_input)
+            self.cache.put(cache_key, result.model_dump_json())
+            return result
+
+        raise StructuredOutputError(
             f"No structured_output tool call found in model response "
-            f"(model={self.model}, output_model={output_model.__name__})"
+            f"(model={route.model}, output_model={output_model.__name__})"
         )
+
+    def _consume_stream(
+        self,
+        params: dict,
+        output_model: Type[BaseModel],
+        on_finding: Callable[[QCFinding], None] | None,
+        stats: CallStats,
+    ) -> tuple[object | None, list[QCFinding]]:
+        """Stream one request into ``stats``; return (final message or None if cut short, findings).
+
+        Errors before any finding arrived propagate, so the scheduler can retry.
+        """
+        settings = self.runtime.config.get("streaming", {})
+        time_budget = settings.get("time_budget_s") or 0
+        token_budget = settings.get("output_token_budget") or 0
+
+        scanner = FindingsScanner() if "findings" in output_model.model_fields else None
+        findings: list[QCFinding] = []
+        output_chars = 0
+        thinking_chars = 0
+        stats.ttft_s = None  # timed per attempt
+        start = time.perf_counter()
+
+        try:
+            with self.client.messages.stream(**params) as stream:
+                for event in stream:
+                    if event.type != "content_block_delta":
+                        continue
+                    elapsed = time.perf_counter() - start
+                    if stats.ttft_s is None:
+                        stats.ttft_s = elapsed
+
+                    delta = event.delta
+                    if delta.type == "input_json_delta":
+                        output_chars += len(delta.partial_json)
+                        for item in scanner.feed(delta.partial_json) if scanner else []:
+                            try:
+                                finding = QCFinding.model_validate(item)
+                            except ValidationError:
+                                continue
+                            findings.append(finding)
+                            if stats.first_finding_s is None:
+                                stats.first_finding_s = elapsed
+                            if on_finding is not None:
+                                on_finding(finding)
+                    elif delta.type == "thinking_delta":
+                        output_chars += len(delta.thinking)
+                        thinking_chars += len(delta.thinking)
+                    elif delta.type == "text_delta":
+                        output_chars += len(delta.text)
+
+                    # Output tokens are estimated at ~4 characters each, as in estimate_tokens
+                    if time_budget and elapsed > time_budget:
+                        stats.aborted = f"time budget of {time_budget}s exceeded"
+                    elif token_budget and output_chars / 4 > token_budget:
+                        stats.aborted = f"output budget of {token_budget} tokens exceeded"
+                    if stats.aborted:
+                        break
+                response = None if stats.aborted else stream.get_final_message()
+                if response is not None:
+                    usage = response.usage
+                    stats.input_tokens = usage.input_tokens or 0
+                    stats.output_tokens = usage.output_tokens or 0
+                    stats.cache_read_tokens = getattr(usage, "cache_read_input_tokens", 0) or 0
+                    stats.cache_creation_tokens = (
+                        getattr(usage, "cache_creation_input_tokens", 0) or 0
+                    )
+        except anthropic.APIError as exc:
+            # A dropped or timed-out stream keeps the findings it already delivered.
+            if not findings:
+                raise
+            stats.aborted = f"stream interrupted: {type(exc).__name__}"
+            response = None
+
+        stats.findings_streamed = len(findings)
+        stats.thinking_tokens = math.ceil(thinking_chars / 4)  # same ratio as estimate_tokens
+        return response, findings
@@ -0,0 +1,176 @@
+"""Batch runner — QC many spec/code pairs on a bounded pool of pipelines."""
+
+import csv
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+
+from agents.orchestrator import Orchestrator, SharedSpec
+from agents.runtime import Runtime
+
+_IGNORED_FILES = {".gitkeep", ".DS_Store", "Thumbs.db"}
+
+
+@dataclass
+class QCPair:
+    sot_path: str
+    code_path: str
+
+
+@dataclass
+class BatchResult:
+    pair: QCPair
+    report_path: str = ""
+    error: str = ""
+    seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return not self.error
+
+
+# ---------------------------------------------------------------------------
+# Pair discovery
+# ---------------------------------------------------------------------------
+
+def _list_files(directory: str) -> list[Path]:
+    d = Path(directory)
+    if not d.exists():
+        return []
+    return [f for f in sorted(d.iterdir()) if f.is_file() and f.name not in _IGNORED_FILES]
+
+
+def pairs_from_directories(sot_dir: str, code_dir: str, verbose: bool = True) -> list[QCPair]:
+    """Pair spec and code files from two directories.
+
+    A single spec in ``sot_dir`` is paired with every code file.  Otherwise
+    files are paired on their case-insensitive stem (``ADSL.xlsx`` ↔
+    ``adsl.sas``); code files without a matching spec are skipped, with a
+    message when ``verbose``.
+    """
+    sot_files = _list_files(sot_dir)
+    code_files = _list_files(code_dir)
+
+    if len(sot_files) == 1:
+        return [QCPair(str(sot_files[0]), str(c)) for c in code_files]
+
+    by_stem = {f.stem.lower(): f for f in sot_files}
+    pairs: list[QCPair] = []
+    for code_file in code_files:
+        sot_file = by_stem.get(code_file.stem.lower())
+        if sot_file is None:
+            if verbose:
+                print(f"  • Skipping {code_file.name}: no matching spec in {sot_dir}")
+            continue
+        pairs.append(QCPair(str(sot_file), str(code_file)))
+    return pairs
+
+
+def pairs_from_manifest(manifest_path: str) -> list[QCPair]:
+    """Read spec/code pairs from a CSV manifest with ``sot`` and ``code`` columns.
+
+    Relative paths are resolved against the manifest's directory.
+    """
+    base = Path(manifest_path).parent
+    pairs: list[QCPair] = []
+    with open(manifest_path, newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            sot = (row.get("sot") or "").strip()
+            code = (row.get("code") or "").strip()
+            if not sot or not code:
+                continue
+            pairs.append(QCPair(str(base / sot), str(base / code)))
+    return pairs
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+
+class BatchRunner:
+    """Fans spec/code pairs out to ``workers`` concurrent pipelines.
+
+    A failing pair is recorded in its ``BatchResult`` and never aborts the
+    rest of the batch.  All pipelines share one runtime, so connections and
+    agents are reused across pairs.  A spec paired with several programs is
+    read and parsed once (``Orchestrator.load_spec``) and shared by them.
+    """
+
+    def __init__(
+        self,
+        workers: int = 4,
+        output_dir: str = "outputs/reports",
+        incremental: bool = False,
+        runtime: Runtime | None = None,
+    ) -> None:
+        self.workers = max(1, workers)
+        self.output_dir = output_dir
+        self.incremental = incremental
+        self.runtime = runtime if runtime is not None else Runtime.default()
+        self._specs: dict[str, SharedSpec | Exception] = {}
+        self._spec_locks: dict[str, threading.Lock] = {}
+
+    def run(self, pairs: list[QCPair]) -> list[BatchResult]:
+        """Run every pair and return results in the input order."""
+        uses = Counter(pair.sot_path for pair in pairs)
+        self._spec_locks = {sot: threading.Lock() for sot, n in uses.items() if n > 1}
+        results: list[BatchResult | None] = [None] * len(pairs)
+        total = len(pairs)
+        done = 0
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="qc-batch") as pool:
+            futures = {pool.submit(self._run_one, pair): i for i, pair in enumerate(pairs)}
+            for future in as_completed(futures):
+                result = future.result()
+                results[futures[future]] = result
+                done += 1
+                name = Path(result.pair.code_path).name
+                if result.ok:
+                    print(f"[{done}/{total}] OK   {name} ({result.seconds:.1f}s) → {result.report_path}")
+                else:
+                    print(f"[{done}/{total}] FAIL {name} ({result.seconds:.1f}s): {result.error}")
+
+        return [r for r in results if r is not None]
+
+    def _run_one(self, pair: QCPair) -> BatchResult:
+        start = time.perf_counter()
+        try:
+            orchestrator = Orchestrator(
+                verbose=False, incremental=self.incremental, runtime=self.runtime
+            )
+            report_path = orchestrator.run(
+                pair.sot_path,
+                pair.code_path,
+                output_dir=self.output_dir,
+                spec=self._shared_spec(orchestrator, pair.sot_path),
+            )
+        except Exception as exc:  # one bad pair must not abort the batch
+            return BatchResult(
+                pair=pair,
+                error=f"{type(exc).__name__}: {exc}",
+                seconds=time.perf_counter() - start,
+            )
+        return BatchResult(pair=pair, report_path=report_path, seconds=time.perf_counter() - start)
+
+    def _shared_spec(self, orchestrator: Orchestrator, sot_path: str) -> SharedSpec | None:
+        """Parse a spec used by several pairs once; None for a spec used by one pair.
+
+        A spec that fails to load fails every pair that uses it, with the same
+        error, without being read or parsed again.
+        """
+        lock = self._spec_locks.get(sot_path)
+        if lock is None:
+            return None
+        with lock:  # the first pair parses, the others wait for its result
+            if sot_path not in self._specs:
+                try:
+                    self._specs[sot_path] = orchestrator.load_spec(sot_path)
+                except Exception as exc:
+                    self._specs[sot_path] = exc
+            spec = self._specs[sot_path]
+        if isinstance(spec, Exception):
+            raise spec
+        return spec
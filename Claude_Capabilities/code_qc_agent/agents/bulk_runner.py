@@ -0,0 +1,229 @@
+"""Bulk runner — QC many spec/code pairs through the Message Batches API.
+
+Bulk mode trades latency for throughput and the lower per-call price of
+message batches.  It works in rounds:
+
+1. Every unfinished pair is run through the normal pipeline with model calls
+   deferred (``utils.deferred``): each call whose result is not stored yet is
+   collected instead of sent.
+2. All collected requests are submitted as message batches, keyed by their
+   response-cache key, and polled until they end.
+3. Each result is stored in the job's results database under that key, so
+   the next round's pipeline finds it as a cache hit and gets one stage
+   further — parsing first, then Logic / Structure QC.
+
+A pair whose pipeline completes from stored results alone writes its report.
+The job state (pairs, submitted batches, failures) is saved to
+``<job dir>/job.json`` after every change, so an interrupted run continues
+with ``python main.py --bulk --resume <job dir>`` without resubmitting.
+"""
+
+import json
+import time
+from datetime import datetime
+from pathlib import Path
+
+from pydantic import BaseModel
+
+from agents.base_agent import structured_output_input
+from agents.batch_runner import BatchResult, QCPair
+from agents.orchestrator import Orchestrator
+from agents.runtime import Runtime
+from utils import deferred
+from utils.deferred import RequestCollector, ResultsPending
+from utils.response_cache import ResponseCache
+
+
+class BulkPair(BaseModel):
+    sot_path: str
+    code_path: str
+    report_path: str = ""
+    error: str = ""
+
+    @property
+    def done(self) -> bool:
+        return bool(self.report_path or self.error)
+
+
+class BatchRecord(BaseModel):
+    id: str
+    round: int
+    requests: int
+    collected: bool = False
+
+
+class BulkJob(BaseModel):
+    """Persisted state of one bulk run."""
+
+    created_at: str
+    pairs: list[BulkPair]
+    batches: list[BatchRecord] = []
+    failed_requests: dict[str, str] = {}  # cache key → why the batch request failed
+    round: int = 0
+
+
+class BulkRunner:
+    """Runs a bulk job to completion, resuming from its saved state."""
+
+    def __init__(
+        self,
+        job_dir: str | Path,
+        output_dir: str = "outputs/reports",
+        runtime: Runtime | None = None,
+    ) -> None:
+        base = runtime if runtime is not None else Runtime.default()
+        settings = base.config.get("bulk", {})
+        self.job_dir = Path(job_dir)
+        self.output_dir = output_dir
+        self.poll_interval_s: float = settings.get("poll_interval_s", 60)
+        self.max_requests_per_batch: int = settings.get("max_requests_per_batch", 10000)
+
+        # Batch results live in a job-local store that --no-cache cannot switch
+        # off and that never expires mid-job; the agents read it as their cache.
+        store = ResponseCache(
+            self.job_dir / "results.sqlite",
+            max_size_mb=1024 * 1024,
+            max_age_days=365,
+            bypassable=False,
+        )
+        self.runtime = Runtime(
+            config=base.config, client=base.client, project_root=base.project_root, cache=store
+        )
+        state = (self.job_dir / "job.json").read_text(encoding="utf-8")
+        self.job = BulkJob.model_validate_json(state)
+
+    # ------------------------------------------------------------------
+    # Job creation
+    # ------------------------------------------------------------------
+
+    @classmethod
+    def create(
+        cls,
+        pairs: list[QCPair],
+        job_root: str | Path | None = None,
+        output_dir: str = "outputs/reports",
+        runtime: Runtime | None = None,
+    ) -> "BulkRunner":
+        """Create a new job directory for ``pairs`` and return its runner."""
+        runtime = runtime if runtime is not None else Runtime.default()
+        if job_root is None:
+            settings = runtime.config.get("bulk", {})
+            job_root = runtime.project_root / settings.get("job_dir", "outputs/bulk")
+        job_dir = Path(job_root) / f"job_{datetime.now().strftime('%Y%m%d_%H%M%S')}"
+        job_dir.mkdir(parents=True, exist_ok=False)
+
+        job = BulkJob(
+            created_at=datetime.now().isoformat(timespec="seconds"),
+            pairs=[BulkPair(sot_path=p.sot_path, code_path=p.code_path) for p in pairs],
+        )
+        (job_dir / "job.json").write_text(job.model_dump_json(indent=2), encoding="utf-8")
+        return cls(job_dir, output_dir=output_dir, runtime=runtime)
+
+    # ------------------------------------------------------------------
+    # Run
+    # ------------------------------------------------------------------
+
+    def run(self) -> list[BatchResult]:
+        """Drive the job until every pair has a report or an error."""
+        self._collect()  # batches submitted before a restart
+        while True:
+            pending = self._plan_round()
+            if not pending:
+                break
+            self.job.round += 1
+            self._submit(pending)
+            self._collect()
+
+        return [
+            BatchResult(
+                pair=QCPair(p.sot_path, p.code_path), report_path=p.report_path, error=p.error
+            )
+            for p in self.job.pairs
+        ]
+
+    def _plan_round(self) -> dict[str, dict]:
+        """Run every unfinished pair; return the requests still needed (cache key → params)."""
+        pending: dict[str, dict] = {}
+        for pair in self.job.pairs:
+            if pair.done:
+                continue
+            collector = RequestCollector()
+            try:
+                with deferred.collecting(collector):
+                    pair.report_path = Orchestrator(verbose=False, runtime=self.runtime).run(
+                        pair.sot_path, pair.code_path, self.output_dir
+                    )
+                print(f"  ✓ {Path(pair.code_path).name} → {pair.report_path}")
+            except ResultsPending:
+                failed = [key for key in collector.requests if key in self.job.failed_requests]
+                if failed:
+                    pair.error = self.job.failed_requests[failed[0]]
+                    print(f"  ✗ {Path(pair.code_path).name}: {pair.error}")
+                else:
+                    pending.update(collector.requests)
+            except Exception as exc:  # one broken pair must not stop the job
+                pair.error = f"{type(exc).__name__}: {exc}"
+                print(f"  ✗ {Path(pair.code_path).name}: {pair.error}")
+        self._save()
+        return pending
+
+    def _submit(self, pending: dict[str, dict]) -> None:
+        items = list(pending.items())
+        for i in range(0, len(items), self.max_requests_per_batch):
+            chunk = items[i:i + self.max_requests_per_batch]
+            requests = [{"custom_id": key, "params": params} for key, params in chunk]
+            batch = self.runtime.scheduler.call(
+                lambda: self.runtime.client.messages.batches.create(requests=requests)
+            )
+            self.job.batches.append(
+                BatchRecord(id=batch.id, round=self.job.round, requests=len(chunk))
+            )
+            self._save()
+            print(f"[round {self.job.round}] Submitted {batch.id} with {len(chunk)} request(s).")
+
+    def _collect(self) -> None:
+        """Wait for every uncollected batch to end and store its results."""
+        batches = self.runtime.client.messages.batches
+        scheduler = self.runtime.scheduler
+        for record in self.job.batches:
+            if record.collected:
+                continue
+            status = scheduler.call(lambda: batches.retrieve(record.id))
+            while status.processing_status != "ended":
+                counts = status.request_counts
+                print(
+                    f"[round {record.round}] {record.id}: {counts.processing} processing, "
+                    f"{counts.succeeded} succeeded — next check in {self.poll_interval_s:g}s"
+                )
+                time.sleep(self.poll_interval_s)
+                status = scheduler.call(lambda: batches.retrieve(record.id))
+
+            for entry in scheduler.call(lambda: list(batches.results(record.id))):
+                result = entry.result
+                tool_input = None
+                if result.type == "succeeded":
+                    tool_input = structured_output_input(result.message)
+                if tool_input is not None:
+                    # Validated against the output model when the pipeline reads it back
+                    self.runtime.cache.put(entry.custom_id, json.dumps(tool_input))
+                else:
+                    self.job.failed_requests[entry.custom_id] = _failure_reason(result)
+            record.collected = True
+            self._save()
+            print(f"[round {record.round}] Collected {record.id}.")
+
+    def _save(self) -> None:
+        path = self.job_dir / "job.json"
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(self.job.model_dump_json(indent=2), encoding="utf-8")
+        tmp.replace(path)
+
+
+def _failure_reason(result) -> str:
+    """Describe a batch result that produced no structured output."""
+    if result.type == "succeeded":
+        return "batch response had no structured_output tool call"
+    if result.type == "errored":
+        error = getattr(getattr(result, "error", None), "error", None)
+        return f"batch request errored: {getattr(error, 'message', '') or 'unknown error'}"
+    return f"batch request {result.type}"
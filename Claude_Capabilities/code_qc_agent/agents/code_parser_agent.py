@@ -1,13 +1,53 @@
 """Agent that parses source code into a structured summary."""
 
+from concurrent.futures import ThreadPoolExecutor
+
 from agents.base_agent import BaseAgent
+from utils.code_chunking import merge_parsed_code, split_code
+from utils.line_ranges import shift_line_range
+from utils.metrics import submit_in_context
 from utils.models import ParsedCode
 
 
 class CodeParserAgent(BaseAgent):
 
-    def parse(self, code: str, language: str) -> ParsedCode:
-        """Analyse code and return a structured ParsedCode."""
+    def parse(self, code: str, language: str, line_offset: int = 0) -> ParsedCode:
+        """Analyse code and return a structured ParsedCode.
+
+        ``line_offset`` is the number of lines preceding ``code`` in its file
+        when only an excerpt is parsed; section line ranges are shifted by it
+        so they refer to the whole file.
+
+        Programs longer than ``code_parser.chunk_lines`` are split on step /
+        macro / function boundaries, the chunks are parsed concurrently and
+        the partial results merged (map-reduce).
+        """
+        settings = self.runtime.config.get("code_parser", {})
+        chunk_lines = settings.get("chunk_lines", 0)
+        chunks = split_code(code, language, chunk_lines) if chunk_lines else []
+        if len(chunks) <= 1:
+            return self._parse_chunk(code, language, line_offset)
+
+        workers = min(settings.get("max_workers", 4), len(chunks))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="code-chunk") as pool:
+            futures = [
+                submit_in_context(
+                    pool,
+                    self._parse_chunk,
+                    chunk.text,
+                    language,
+                    line_offset + chunk.line_offset,
+                    i + 1,
+                    len(chunks),
+                )
+                for i, chunk in enumerate(chunks)
+            ]
+            parts = [f.result() for f in futures]
+        return merge_parsed_code(parts, language)
+
+    def _parse_chunk(
+        self, code: str, language: str, line_offset: int = 0, part: int = 1, total: int = 1
+    ) -> ParsedCode:
         system = (
             f"You are an expert code analyst specialising in {language.upper()} programs "
             "used for statistical analysis, data processing, or reporting.\n\n"
@@ -15,7 +55,7 @@ class CodeParserAgent(BaseAgent):
             "- A plain-language summary of what the code does overall.\n"
             "- A list of logical sections (e.g. data import, filtering, derivation, output), "
             "each with a name, description, representative code snippet, and approximate "
-            "line range.\n"
+            "line range (line numbers counted from 1 at the first line shown).\n"
             "- All variable names referenced or created.\n"
             "- All data transformations performed (merges, derives, recodes, formats).\n"
             "- All filter or subsetting operations applied.\n"
@@ -23,6 +63,13 @@ class CodeParserAgent(BaseAgent):
             "that should probably be parameters.\n\n"
             "Be specific and complete — this output will be used for automated QC."
         )
+        instruction = "Please analyse the code above and return the complete structured breakdown."
+        if total > 1:
+            instruction = (
+                f"The code above is part {part} of {total} of a larger program. "
+                "Analyse this part only and return its complete structured breakdown; "
+                "summarise what this part does."
+            )
 
         content_block = self._make_content_block(code)
         messages = [
@@ -30,14 +77,12 @@ class CodeParserAgent(BaseAgent):
                 "role": "user",
                 "content": [
                     content_block,
-                    {
-                        "type": "text",
-                        "text": (
-                            "Please analyse the code above and return the complete "
-                            "structured breakdown."
-                        ),
-                    },
+                    {"type": "text", "text": instruction},
                 ],
             }
         ]
-        return self._stream_parse(messages, system, ParsedCode)
+        parsed = self._stream_parse(messages, system, ParsedCode)
+        if line_offset:
+            for section in parsed.sections:
+                section.line_range = shift_line_range(section.line_range, line_offset)
+        return parsed
@@ -0,0 +1,406 @@
+"""Daemon — a warm, long-running QC service fed by directory watching and a local HTTP API.
+
+One process keeps the runtime (config, pooled client, response cache, agents)
+and the heavy reader imports loaded, so each job costs only its model calls:
+
+    watcher ──► job queue ──► worker pool (one Orchestrator run per job) ──► reports
+    HTTP API ──┘
+
+The watcher polls ``inputs/source_of_truth/`` and ``inputs/code/`` and pairs
+files as ``--batch`` does.  A pair is queued once both files are unchanged
+for one poll (so half-copied files are not picked up) and differ from the
+version last QC'd; the versions QC'd successfully are kept in
+``daemon.state_file`` so a restart does not redo them.  A spec shared by
+several programs is parsed once per version and reused.
+
+HTTP endpoints (``daemon.host`` / ``daemon.port``, local only by default):
+
+    GET  /status      queue depth, running jobs, counts and stage latencies
+    GET  /jobs        recent jobs, newest first
+    GET  /jobs/<id>   one job
+    POST /jobs        {"sot": "...", "code": "..."} — queue a pair; 202 with the job
+"""
+
+import importlib
+import itertools
+import json
+import queue
+import statistics
+import threading
+import time
+from collections import deque
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from agents.batch_runner import QCPair, pairs_from_directories
+from agents.code_parser_agent import CodeParserAgent
+from agents.doc_parser_agent import DocParserAgent
+from agents.logic_qc_agent import LogicQCAgent
+from agents.orchestrator import Orchestrator, SharedSpec
+from agents.runtime import Runtime
+from agents.structure_qc_agent import StructureQCAgent
+from utils.checkpoints import file_hash
+from utils.metrics import RunMetrics
+
+# Imported lazily by the readers and writers; loaded up front so no job pays for them
+_WARM_MODULES = ("openpyxl", "docx", "pdfplumber")
+
+_STOP = object()
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def _fingerprint(pair: QCPair) -> tuple:
+    """(mtime_ns, size) of both files — changes whenever either file is rewritten."""
+    sot, code = Path(pair.sot_path).stat(), Path(pair.code_path).stat()
+    return (sot.st_mtime_ns, sot.st_size, code.st_mtime_ns, code.st_size)
+
+
+def _pair_key(pair: QCPair) -> str:
+    return f"{pair.sot_path}|{pair.code_path}"
+
+
+@dataclass
+class Job:
+    id: int
+    sot_path: str
+    code_path: str
+    source: str  # "watch" | "api"
+    status: str = "queued"  # queued | running | done | failed
+    submitted_at: str = field(default_factory=_now)
+    started_at: str = ""
+    finished_at: str = ""
+    seconds: float = 0.0
+    report_path: str = ""
+    error: str = ""
+    stages: dict[str, float] = field(default_factory=dict)
+    fingerprint: tuple = ()
+
+    def to_dict(self) -> dict:
+        record = asdict(self)
+        del record["fingerprint"]
+        return record
+
+
+class QCDaemon:
+    """Queues spec/code pairs from the watcher and the HTTP API and runs them on ``workers`` threads."""
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        output_dir: str = "outputs/reports",
+        sot_dir: str = "inputs/source_of_truth",
+        code_dir: str = "inputs/code",
+        incremental: bool = False,
+        runtime: Runtime | None = None,
+    ) -> None:
+        self.runtime = runtime if runtime is not None else Runtime.default()
+        settings = self.runtime.config.get("daemon", {})
+        self.workers = max(1, workers or settings.get("workers", 4))
+        self.output_dir = output_dir
+        self.sot_dir = sot_dir
+        self.code_dir = code_dir
+        self.incremental = incremental
+        self.watch = settings.get("watch", True)
+        self.poll_interval_s = settings.get("poll_interval_s", 2)
+        self.host = settings.get("host", "127.0.0.1")
+        self.port = settings.get("port", 8787)
+        self.state_file = Path(settings.get("state_file", "outputs/daemon/state.json"))
+
+        self._queue: queue.Queue = queue.Queue()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self._jobs: deque[Job] = deque(maxlen=settings.get("history", 200))
+        self._pending: dict[str, Job] = {}  # pair key → queued, not yet started
+        self._latencies: dict[str, deque[float]] = {}
+        self._counts = {"done": 0, "failed": 0}
+        self._done = self._load_state()  # pair key → fingerprint QC'd successfully
+        self._tried: dict[str, tuple] = dict(self._done)  # ... or attempted this session
+        self._specs: dict[str, SharedSpec] = {}
+        self._spec_locks: dict[str, threading.Lock] = {}
+        self._threads: list[threading.Thread] = []
+        self._server: ThreadingHTTPServer | None = None
+        self.started_at = time.time()
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+
+    def start(self) -> None:
+        """Warm the runtime, then start the workers, the watcher and the HTTP server."""
+        self.warm_up()
+        for i in range(self.workers):
+            self._spawn(self._work, f"qc-daemon-{i + 1}")
+        if self.watch:
+            self._spawn(self._watch, "qc-daemon-watch")
+        if self.port is not None:
+            self._server = ThreadingHTTPServer((self.host, self.port), _handler(self))
+            self.port = self._server.server_address[1]
+            self._spawn(self._server.serve_forever, "qc-daemon-http")
+
+    @property
+    def api_url(self) -> str | None:
+        return f"http://{self.host}:{self.port}" if self._server is not None else None
+
+    def wait(self) -> None:
+        """Block until interrupted (Ctrl+C), then stop cleanly."""
+        try:
+            while not self._stop.is_set():
+                self._stop.wait(1)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self.stop()
+
+    def stop(self) -> None:
+        """Stop watching and accepting jobs; running jobs finish, queued ones are dropped."""
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+        for _ in range(self.workers):
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+
+    def warm_up(self) -> None:
+        """Import the readers' libraries and build every agent before the first job."""
+        for name in _WARM_MODULES:
+            importlib.import_module(name)
+        for agent_cls in (DocParserAgent, CodeParserAgent, LogicQCAgent, StructureQCAgent):
+            self.runtime.agent(agent_cls)
+
+    def _spawn(self, target, name: str) -> None:
+        thread = threading.Thread(target=target, name=name, daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    # ------------------------------------------------------------------
+    # Jobs
+    # ------------------------------------------------------------------
+
+    def submit(self, pair: QCPair, source: str = "api") -> Job:
+        """Queue a pair; a pair already waiting in the queue is not queued twice."""
+        key = _pair_key(pair)
+        with self._lock:
+            job = self._pending.get(key)
+            if job is not None:
+                return job
+            job = Job(id=next(self._ids), sot_path=pair.sot_path, code_path=pair.code_path, source=source)
+            try:
+                job.fingerprint = _fingerprint(pair)
+            except OSError:
+                pass  # reported when the job runs
+            self._pending[key] = job
+            self._jobs.append(job)
+        self._queue.put(job)
+        self._log(f"queued #{job.id} {Path(pair.code_path).name} ({source})")
+        return job
+
+    def job(self, job_id: int) -> Job | None:
+        with self._lock:
+            return next((j for j in self._jobs if j.id == job_id), None)
+
+    def _work(self) -> None:
+        while True:
+            job = self._queue.get()
+            if job is _STOP:
+                return
+            if not self._stop.is_set():
+                self._run_job(job)
+
+    def _run_job(self, job: Job) -> None:
+        pair = QCPair(job.sot_path, job.code_path)
+        with self._lock:
+            self._pending.pop(_pair_key(pair), None)
+            job.status, job.started_at = "running", _now()
+        run_metrics = RunMetrics(sot_path=job.sot_path, code_path=job.code_path)
+        start = time.perf_counter()
+        try:
+            orchestrator = Orchestrator(verbose=False, incremental=self.incremental, runtime=self.runtime)
+            report_path = orchestrator.run(
+                job.sot_path,
+                job.code_path,
+                output_dir=self.output_dir,
+                spec=self._shared_spec(orchestrator, job.sot_path),
+                run_metrics=run_metrics,
+            )
+        except Exception as exc:  # one bad job must not stop the worker
+            self._finish(job, start, run_metrics, error=f"{type(exc).__name__}: {exc}")
+            return
+        self._finish(job, start, run_metrics, report_path=report_path)
+
+    def _finish(
+        self, job: Job, start: float, run_metrics: RunMetrics, report_path: str = "", error: str = ""
+    ) -> None:
+        key = _pair_key(QCPair(job.sot_path, job.code_path))
+        with self._lock:
+            job.seconds = round(time.perf_counter() - start, 3)
+            job.finished_at = _now()
+            job.stages = {k: round(v, 3) for k, v in run_metrics.stages.items()}
+            job.report_path, job.error = report_path, error
+            job.status = "failed" if error else "done"
+            self._counts[job.status] += 1
+            self._tried[key] = job.fingerprint
+            if not error:
+                self._done[key] = job.fingerprint
+                self._save_state()
+        for stage, seconds in [*job.stages.items(), ("total", job.seconds)]:
+            self._record_latency(stage, seconds)
+        name = Path(job.code_path).name
+        if error:
+            self._log(f"FAIL #{job.id} {name} ({job.seconds:.1f}s): {error}")
+        else:
+            self._log(f"OK   #{job.id} {name} ({job.seconds:.1f}s) → {report_path}")
+
+    def _shared_spec(self, orchestrator: Orchestrator, sot_path: str) -> SharedSpec:
+        """The parsed spec for the current version of ``sot_path``, parsed once per version."""
+        with self._lock:
+            lock = self._spec_locks.setdefault(sot_path, threading.Lock())
+        with lock:  # the first job parses, the others wait for its result
+            key = file_hash(sot_path)
+            spec = self._specs.get(sot_path)
+            if spec is None or spec.file_hash != key:
+                start = time.perf_counter()
+                spec = self._specs[sot_path] = orchestrator.load_spec(sot_path)
+                self._record_latency("load_spec", time.perf_counter() - start)
+            return spec
+
+    def _record_latency(self, stage: str, seconds: float) -> None:
+        with self._lock:
+            self._latencies.setdefault(stage, deque(maxlen=self._jobs.maxlen)).append(round(seconds, 3))
+
+    # ------------------------------------------------------------------
+    # Watcher
+    # ------------------------------------------------------------------
+
+    def _watch(self) -> None:
+        settling: dict[str, tuple] = {}
+        while not self._stop.is_set():
+            seen: dict[str, tuple] = {}
+            for pair in pairs_from_directories(self.sot_dir, self.code_dir, verbose=False):
+                key = _pair_key(pair)
+                try:
+                    seen[key] = fingerprint = _fingerprint(pair)
+                except OSError:
+                    continue  # removed between listing and stat
+                # Queue once a changed pair has been stable for one poll
+                if settling.get(key) != fingerprint:
+                    continue
+                with self._lock:  # job workers update _tried as they finish
+                    if self._tried.get(key) == fingerprint:
+                        continue
+                    self._tried[key] = fingerprint
+                self.submit(pair, source="watch")
+            settling = seen
+            self._stop.wait(self.poll_interval_s)
+
+    def _load_state(self) -> dict[str, tuple]:
+        if not self.state_file.exists():
+            return {}
+        try:
+            data = json.loads(self.state_file.read_text(encoding="utf-8"))
+        except ValueError:
+            return {}
+        return {key: tuple(fp) for key, fp in data.get("done", {}).items()}
+
+    def _save_state(self) -> None:
+        self.state_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_file.with_suffix(".tmp")
+        tmp.write_text(json.dumps({"done": self._done}, indent=2), encoding="utf-8")
+        tmp.replace(self.state_file)
+
+    # ------------------------------------------------------------------
+    # Status
+    # ------------------------------------------------------------------
+
+    def status(self) -> dict:
+        with self._lock:
+            running = [j.id for j in self._jobs if j.status == "running"]
+            latencies = {stage: list(values) for stage, values in self._latencies.items()}
+            counts = dict(self._counts)
+        return {
+            "uptime_s": round(time.time() - self.started_at, 1),
+            "workers": self.workers,
+            "queue_depth": self._queue.qsize(),
+            "running": running,
+            "completed": counts["done"],
+            "failed": counts["failed"],
+            "watching": [self.sot_dir, self.code_dir] if self.watch else [],
+            "stage_latency_s": {stage: _summarise(values) for stage, values in latencies.items()},
+        }
+
+    def jobs(self) -> list[dict]:
+        with self._lock:
+            return [j.to_dict() for j in reversed(self._jobs)]
+
+    def _log(self, message: str) -> None:
+        print(f"[{datetime.now():%H:%M:%S}] {message}", flush=True)
+
+
+def _summarise(values: list[float]) -> dict:
+    """Count, mean, median, p95 and max of recent stage times."""
+    ordered = sorted(values)
+    return {
+        "count": len(ordered),
+        "mean": round(statistics.fmean(ordered), 3),
+        "p50": round(statistics.median(ordered), 3),
+        "p95": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))], 3),
+        "max": round(ordered[-1], 3),
+    }
+
+
+# ---------------------------------------------------------------------------
+# HTTP API
+# ---------------------------------------------------------------------------
+
+def _handler(daemon: QCDaemon) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:
+            path = self.path.split("?", 1)[0].rstrip("/")
+            if path == "/status":
+                self._json(200, daemon.status())
+            elif path == "/jobs":
+                self._json(200, {"jobs": daemon.jobs()})
+            elif path.startswith("/jobs/") and path[6:].isdigit():
+                job = daemon.job(int(path[6:]))
+                if job is None:
+                    self._json(404, {"error": f"no job {path[6:]}"})
+                else:
+                    self._json(200, job.to_dict())
+            else:
+                self._json(404, {"error": f"unknown path {self.path}"})
+
+        def do_POST(self) -> None:
+            if self.path.rstrip("/") != "/jobs":
+                self._json(404, {"error": f"unknown path {self.path}"})
+                return
+            try:
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                pair = QCPair(str(body["sot"]), str(body["code"]))
+            except (ValueError, KeyError, TypeError):
+                self._json(400, {"error": 'expected a JSON body {"sot": "...", "code": "..."}'})
+                return
+            missing = [p for p in (pair.sot_path, pair.code_path) if not Path(p).is_file()]
+            if missing:
+                self._json(400, {"error": f"not found: {', '.join(missing)}"})
+                return
+            self._json(202, daemon.submit(pair, source="api").to_dict())
+
+        def _json(self, status: int, payload: dict) -> None:
+            body = json.dumps(payload, indent=2).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format: str, *args) -> None:
+            pass  # requests are not logged; jobs are
+
+    return Handler
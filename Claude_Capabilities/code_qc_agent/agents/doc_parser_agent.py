@@ -1,7 +1,13 @@
 """Agent that parses a source-of-truth document into structured rules and variables."""
 
+import hashlib
+import json
+from concurrent.futures import ThreadPoolExecutor
+
 from agents.base_agent import BaseAgent
+from utils.metrics import submit_in_context
 from utils.models import ParsedDoc
+from utils.sot_chunking import merge_parsed_docs, split_sot_text
 
 
 class DocParserAgent(BaseAgent):
@@ -21,22 +27,67 @@ class DocParserAgent(BaseAgent):
         "any expected transformation or derivation logic.\n"
         "- Be exhaustive — do not skip implicit rules or edge-case conditions."
     )
+    _INSTRUCTION = (
+        "Please analyse the document above and extract all rules, "
+        "variable definitions, and conditions into the structured format."
+    )
+    _PART_INSTRUCTION = (
+        "The text above is part {part} of {total} of a larger document. "
+        "Extract every rule, variable definition, and condition that appears in "
+        "this part, using the sheet / page / heading markers for source references."
+    )
+
+    @property
+    def output_id(self) -> str:
+        """Hash of everything but the spec that shapes a ``ParsedDoc`` — keys its checkpoint."""
+        routes = [self.routing.route.cache_id]
+        if self.routing.fast is not None:
+            routes.append(self.routing.fast.cache_id)
+        material = json.dumps(
+            {
+                "routes": routes,
+                "prompts": [self._SYSTEM, self._INSTRUCTION, self._PART_INSTRUCTION],
+                "chunk_chars": self.runtime.config.get("doc_parser", {}).get("chunk_chars", 0),
+                "schema": ParsedDoc.model_json_schema(),
+            },
+            sort_keys=True,
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()[:16]
 
     def parse(self, sot_text: str) -> ParsedDoc:
-        """Parse the full SOT text and return a structured ParsedDoc."""
-        content_block = self._make_content_block(sot_text)
+        """Parse the SOT text and return a structured ParsedDoc.
+
+        Text longer than ``doc_parser.chunk_chars`` is split on its sheet /
+        page / heading markers, the chunks are parsed concurrently and the
+        partial results merged (map-reduce).
+        """
+        settings = self.runtime.config.get("doc_parser", {})
+        chunk_chars = settings.get("chunk_chars", 0)
+        chunks = split_sot_text(sot_text, chunk_chars) if chunk_chars else [sot_text]
+        if len(chunks) == 1:
+            return self._parse_chunk(sot_text)
+
+        workers = min(settings.get("max_workers", 4), len(chunks))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="doc-chunk") as pool:
+            futures = [
+                submit_in_context(pool, self._parse_chunk, chunk, i + 1, len(chunks))
+                for i, chunk in enumerate(chunks)
+            ]
+            parts = [f.result() for f in futures]
+        return merge_parsed_docs(parts)
+
+    def _parse_chunk(self, text: str, part: int = 1, total: int = 1) -> ParsedDoc:
+        instruction = self._INSTRUCTION
+        if total > 1:
+            instruction = self._PART_INSTRUCTION.format(part=part, total=total)
+
+        content_block = self._make_content_block(text)
         messages = [
             {
                 "role": "user",
                 "content": [
                     content_block,
-                    {
-                        "type": "text",
-                        "text": (
-                            "Please analyse the document above and extract all rules, "
-                            "variable definitions, and conditions into the structured format."
-                        ),
-                    },
+                    {"type": "text", "text": instruction},
                 ],
             }
         ]
@@ -1,9 +1,13 @@
 """Agent that checks whether the code correctly implements the specification rules."""
 
-import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable
 
 from agents.base_agent import BaseAgent
-from utils.models import LogicQCResult, ParsedCode, ParsedDoc
+from utils.metrics import submit_in_context
+from utils.payload import encode_payload
+from utils.models import LogicQCResult, ParsedCode, ParsedDoc, QCFinding, Rule
+from utils.section_index import SectionIndex
 
 
 class LogicQCAgent(BaseAgent):
@@ -28,22 +32,244 @@ class LogicQCAgent(BaseAgent):
         "- status: PASS / FAIL / WARNING.\n"
         "- detail: what was found in the code (or not found).\n"
         "- recommendation: actionable step to resolve (or 'None required' for PASS).\n"
-        "- priority: High / Medium / Low based on potential business impact."
+        "- priority: High / Medium / Low based on potential business impact.\n"
+        "- rule: the exact title of the specification rule the finding checks "
+        "(empty string for undocumented logic)."
     )
 
-    def check(self, parsed_doc: ParsedDoc, parsed_code: ParsedCode) -> LogicQCResult:
-        """Run a logic QC comparison and return structured findings."""
-        prompt = (
-            "Please perform a Logic QC check using the inputs below.\n\n"
-            "=== SPECIFICATION (Source of Truth) ===\n"
-            f"{json.dumps(parsed_doc.model_dump(), indent=2)}\n\n"
-            "=== CODE ANALYSIS ===\n"
-            f"{json.dumps(parsed_code.model_dump(), indent=2)}\n\n"
+    def check(
+        self,
+        parsed_doc: ParsedDoc,
+        parsed_code: ParsedCode,
+        rules: list[Rule] | None = None,
+        focus_sections: list[str] | None = None,
+        on_finding: Callable[[QCFinding], None] | None = None,
+    ) -> LogicQCResult:
+        """Run a logic QC comparison and return structured findings.
+
+        By default every rule is checked and undocumented logic is reported
+        for the whole program.  When ``rules`` is given only those rules are
+        checked, and undocumented logic is reported only for the sections
+        named in ``focus_sections`` (none if omitted).
+
+        When there are more rules than ``logic_qc.batch_size``, the rules are
+        checked in concurrent batches and undocumented logic in a separate,
+        smaller call; the findings are merged into one result.
+
+        With ``logic_qc.section_top_k`` set and more code sections than that,
+        each rule batch is sent only the sections its rules retrieve from a
+        local index (``utils.section_index``); undocumented logic is then
+        always checked separately, against every section.
+
+        Batched calls lead with what they all share — the spec without its
+        rules, then the code analysis — so the prompt cache entry written by
+        the first is read by the rest.
+
+        ``on_finding`` is called with each finding as soon as it streams in.
+        """
+        selected = parsed_doc.rules if rules is None else rules
+        # None = whole program, [] = do not report undocumented logic
+        undocumented_scope = None if rules is None else (focus_sections or [])
+
+        settings = self.runtime.config.get("logic_qc", {})
+        batch_size = settings.get("batch_size", 0)
+        top_k = settings.get("section_top_k", 0)
+        index = None
+        if top_k and len(parsed_code.sections) > top_k:
+            index = SectionIndex(parsed_code, variable_boost=settings.get("variable_boost", 3.0))
+        elif not batch_size or len(selected) <= batch_size:
+            return self._check_rules(
+                parsed_doc, parsed_code, selected, undocumented_scope, on_finding
+            )
+
+        size = batch_size or len(selected) or 1
+        batches = [selected[i:i + size] for i in range(0, len(selected), size)]
+        batch_code = [
+            parsed_code if index is None else self._relevant(index, parsed_doc, parsed_code, batch, top_k)
+            for batch in batches
+        ]
+        workers = min(settings.get("max_workers", 4), len(batches) + 1)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="logic-batch") as pool:
+            futures = [
+                submit_in_context(
+                    pool,
+                    self._check_rules,
+                    parsed_doc,
+                    code,
+                    batch,
+                    [],
+                    on_finding,
+                    code is not parsed_code,
+                    True,
+                )
+                for batch, code in zip(batches, batch_code)
+            ]
+            if undocumented_scope != []:
+                futures.append(
+                    submit_in_context(
+                        pool,
+                        self._check_undocumented,
+                        parsed_doc,
+                        parsed_code,
+                        undocumented_scope,
+                        on_finding,
+                    )
+                )
+            findings = [finding for f in futures for finding in f.result().findings]
+        return LogicQCResult(findings=findings)
+
+    @staticmethod
+    def _relevant(
+        index: SectionIndex,
+        parsed_doc: ParsedDoc,
+        parsed_code: ParsedCode,
+        rules: list[Rule],
+        top_k: int,
+    ) -> ParsedCode:
+        """``parsed_code`` cut down to the union of the rules' top-k sections, in file order.
+
+        If any rule retrieves no section the batch gets every section, rather
+        than leaving that rule to be judged without its code (the report's
+        traceability table marks such rules).
+        """
+        links = index.top_k(rules, top_k, parsed_doc.variables)
+        if any(not link.sections for link in links):
+            return parsed_code
+        wanted = {(m.name, m.line_range) for link in links for m in link.sections}
+        sections = [s for s in parsed_code.sections if (s.name, s.line_range) in wanted]
+        return parsed_code.model_copy(update={"sections": sections})
+
+    def _check_rules(
+        self,
+        parsed_doc: ParsedDoc,
+        parsed_code: ParsedCode,
+        rules: list[Rule],
+        undocumented_scope: list[str] | None,
+        on_finding: Callable[[QCFinding], None] | None = None,
+        sections_pruned: bool = False,
+        batched: bool = False,
+    ) -> LogicQCResult:
+        """Check ``rules`` against the code.
+
+        A single call sends the spec (with these rules) and then the code
+        analysis as its cacheable prefix.  A ``batched`` call is one of several
+        over the same spec and program, so its prefix is what every batch
+        shares — the spec without its rules, then the unpruned code analysis —
+        and its own rules (and pruned sections) follow uncached.
+        """
+        instructions = (
             "Check every rule in the specification against what the code implements. "
-            "Generate one finding per rule, and additional findings for any undocumented "
-            "code logic you observe."
+            "Generate one finding per rule"
+        )
+        if batched:
+            instructions = (
+                "Check every rule listed under RULES TO CHECK against what the code "
+                "implements; the specification above gives their context. "
+                "Generate one finding per listed rule"
+            )
+        if sections_pruned:
+            instructions = (
+                "Only the code sections most relevant to these rules are listed; the "
+                "variables, transformations, filters and hardcoded values cover the whole "
+                "program. " + instructions
+            )
+        if undocumented_scope is None:
+            instructions += ", and additional findings for any undocumented code logic you observe."
+        elif undocumented_scope:
+            instructions += (
+                ". Also add findings for undocumented logic, but only within these code "
+                f"sections: {', '.join(undocumented_scope)}."
+            )
+        else:
+            instructions += ". Do not report undocumented logic."
+
+        if not batched:
+            spec = parsed_doc.model_copy(update={"rules": rules})
+            shared = [self._spec_text(spec), self._code_text(parsed_code)]
+            return self._call(shared, [], instructions, on_finding)
+
+        batch = ParsedDoc(domain=parsed_doc.domain, rules=rules, variables=[])
+        per_batch = [f"=== RULES TO CHECK ===\n{self._encode(batch)}"]
+        shared = [self._spec_text(self._context(parsed_doc))]
+        if sections_pruned:
+            per_batch.insert(0, self._code_text(parsed_code))
+        else:
+            shared.append(self._code_text(parsed_code))
+        return self._call(shared, per_batch, instructions, on_finding)
+
+    def _check_undocumented(
+        self,
+        parsed_doc: ParsedDoc,
+        parsed_code: ParsedCode,
+        focus_sections: list[str] | None,
+        on_finding: Callable[[QCFinding], None] | None = None,
+    ) -> LogicQCResult:
+        """Find code behaviour no rule covers, sending only rule titles and variables.
+
+        Its prefix is the same as the rule batches' (spec context, then the
+        code analysis), so it reads their cache entry.
+        """
+        outline = ParsedDoc(
+            domain=parsed_doc.domain,
+            rules=[
+                Rule(title=r.title, description="", variables=r.variables) for r in parsed_doc.rules
+            ],
+            variables=[],
+        )
+        instructions = (
+            "The rule outline above lists only rule titles and variables. Do NOT produce a "
+            "finding per rule. Report only code behaviour that no specification rule covers "
+            "(undocumented logic), with an empty rule field"
+        )
+        if focus_sections:
+            instructions += f", and only within these code sections: {', '.join(focus_sections)}"
+        return self._call(
+            [self._spec_text(self._context(parsed_doc)), self._code_text(parsed_code)],
+            [f"=== RULE OUTLINE ===\n{self._encode(outline)}"],
+            instructions + ".",
+            on_finding,
         )
 
-        content_block = self._make_content_block(prompt)
-        messages = [{"role": "user", "content": [content_block]}]
-        return self._stream_parse(messages, self._SYSTEM, LogicQCResult)
+    # ------------------------------------------------------------------
+    # Prompt layout
+    # ------------------------------------------------------------------
+
+    def _encode(self, model: ParsedDoc | ParsedCode) -> str:
+        return encode_payload(model, self.runtime.config.get("payload", {}))
+
+    def _spec_text(self, spec: ParsedDoc) -> str:
+        return f"=== SPECIFICATION (Source of Truth) ===\n{self._encode(spec)}"
+
+    def _code_text(self, parsed_code: ParsedCode) -> str:
+        return f"=== CODE ANALYSIS ===\n{self._encode(parsed_code)}"
+
+    @staticmethod
+    def _context(parsed_doc: ParsedDoc) -> ParsedDoc:
+        """The spec without its rules — domain and variable definitions every batch shares."""
+        return parsed_doc.model_copy(update={"rules": []})
+
+    def _call(
+        self,
+        shared: list[str],
+        per_call: list[str],
+        instructions: str,
+        on_finding: Callable[[QCFinding], None] | None = None,
+    ) -> LogicQCResult:
+        """Send ``shared`` blocks first as the cacheable prefix, then ``per_call`` and the task.
+
+        ``shared`` must be identical across the calls meant to reuse the
+        cache entry: the spec is identical for every program checked against
+        it, the code analysis for every batch of one program.
+        """
+        task = f"Please perform a Logic QC check using the inputs above.\n\n{instructions}"
+        messages = [
+            {
+                "role": "user",
+                "content": [
+                    *(self._make_content_block(text) for text in shared),
+                    *(self._make_content_block(text, cacheable=False) for text in per_call),
+                    self._make_content_block(task, cacheable=False),
+                ],
+            }
+        ]
+        return self._stream_parse(messages, self._SYSTEM, LogicQCResult, on_finding)
@@ -1,70 +1,586 @@
-"""Orchestrator — runs the full QC pipeline sequentially."""
+"""Orchestrator — runs the full QC pipeline.
 
-from utils import file_reader
+Stages are scheduled on their data dependencies rather than strictly in order:
+
+    read SOT ──► DocParser ───────────────┐
+                                          ├──► LogicQC ──┐
+    read code ─► CodeParser ─┬────────────┘              ├──► Report
+                             └──► StructureQC ───────────┘
+
+DocParser and CodeParser run side by side, StructureQC starts as soon as the
+code is parsed, and LogicQC starts once both parses are available.  Pass
+``concurrent=False`` to run the seven steps one after another.
+
+Every run saves its inputs and results under ``outputs/state/``.  With
+``incremental=True`` the next run of the same program against the same spec
+diffs the source, re-parses only the changed regions, re-checks only the
+rules those edits touch, and carries every other finding forward.
+
+One spec usually governs many programs.  ``load_spec`` reads and parses a
+spec once, and ``run(..., spec=...)`` / ``run_many`` QC programs against
+that shared ``ParsedDoc``.  With ``checkpoints.enabled`` the ``ParsedDoc`` is
+also kept on disk per SOT file hash, and each stage of a full run is
+checkpointed, so a failed run resumes after its last completed stage
+(``utils.checkpoints``).
+"""
+
+import os
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, TypeVar
+
+from utils import checkpoints, file_reader, metrics
+from utils.checkpoints import STAGE_MODELS, RunCheckpoints, file_hash
+from utils.incremental import (
+    QCState,
+    carry_forward,
+    load_state,
+    plan_update,
+    save_state,
+    splice_parsed_code,
+    text_hash,
+    touched_rules,
+)
+from utils.metrics import ReaderTiming, RunMetrics, submit_in_context
+from utils.models import LogicQCResult, ParsedCode, ParsedDoc, QCFinding, StructureQCResult
+from utils.report_writers import SECTIONS, ReportSession
+from utils.section_index import TraceLink, rule_traceability
 from agents.doc_parser_agent import DocParserAgent
 from agents.code_parser_agent import CodeParserAgent
 from agents.logic_qc_agent import LogicQCAgent
 from agents.structure_qc_agent import StructureQCAgent
 from agents.report_agent import ReportAgent
+from agents.runtime import Runtime
+
+T = TypeVar("T")
+
+
+@dataclass
+class SharedSpec:
+    """A spec read and parsed once, to QC many programs against (``Orchestrator.load_spec``)."""
+
+    sot_path: str
+    text: str
+    file_hash: str
+    parsed_doc: ParsedDoc
 
 
 class Orchestrator:
-    """Drives each pipeline step in order and prints progress."""
+    """Drives each pipeline step and prints progress."""
+
+    def __init__(
+        self,
+        concurrent: bool = True,
+        verbose: bool = True,
+        incremental: bool = False,
+        state_dir: str = "outputs/state",
+        runtime: Runtime | None = None,
+    ) -> None:
+        # One runtime (config, pooled client, cache, agents) serves every stage.
+        self.runtime = runtime if runtime is not None else Runtime.default()
+        self.concurrent = concurrent
+        self.verbose = verbose
+        self.incremental = incremental
+        self.state_dir = state_dir
+        settings = self.runtime.config.get("checkpoints", {})
+        self.checkpoint_dir: str | None = (
+            settings.get("dir", "outputs/checkpoints") if settings.get("enabled", True) else None
+        )
+        self.checkpoint_max_age_days: float = settings.get("max_age_days", 30)
+        if self.checkpoint_dir:
+            checkpoints.prune_once(self.checkpoint_dir, self.checkpoint_max_age_days)
+
+    def run(
+        self,
+        sot_path: str,
+        code_path: str,
+        output_dir: str = "outputs/reports",
+        spec: SharedSpec | None = None,
+        run_metrics: RunMetrics | None = None,
+    ) -> str:
+        """Execute the full pipeline and return the path to the generated report.
+
+        With ``spec`` (from ``load_spec``) the spec is neither read nor parsed again.
+        Pass ``run_metrics`` to receive the run's stage times and calls.
+        """
+        if run_metrics is None:
+            run_metrics = RunMetrics(sot_path=str(sot_path), code_path=str(code_path))
+        start = time.perf_counter()
+        with metrics.activate(run_metrics):
+            report_path = self._run_pipeline(sot_path, code_path, output_dir, spec)
+        run_metrics.total_s = time.perf_counter() - start
+        run_metrics.report_path = report_path
+        self._write_metrics(run_metrics, report_path)
+        return report_path
+
+    def load_spec(self, sot_path: str) -> SharedSpec:
+        """Read and parse a spec once (or restore its checkpointed ``ParsedDoc``)."""
+        with metrics.activate(RunMetrics(sot_path=str(sot_path), code_path="")):
+            sot_text = self._read_sot(sot_path)
+            key = file_hash(sot_path)
+            saved = (
+                RunCheckpoints(self.checkpoint_dir, key, **self._checkpoint_options())
+                if self.checkpoint_dir
+                else None
+            )
+            self._log("[3/7] Parsing specification document with DocParserAgent...")
+            with checkpoints.activate(saved):
+                parsed_doc = self._timed(
+                    "doc_parse", self.runtime.agent(DocParserAgent).parse, sot_text
+                )
+        self._report_doc(parsed_doc)
+        return SharedSpec(sot_path=str(sot_path), text=sot_text, file_hash=key, parsed_doc=parsed_doc)
+
+    def run_many(
+        self,
+        sot_path: str,
+        code_paths: list[str],
+        output_dir: str = "outputs/reports",
+        workers: int = 4,
+    ) -> list[str | Exception]:
+        """QC many programs against one spec, parsed once; programs run concurrently.
+
+        Returns each program's report path, or the exception that stopped it,
+        in the order of ``code_paths``.
+        """
+        spec = self.load_spec(sot_path)
+        with ThreadPoolExecutor(max_workers=max(1, workers), thread_name_prefix="qc-program") as pool:
+            futures = [
+                pool.submit(self.run, sot_path, code_path, output_dir, spec)
+                for code_path in code_paths
+            ]
+        results: list[str | Exception] = []
+        for future in futures:
+            try:
+                results.append(future.result())
+            except Exception as exc:  # one bad program must not hide the others' reports
+                results.append(exc)
+        return results
 
-    def run(self, sot_path: str, code_path: str) -> str:
-        """Execute the full pipeline and return the path to the generated report."""
+    def _run_pipeline(
+        self, sot_path: str, code_path: str, output_dir: str, spec: SharedSpec | None
+    ) -> str:
+        run_metrics = metrics.current()
 
         # Step 1 — Read files
-        print("[1/7] Reading source-of-truth file...")
-        sot_text = file_reader.read_sot_file(sot_path)
-        print(f"      {len(sot_text):,} characters read.")
-
-        print("[2/7] Reading code file...")
-        raw_code, language = file_reader.read_code_file(code_path)
-        print(f"      Language: {language} | {len(raw_code):,} characters read.")
-
-        # Step 2 — Parse documents
-        print("[3/7] Parsing specification document with DocParserAgent...")
-        parsed_doc = DocParserAgent().parse(sot_text)
-        print(
+        if spec is None:
+            sot_text = self._read_sot(sot_path)
+            spec_key = file_hash(sot_path) if self.checkpoint_dir else ""
+            parsed_doc = None
+        else:
+            self._log("[1/7] Using the shared source-of-truth file.")
+            sot_text, spec_key, parsed_doc = spec.text, spec.file_hash, spec.parsed_doc
+
+        self._log("[2/7] Reading code file...")
+        raw_code, language = self._read("code", code_path, lambda: file_reader.read_code_file(code_path))
+        self._log(f"      Language: {language} | {len(raw_code):,} characters read.")
+        saved = (
+            RunCheckpoints.for_program(
+                self.checkpoint_dir, spec_key, code_path, raw_code, **self._checkpoint_options()
+            )
+            if self.checkpoint_dir
+            else None
+        )
+
+        # Streaming report formats are written as findings arrive
+        report = ReportAgent(self.runtime.config.get("report", {})).open(
+            sot_path, code_path, output_dir
+        )
+        try:
+            # Steps 2 & 3 — Parse documents and run QC checks
+            sot_hash = text_hash(sot_text)
+            state = load_state(self.state_dir, code_path) if self.incremental else None
+            if state is not None and state.sot_hash == sot_hash and state.language == language:
+                stages = self._run_incremental(state, sot_text, raw_code, language, report)
+            else:
+                if state is not None:
+                    self._log("      Specification changed since last run — running full QC.")
+                with checkpoints.activate(saved):
+                    stages = self._run_full(sot_text, raw_code, language, report, parsed_doc)
+        except BaseException:
+            report.discard()
+            raise
+        parsed_doc, parsed_code, logic_result, structure_result = stages
+
+        saved_state = save_state(
+            self.state_dir,
+            QCState(
+                code_path=code_path,
+                language=language,
+                raw_code=raw_code,
+                sot_hash=sot_hash,
+                parsed_doc=parsed_doc,
+                parsed_code=parsed_code,
+                logic_result=logic_result,
+                structure_result=structure_result,
+            ),
+        )
+        if not saved_state:
+            self._log("      A QC result was cut short — keeping the last complete incremental state.")
+
+        # Step 4 — Finish the reports
+        formats = ", ".join(w.extension.lstrip(".") for w in report.writers)
+        self._log(f"[7/7] Writing report ({formats})...")
+        self._report_calls(run_metrics)
+        with run_metrics.stage("report"):
+            report.complete("logic", logic_result.findings)
+            report.complete("structure", structure_result.findings)
+            report_paths = report.close(
+                logic_result, structure_result, self._traceability(parsed_doc, parsed_code)
+            )
+        run_metrics.report_write_s = run_metrics.stages["report"]
+        if saved is not None:
+            saved.clear_program()
+        for path in report_paths[1:]:
+            self._log(f"      Also written: {path}")
+
+        return report_paths[0]
+
+    # ------------------------------------------------------------------
+    # Execution modes
+    # ------------------------------------------------------------------
+
+    def _run_full(
+        self,
+        sot_text: str,
+        raw_code: str,
+        language: str,
+        report: ReportSession,
+        parsed_doc: ParsedDoc | None = None,
+    ) -> tuple[ParsedDoc, ParsedCode, LogicQCResult, StructureQCResult]:
+        """Run every stage; ``parsed_doc`` (a shared spec) skips the spec parse."""
+        if self.concurrent:
+            return self._run_concurrent(sot_text, raw_code, language, report, parsed_doc)
+        return self._run_sequential(sot_text, raw_code, language, report, parsed_doc)
+
+    def _run_sequential(
+        self,
+        sot_text: str,
+        raw_code: str,
+        language: str,
+        report: ReportSession,
+        parsed_doc: ParsedDoc | None,
+    ) -> tuple[ParsedDoc, ParsedCode, LogicQCResult, StructureQCResult]:
+        if parsed_doc is None:
+            self._log("[3/7] Parsing specification document with DocParserAgent...")
+            parsed_doc = self._timed("doc_parse", self.runtime.agent(DocParserAgent).parse, sot_text)
+            self._report_doc(parsed_doc)
+
+        self._log("[4/7] Parsing code structure with CodeParserAgent...")
+        parsed_code = self._timed(
+            "code_parse", self.runtime.agent(CodeParserAgent).parse, raw_code, language
+        )
+        self._report_code(parsed_code)
+
+        self._log("[5/7] Running Logic QC...")
+        logic_result = self._timed(
+            "logic_qc",
+            self.runtime.agent(LogicQCAgent).check,
+            parsed_doc,
+            parsed_code,
+            on_finding=self._streamed(report, "logic"),
+        )
+        self._qc_done(report, "logic", logic_result)
+
+        self._log("[6/7] Running Structure QC...")
+        structure_result = self._timed(
+            "structure_qc",
+            self.runtime.agent(StructureQCAgent).check,
+            parsed_code,
+            raw_code,
+            self._streamed(report, "structure"),
+        )
+        self._qc_done(report, "structure", structure_result)
+
+        return parsed_doc, parsed_code, logic_result, structure_result
+
+    def _run_concurrent(
+        self,
+        sot_text: str,
+        raw_code: str,
+        language: str,
+        report: ReportSession,
+        parsed_doc: ParsedDoc | None,
+    ) -> tuple[ParsedDoc, ParsedCode, LogicQCResult, StructureQCResult]:
+        with ThreadPoolExecutor(max_workers=3, thread_name_prefix="qc-stage") as pool:
+            doc_future = None
+            if parsed_doc is None:
+                self._log("[3/7] Parsing specification document with DocParserAgent...")
+                doc_future = self._submit(
+                    pool, "doc_parse", self.runtime.agent(DocParserAgent).parse, sot_text
+                )
+
+            self._log("[4/7] Parsing code structure with CodeParserAgent...")
+            code_future = self._submit(
+                pool, "code_parse", self.runtime.agent(CodeParserAgent).parse, raw_code, language
+            )
+
+            # Structure QC only needs the parsed code — start it immediately.
+            parsed_code = code_future.result()
+            self._report_code(parsed_code)
+            self._log("[6/7] Running Structure QC...")
+            structure_future = self._submit(
+                pool,
+                "structure_qc",
+                self.runtime.agent(StructureQCAgent).check,
+                parsed_code,
+                raw_code,
+                self._streamed(report, "structure"),
+            )
+
+            if doc_future is not None:
+                parsed_doc = doc_future.result()
+                self._report_doc(parsed_doc)
+            self._log("[5/7] Running Logic QC...")
+            logic_future = self._submit(
+                pool,
+                "logic_qc",
+                self.runtime.agent(LogicQCAgent).check,
+                parsed_doc,
+                parsed_code,
+                on_finding=self._streamed(report, "logic"),
+            )
+
+            structure_result = structure_future.result()
+            self._qc_done(report, "structure", structure_result)
+            logic_result = logic_future.result()
+            self._qc_done(report, "logic", logic_result)
+
+        return parsed_doc, parsed_code, logic_result, structure_result
+
+    def _run_incremental(
+        self,
+        state: QCState,
+        sot_text: str,
+        raw_code: str,
+        language: str,
+        report: ReportSession,
+    ) -> tuple[ParsedDoc, ParsedCode, LogicQCResult, StructureQCResult]:
+        plan = plan_update(state.parsed_code, state.raw_code, raw_code)
+        if plan is None:
+            self._log("      Previous sections have no line ranges — running full QC.")
+            return self._run_full(sot_text, raw_code, language, report)
+
+        parsed_doc = state.parsed_doc
+        self._log("[3/7] Reusing parsed specification from the last run.")
+        if plan.unchanged:
+            self._log("[4/7] Code unchanged since the last run — reusing all results.")
+            return parsed_doc, state.parsed_code, state.logic_result, state.structure_result
+
+        self._log(f"[4/7] Re-parsing {len(plan.regions)} changed region(s) with CodeParserAgent...")
+        lines = raw_code.splitlines()
+        with ThreadPoolExecutor(max_workers=4, thread_name_prefix="qc-stage") as pool:
+            code_parser = self.runtime.agent(CodeParserAgent)
+            region_futures = [
+                self._submit(
+                    pool,
+                    "code_parse",
+                    code_parser.parse,
+                    "\n".join(lines[start - 1:end]),
+                    language,
+                    start - 1,
+                )
+                for start, end in plan.regions
+            ]
+            region_results = [f.result() for f in region_futures]
+            parsed_code = splice_parsed_code(state.parsed_code, plan, region_results, raw_code)
+            self._report_code(parsed_code)
+
+            self._log("[6/7] Running Structure QC...")
+            structure_future = self._submit(
+                pool,
+                "structure_qc",
+                self.runtime.agent(StructureQCAgent).check,
+                parsed_code,
+                raw_code,
+                self._streamed(report, "structure"),
+            )
+
+            rules = touched_rules(parsed_doc, state.logic_result.findings, plan, region_results)
+            focus = [s.name for r in region_results for s in r.sections]
+            self._log(
+                f"[5/7] Re-checking {len(rules)} of {len(parsed_doc.rules)} rule(s) with Logic QC..."
+            )
+            new_findings = []
+            if rules or focus:
+                logic_agent = self.runtime.agent(LogicQCAgent)
+                new_findings = self._timed(
+                    "logic_qc",
+                    logic_agent.check,
+                    parsed_doc,
+                    parsed_code,
+                    rules,
+                    focus,
+                    self._streamed(report, "logic"),
+                ).findings
+            logic_result = LogicQCResult(
+                findings=carry_forward(
+                    state.logic_result.findings, rules, new_findings, plan, parsed_doc.rules
+                )
+            )
+            self._qc_done(report, "logic", logic_result)
+
+            structure_result = structure_future.result()
+            self._qc_done(report, "structure", structure_result)
+
+        return parsed_doc, parsed_code, logic_result, structure_result
+
+    # ------------------------------------------------------------------
+    # Instrumentation
+    # ------------------------------------------------------------------
+
+    def _read_sot(self, sot_path: str) -> str:
+        self._log("[1/7] Reading source-of-truth file...")
+        readers = self.runtime.config.get("readers", {})
+        sot_text = self._read(
+            "sot",
+            sot_path,
+            lambda: file_reader.read_sot_file(sot_path, pdf_workers=readers.get("pdf_workers", 1)),
+        )
+        self._log(f"      {len(sot_text):,} characters read.")
+        return sot_text
+
+    @staticmethod
+    def _read(kind: str, path: str, read: Callable[[], T]) -> T:
+        """Run a file reader, recording its time under ``read_<kind>``."""
+        run_metrics = metrics.current()
+        start = time.perf_counter()
+        with run_metrics.stage(f"read_{kind}"):
+            result = read()
+        text = result[0] if isinstance(result, tuple) else result
+        run_metrics.record_reader(
+            ReaderTiming(
+                kind=kind,
+                file_type=Path(path).suffix.lower(),
+                bytes=os.path.getsize(path),
+                chars=len(text),
+                seconds=time.perf_counter() - start,
+            )
+        )
+        return result
+
+    def _checkpoint_options(self) -> dict:
+        """``RunCheckpoints`` options: the ParsedDoc version, its age limit and cache switch."""
+        return {
+            "doc_version": self.runtime.agent(DocParserAgent).output_id,
+            "max_age_days": self.checkpoint_max_age_days,
+            "reuse_doc": self.runtime.config.get("cache", {}).get("enabled", True),
+        }
+
+    def _timed(self, stage: str, fn: Callable[..., T], *args, **kwargs) -> T:
+        """Run a stage under its timer, or restore its output from an active checkpoint."""
+        saved = checkpoints.current()
+        if saved is not None:
+            restored = saved.load(stage)
+            if restored is not None:
+                self._log(f"      {stage}: restored from checkpoint.")
+                return restored
+        with metrics.current().stage(stage):
+            result = fn(*args, **kwargs)
+        if saved is not None and stage in STAGE_MODELS:
+            saved.save(stage, result)
+        return result
+
+    def _submit(self, pool: ThreadPoolExecutor, stage: str, fn: Callable, *args, **kwargs) -> Future:
+        """Submit a timed stage that keeps this run's metrics context."""
+        return submit_in_context(pool, self._timed, stage, fn, *args, **kwargs)
+
+    def _traceability(self, parsed_doc: ParsedDoc, parsed_code: ParsedCode) -> list[TraceLink] | None:
+        """The report's rule → code-section table, unless ``report.include_traceability`` is off."""
+        if not self.runtime.config.get("report", {}).get("include_traceability", True):
+            return None
+        return rule_traceability(parsed_doc, parsed_code, self.runtime.config.get("logic_qc", {}))
+
+    def _write_metrics(self, run_metrics: RunMetrics, report_path: str) -> None:
+        """Write the run record next to the report, per the ``metrics:`` settings."""
+        settings = self.runtime.config.get("metrics", {})
+        base = Path(report_path).with_suffix("")
+        if settings.get("json", True):
+            run_metrics.write_json(base.with_suffix(".metrics.json"))
+        if settings.get("prometheus", False):
+            run_metrics.write_prometheus(base.with_suffix(".prom"))
+        self._log(
+            "      Stage seconds — "
+            + " | ".join(f"{name}: {sec:.2f}" for name, sec in run_metrics.stages.items())
+        )
+
+    # ------------------------------------------------------------------
+    # Progress output
+    # ------------------------------------------------------------------
+
+    def _log(self, message: str) -> None:
+        if self.verbose:
+            print(message)
+
+    def _streamed(self, report: ReportSession, section: str) -> Callable[[QCFinding], None]:
+        """Return a callback that writes each finding to the report as it streams in.
+
+        In verbose mode the finding is also printed.
+        """
+        label = SECTIONS[section]
+
+        def on_finding(finding: QCFinding) -> None:
+            report.add(section, finding)
+            self._log(f"      · {label} {finding.status}: {finding.title}")
+
+        return on_finding
+
+    def _qc_done(
+        self, report: ReportSession, section: str, result: LogicQCResult | StructureQCResult
+    ) -> None:
+        """Write a finished stage's findings that did not stream, then print its counts."""
+        report.complete(section, result.findings)
+        self._report_qc(SECTIONS[section], result)
+
+    def _report_doc(self, parsed_doc: ParsedDoc) -> None:
+        self._log(
             f"      Domain: {parsed_doc.domain!r} | "
             f"{len(parsed_doc.rules)} rule(s) | "
             f"{len(parsed_doc.variables)} variable(s) extracted."
         )
 
-        print("[4/7] Parsing code structure with CodeParserAgent...")
-        parsed_code = CodeParserAgent().parse(raw_code, language)
-        print(
+    def _report_code(self, parsed_code: ParsedCode) -> None:
+        self._log(
             f"      {len(parsed_code.sections)} section(s) | "
             f"{len(parsed_code.variables)} variable(s) | "
             f"{len(parsed_code.hardcoded_values)} hardcoded value(s) found."
         )
 
-        # Step 3 — QC checks
-        print("[5/7] Running Logic QC...")
-        logic_result = LogicQCAgent().check(parsed_doc, parsed_code)
-        print(
-            f"      PASS: {logic_result.pass_count} | "
-            f"FAIL: {logic_result.fail_count} | "
-            f"WARNING: {logic_result.warning_count}"
+    def _report_calls(self, run_metrics: RunMetrics) -> None:
+        hits = sum(run_metrics.response_cache_hits.values())
+        if self.runtime.cache.enabled:
+            self._log(
+                f"      Response cache — hits: {hits} | misses: {len(run_metrics.calls)}"
+            )
+        totals = run_metrics.call_totals()
+        if not totals:
+            return
+        self._log(
+            "      Input tokens — "
+            + " | ".join(f"{stage}: {t['preflight_input_tokens']:,}" for stage, t in totals.items())
         )
-
-        print("[6/7] Running Structure QC...")
-        structure_result = StructureQCAgent().check(parsed_code, raw_code)
-        print(
-            f"      PASS: {structure_result.pass_count} | "
-            f"FAIL: {structure_result.fail_count} | "
-            f"WARNING: {structure_result.warning_count}"
+        calls = run_metrics.calls
+        self._log(
+            f"      Model calls — {len(calls)} streamed | "
+            f"slowest first token: {max(t['max_ttft_s'] for t in totals.values()):.1f}s | "
+            f"stopped early: {sum(t['aborted'] for t in totals.values())} | "
+            f"retries: {sum(t['retries'] for t in totals.values())} | "
+            f"escalated: {len(run_metrics.escalations)}"
         )
+        read = sum(c.cache_read_tokens for c in calls)
+        written = sum(c.cache_creation_tokens for c in calls)
+        total = read + written + sum(c.input_tokens for c in calls)
+        if total:
+            self._log(
+                f"      Prompt cache — read: {read:,} | written: {written:,} | "
+                f"hit rate: {read / total:.0%} of {total:,} input tokens"
+            )
 
-        # Step 4 — Generate report
-        print("[7/7] Generating Word report...")
-        report_path = ReportAgent().generate(
-            sot_path=sot_path,
-            code_path=code_path,
-            logic_result=logic_result,
-            structure_result=structure_result,
-            output_dir="outputs/reports",
+    def _report_qc(self, label: str, result: LogicQCResult | StructureQCResult) -> None:
+        self._log(
+            f"      {label} — PASS: {result.pass_count} | "
+            f"FAIL: {result.fail_count} | "
+            f"WARNING: {result.warning_count}"
         )
-
-        return report_path
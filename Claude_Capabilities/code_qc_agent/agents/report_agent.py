@@ -1,14 +1,34 @@
-"""Report agent — deterministic Word document generation (no LLM call)."""
+"""Report agent — deterministic report generation (no LLM call).
+
+Writes every format selected in ``report.formats`` (see ``utils.report_writers``).
+"""
 
 from datetime import datetime
 from pathlib import Path
 
-from utils.doc_writer import write_report
 from utils.models import LogicQCResult, StructureQCResult
+from utils.report_writers import WRITERS, ReportSession, selected_formats
+from utils.section_index import TraceLink
 
 
 class ReportAgent:
-    """Generates the QC Word report from structured results."""
+    """Generates the QC reports from structured results."""
+
+    def __init__(self, settings: dict | None = None) -> None:
+        # The ``report:`` section of settings.yaml
+        self.settings = settings or {}
+
+    def open(self, sot_path: str, code_path: str, output_dir: str) -> ReportSession:
+        """Start one report per selected format; streaming formats are opened immediately."""
+        # Include the code file stem so concurrent batch runs never collide.
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        prefix = self.settings.get("filename_prefix", "qc_report")
+        base = Path(output_dir) / f"{prefix}_{Path(code_path).stem}_{timestamp}"
+        writers = [
+            WRITERS[fmt](base.with_suffix(WRITERS[fmt].extension), sot_path, code_path)
+            for fmt in selected_formats(self.settings)
+        ]
+        return ReportSession(writers)
 
     def generate(
         self,
@@ -17,17 +37,14 @@ class ReportAgent:
         logic_result: LogicQCResult,
         structure_result: StructureQCResult,
         output_dir: str,
+        traceability: list[TraceLink] | None = None,
     ) -> str:
-        """Write the report and return the absolute path to the saved .docx file."""
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        output_path = Path(output_dir) / f"qc_report_{timestamp}.docx"
-
-        write_report(
-            sot_path=sot_path,
-            code_path=code_path,
-            logic_result=logic_result,
-            structure_result=structure_result,
-            output_path=str(output_path),
-        )
-
-        return str(output_path.resolve())
+        """Write every report at once and return the absolute path of the primary one."""
+        session = self.open(sot_path, code_path, output_dir)
+        try:
+            session.complete("logic", logic_result.findings)
+            session.complete("structure", structure_result.findings)
+            return session.close(logic_result, structure_result, traceability)[0]
+        except BaseException:
+            session.discard()
+            raise
@@ -0,0 +1,110 @@
+"""Runtime — process-wide config, HTTP client, scheduler, response cache and agents.
+
+One ``Runtime`` is built per process (or per Orchestrator when injected) and
+shared by every agent, so ``.env`` and ``settings.yaml`` are read once and all
+model calls go through a single pooled, keep-alive HTTP client instead of one
+client and one TLS handshake per agent.
+"""
+
+import os
+import threading
+from pathlib import Path
+from typing import TypeVar
+
+import anthropic
+import httpx
+import yaml
+from dotenv import load_dotenv
+
+from utils.response_cache import ResponseCache
+from utils.scheduler import RequestScheduler
+
+PROJECT_ROOT = Path(__file__).parent.parent
+
+A = TypeVar("A")
+
+
+def load_settings(project_root: Path = PROJECT_ROOT) -> dict:
+    """Load ``.env`` and return the parsed ``config/settings.yaml``."""
+    load_dotenv(project_root / ".env")
+    with open(project_root / "config" / "settings.yaml") as f:
+        return yaml.safe_load(f)
+
+
+class Runtime:
+    """Holds the parsed config, one pooled Anthropic client and lazily built agents."""
+
+    _default: "Runtime | None" = None
+    _default_lock = threading.Lock()
+
+    def __init__(
+        self,
+        config: dict | None = None,
+        client: anthropic.Anthropic | None = None,
+        project_root: Path = PROJECT_ROOT,
+        cache: ResponseCache | None = None,
+    ) -> None:
+        self.project_root = project_root
+        self.config: dict = config if config is not None else load_settings(project_root)
+        self.client = client if client is not None else self._build_client()
+        self.cache = cache if cache is not None else self._build_cache()
+        # One scheduler paces and retries every model call made through this runtime
+        self.scheduler = RequestScheduler.from_settings(self.config.get("scheduler", {}))
+
+        self._agents: dict[type, object] = {}
+        self._agents_lock = threading.Lock()
+
+    @classmethod
+    def default(cls) -> "Runtime":
+        """Return the process-wide runtime, building it on first use."""
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+            return cls._default
+
+    # ------------------------------------------------------------------
+    # Agents
+    # ------------------------------------------------------------------
+
+    def agent(self, agent_cls: type[A]) -> A:
+        """Return the shared instance of ``agent_cls``, constructing it on first use.
+
+        Agents hold no per-call state, so one instance per class is safe to
+        use from several pipeline threads at once.
+        """
+        with self._agents_lock:
+            instance = self._agents.get(agent_cls)
+            if instance is None:
+                instance = agent_cls(runtime=self)
+                self._agents[agent_cls] = instance
+            return instance
+
+    # ------------------------------------------------------------------
+    # Construction helpers
+    # ------------------------------------------------------------------
+
+    def _build_client(self) -> anthropic.Anthropic:
+        http = self.config.get("http", {})
+        http_client = anthropic.DefaultHttpxClient(
+            limits=httpx.Limits(
+                max_connections=http.get("max_connections", 20),
+                max_keepalive_connections=http.get("max_keepalive_connections", 10),
+                keepalive_expiry=http.get("keepalive_expiry_s", 60),
+            ),
+            timeout=httpx.Timeout(http.get("timeout_s", 600), connect=http.get("connect_timeout_s", 10)),
+        )
+        return anthropic.Anthropic(
+            api_key=os.environ.get("ANTHROPIC_API_KEY"),
+            base_url=self.config.get("api", {}).get("base_url") or None,
+            http_client=http_client,
+            max_retries=0,  # retried by the scheduler instead
+        )
+
+    def _build_cache(self) -> ResponseCache:
+        settings = self.config.get("cache", {})
+        return ResponseCache(
+            path=self.project_root / settings.get("path", "outputs/cache/responses.sqlite"),
+            max_size_mb=settings.get("max_size_mb", 256),
+            max_age_days=settings.get("max_age_days", 30),
+            enabled=settings.get("enabled", True),
+        )
@@ -1,9 +1,11 @@
 """Agent that assesses code quality, structure, and maintainability."""
 
-import json
+from typing import Callable
 
 from agents.base_agent import BaseAgent
-from utils.models import ParsedCode, StructureQCResult
+from utils.payload import encode_payload
+from utils.models import ParsedCode, QCFinding, StructureQCResult
+from utils.static_analysis import analyze
 
 
 class StructureQCAgent(BaseAgent):
@@ -33,20 +35,81 @@ class StructureQCAgent(BaseAgent):
         "Include: title, status, specific detail, actionable recommendation, priority."
     )
 
-    def check(self, parsed_code: ParsedCode, raw_code: str) -> StructureQCResult:
-        """Run a structure QC assessment and return structured findings."""
+    # Used when the static analyzer has already measured the mechanical dimensions
+    _SYSTEM_JUDGMENT = (
+        "You are an expert code quality reviewer specialising in analytical and "
+        "statistical programs ({language}).\n\n"
+        "You are given a structured summary of the code, the raw code itself, and facts "
+        "measured exactly by a static analyzer (line and comment counts, function/macro/"
+        "step lengths, hardcoded literals, duplicated blocks, naming styles). Naming "
+        "consistency, hardcoded values, duplication, unit length and comment density have "
+        "already been reported from those facts — do not produce findings for them.\n\n"
+        "Assess only these judgment-based dimensions and produce a QC finding for each:\n\n"
+        "1. Code organisation — is the code logically structured with clear sections?\n"
+        "2. Documentation quality — do the comments explain the non-obvious logic and intent?\n"
+        "3. Error handling — does the code handle missing data, edge cases, or invalid "
+        "inputs gracefully?\n"
+        "4. Modularity — is the code appropriately broken into reusable functions or "
+        "macros, or is it a single monolithic block?\n"
+        "5. Any other structural issues you identify.\n\n"
+        "For each finding:\n"
+        "- PASS   — meets acceptable quality standards.\n"
+        "- FAIL   — clear violation of best practices that could cause errors or "
+        "maintenance burden.\n"
+        "- WARNING — concerns that should be addressed but are not immediately harmful.\n\n"
+        "Include: title, status, specific detail, actionable recommendation, priority."
+    )
+
+    def check(
+        self,
+        parsed_code: ParsedCode,
+        raw_code: str,
+        on_finding: Callable[[QCFinding], None] | None = None,
+    ) -> StructureQCResult:
+        """Run a structure QC assessment and return structured findings.
+
+        With ``structure_qc.static_analysis`` enabled (default), the mechanical
+        dimensions come from ``utils.static_analysis`` and the model is asked
+        only about the judgment-based ones; both sets of findings are returned.
+        ``on_finding`` is called with each model finding as soon as it streams in.
+        """
+        settings = self.runtime.config.get("structure_qc", {})
+        analysis = None
+        if settings.get("static_analysis", True):
+            analysis = analyze(
+                raw_code,
+                parsed_code.language,
+                max_unit_lines=settings.get("max_unit_lines", 60),
+                duplicate_window=settings.get("duplicate_window", 4),
+            )
+
+        # Raw code goes first, as its own block — the stable prefix later Structure
+        # QC calls on the same program (repeated or incremental runs) can reuse.
+        payload_settings = self.runtime.config.get("payload", {})
+        facts = (
+            f"=== STATIC ANALYSIS FACTS ===\n{analysis.facts_text()}\n\n" if analysis else ""
+        )
         prompt = (
-            "Please perform a Structure QC review of the code below.\n\n"
+            "Please perform a Structure QC review of the code above.\n\n"
             "=== CODE ANALYSIS SUMMARY ===\n"
-            f"{json.dumps(parsed_code.model_dump(), indent=2)}\n\n"
-            "=== RAW CODE ===\n"
-            f"{raw_code}\n\n"
+            f"{encode_payload(parsed_code, payload_settings)}\n\n"
+            f"{facts}"
             "Assess all structural quality dimensions described in your instructions "
             "and return a finding for each."
         )
+        messages = [
+            {
+                "role": "user",
+                "content": [
+                    self._make_content_block(raw_code),
+                    self._make_content_block(prompt, cacheable=False),
+                ],
+            }
+        ]
 
-        content_block = self._make_content_block(prompt)
-        messages = [{"role": "user", "content": [content_block]}]
-
-        system = self._SYSTEM.replace("{language}", parsed_code.language.upper())
-        return self._stream_parse(messages, system, StructureQCResult)
+        template = self._SYSTEM_JUDGMENT if analysis else self._SYSTEM
+        system = template.replace("{language}", parsed_code.language.upper())
+        result = self._stream_parse(messages, system, StructureQCResult, on_finding)
+        if analysis is None:
+            return result
+        return StructureQCResult(findings=analysis.findings + result.findings)
@@ -0,0 +1 @@
+"""Offline performance benchmarks — run as modules from the project root."""
@@ -0,0 +1,84 @@
+"""Benchmark the bulk findings table in utils.doc_writer against the cell-by-cell original.
+
+Usage (from the project root):
+    python -m benchmarks.bench_doc_writer                        # 100 / 1,000 / 10,000 findings
+    python -m benchmarks.bench_doc_writer --findings 500 5000
+    python -m benchmarks.bench_doc_writer --legacy-max 10000     # really time the legacy 10,000 (hours)
+
+Both builders render the same findings into a fresh document; the XML of the
+two tables is compared so the speed-up never comes from different output.
+The legacy builder is quadratic, so above ``--legacy-max`` its time is
+extrapolated from the largest measured size and marked with "~".
+"""
+
+import argparse
+import time
+
+from docx import Document
+
+from benchmarks.synthetic import make_findings
+from utils.doc_writer import _STATUS_BG, _WHITE, _add_findings_table, _add_header_row, _set_cell_bg
+
+
+def _legacy_add_findings_table(doc, findings) -> None:
+    """The original cell-by-cell implementation, kept for comparison."""
+    headers = ["Title", "Status", "Detail", "Recommendation", "Priority"]
+    table = doc.add_table(rows=1 + len(findings), cols=len(headers))
+    table.style = "Table Grid"
+    _add_header_row(table, headers)
+
+    for row_idx, finding in enumerate(findings, start=1):
+        values = [
+            finding.title,
+            finding.status,
+            finding.detail,
+            finding.recommendation,
+            finding.priority,
+        ]
+        for col_idx, val in enumerate(values):
+            cell = table.cell(row_idx, col_idx)
+            cell.text = val
+            if col_idx == 1:
+                bg = _STATUS_BG.get(finding.status, "FFFFFF")
+                _set_cell_bg(cell, bg)
+                if finding.status == "FAIL" and cell.paragraphs[0].runs:
+                    cell.paragraphs[0].runs[0].font.color.rgb = _WHITE
+
+
+def _measure(build, findings) -> tuple[float, bytes]:
+    """Return (seconds, table XML) for one table build."""
+    doc = Document()
+    start = time.perf_counter()
+    build(doc, findings)
+    seconds = time.perf_counter() - start
+    return seconds, doc.tables[0]._tbl.xml.encode()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--findings", type=int, nargs="+", default=[100, 1000, 10000])
+    parser.add_argument(
+        "--legacy-max", type=int, default=1000,
+        help="Largest size to time the legacy builder at (default: 1000)",
+    )
+    args = parser.parse_args()
+
+    print(f"{'findings':>10}{'legacy s':>12}{'bulk s':>10}{'speed-up':>10}")
+    measured: tuple[int, float] | None = None  # largest (findings, seconds) timed for legacy
+    for count in sorted(args.findings):
+        findings = make_findings(count)
+        bulk_s, bulk_xml = _measure(_add_findings_table, findings)
+        if count > args.legacy_max and measured is not None:
+            legacy_s = measured[1] * (count / measured[0]) ** 2
+            legacy = f"~{legacy_s:.0f}"
+        else:
+            legacy_s, legacy_xml = _measure(_legacy_add_findings_table, findings)
+            if legacy_xml != bulk_xml:
+                raise SystemExit(f"table XML differs at {count} findings")
+            measured = (count, legacy_s)
+            legacy = f"{legacy_s:.3f}"
+        print(f"{count:>10,}{legacy:>12}{bulk_s:>10.3f}{legacy_s / bulk_s:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
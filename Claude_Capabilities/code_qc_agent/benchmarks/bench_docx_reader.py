@@ -0,0 +1,93 @@
+"""Benchmark the single-pass DOCX reader against the python-docx object-model reader.
+
+The previous reader built the full python-docx object model, emitted all
+paragraphs and then all tables, and repeated a merged cell's text in every
+grid cell it spans.  The current one (``utils.file_reader.iter_docx_lines``)
+walks ``word/document.xml`` once in document order and emits each merged
+cell once.  Both are measured on the same document: time, peak memory and
+output size (characters and ~tokens at 4 characters per token).
+
+Usage (from the project root):
+    python -m benchmarks.bench_docx_reader                   # synthetic spec, 2000 rules
+    python -m benchmarks.bench_docx_reader --rules 5000 --merged-every 5
+    python -m benchmarks.bench_docx_reader --docx spec.docx --memory
+"""
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable
+
+from benchmarks.synthetic import make_rules, write_docx
+from utils.file_reader import _read_docx
+
+
+def _legacy_read_docx(path: Path) -> str:
+    """The reader this benchmark replaces, kept verbatim for comparison."""
+    from docx import Document
+    doc = Document(str(path))
+    parts: list[str] = []
+    for para in doc.paragraphs:
+        if not para.text.strip():
+            continue
+        style = para.style.name if para.style is not None else ""
+        if style.startswith("Heading") or style == "Title":
+            parts.append(f"=== {style}: {para.text.strip()} ===")
+        else:
+            parts.append(para.text)
+
+    for table in doc.tables:
+        parts.append("[TABLE]")
+        for row in table.rows:
+            row_text = " | ".join(cell.text.strip() for cell in row.cells)
+            if row_text.strip():
+                parts.append(row_text)
+
+    return "\n".join(parts)
+
+
+def _measure(read: Callable[[Path], str], path: Path, memory: bool) -> tuple[float, float, int]:
+    """Return (seconds, peak MiB or NaN, characters); memory is traced in a separate pass."""
+    start = time.perf_counter()
+    chars = len(read(path))
+    seconds = time.perf_counter() - start
+
+    peak_mib = float("nan")
+    if memory:
+        tracemalloc.start()
+        read(path)
+        peak_mib = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    return seconds, peak_mib, chars
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--docx", help="Document to read (default: generate a synthetic spec)")
+    parser.add_argument("--rules", type=int, default=2000, help="Rules in the synthetic spec")
+    parser.add_argument(
+        "--merged-every", type=int, default=4, help="Add a merged-cell table after every N rules"
+    )
+    parser.add_argument("--memory", action="store_true", help="Trace peak memory of each reader")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(args.docx) if args.docx else write_docx(
+            Path(tmp) / "synthetic.docx", make_rules(args.rules), merged_table_every=args.merged_every
+        )
+
+        print(f"{'reader':<12}{'seconds':>10}{'peak MiB':>10}{'chars':>12}{'~tokens':>10}{'speed-up':>10}")
+        legacy_s, peak, chars = _measure(_legacy_read_docx, path, args.memory)
+        print(f"{'legacy':<12}{legacy_s:>10.2f}{peak:>10.1f}{chars:>12,}{chars // 4:>10,}{1.0:>10.2f}")
+        seconds, peak, new_chars = _measure(_read_docx, path, args.memory)
+        print(
+            f"{'streaming':<12}{seconds:>10.2f}{peak:>10.1f}{new_chars:>12,}{new_chars // 4:>10,}"
+            f"{legacy_s / seconds:>10.2f}"
+        )
+        print(f"\nOutput size: {new_chars / chars - 1:+.1%} characters against the legacy reader.")
+
+
+if __name__ == "__main__":
+    main()
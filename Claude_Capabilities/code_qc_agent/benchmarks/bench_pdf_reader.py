@@ -0,0 +1,59 @@
+"""Benchmark serial vs process-pool PDF extraction in utils.file_reader.
+
+Usage (from the project root):
+    python -m benchmarks.bench_pdf_reader                 # synthetic 300-page PDF
+    python -m benchmarks.bench_pdf_reader --pdf plan.pdf --workers 2 4 8
+    python -m benchmarks.bench_pdf_reader --memory        # also trace peak memory (slow)
+"""
+
+import argparse
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from benchmarks.synthetic import write_pdf
+from utils.file_reader import iter_pdf_pages
+
+
+def _measure(path: Path, workers: int, memory: bool) -> tuple[float, float, int]:
+    """Return (seconds, peak MiB in this process or NaN, characters) for one extraction.
+
+    tracemalloc slows extraction several-fold, so memory is traced in a
+    separate pass and never affects the timing.
+    """
+    start = time.perf_counter()
+    chars = sum(len(page) for page in iter_pdf_pages(path, workers=workers))
+    seconds = time.perf_counter() - start
+
+    peak_mib = float("nan")
+    if memory:
+        tracemalloc.start()
+        for _ in iter_pdf_pages(path, workers=workers):
+            pass
+        peak_mib = tracemalloc.get_traced_memory()[1] / 2**20
+        tracemalloc.stop()
+    return seconds, peak_mib, chars
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--pdf", help="PDF to read (default: generate a synthetic one)")
+    parser.add_argument("--pages", type=int, default=300, help="Pages in the synthetic PDF")
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4])
+    parser.add_argument("--memory", action="store_true", help="Trace peak memory of each mode")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(args.pdf) if args.pdf else write_pdf(Path(tmp) / "synthetic.pdf", args.pages)
+
+        print(f"{'mode':<12}{'seconds':>10}{'peak MiB':>10}{'chars':>12}{'speed-up':>10}")
+        serial_s, peak, chars = _measure(path, 1, args.memory)
+        print(f"{'serial':<12}{serial_s:>10.2f}{peak:>10.1f}{chars:>12,}{1.0:>10.2f}")
+        for workers in args.workers:
+            seconds, peak, chars = _measure(path, workers, args.memory)
+            print(f"{f'{workers} procs':<12}{seconds:>10.2f}{peak:>10.1f}{chars:>12,}{serial_s / seconds:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
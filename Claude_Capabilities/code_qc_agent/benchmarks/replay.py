@@ -0,0 +1,242 @@
+"""Record / replay model client — run the pipeline offline with realistic call latency.
+
+``RecordingClient`` wraps a live Anthropic client and appends every streamed
+structured-output call to a cassette (JSON Lines): the request key, the tool
+input, the time to first token, the total time and the token usage.
+
+``ReplayClient`` stands in for the Anthropic client.  A request whose key is
+in the cassette streams the recorded tool input back over the recorded time
+to first token and total time.  Any other request is answered by a
+``responder`` for its output model (``benchmarks.suite`` derives them from
+the synthetic inputs), falling back to a minimal schema instance, with
+latency modelled as ``ttft_s + output tokens / tokens_per_s``.
+
+Both expose only what ``BaseAgent`` uses: ``messages.stream`` and
+``messages.count_tokens``.
+"""
+
+import hashlib
+import json
+import math
+import re
+import threading
+import time
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Callable
+
+from anthropic.types import Message
+
+from tools.fake_anthropic_server import build_message, schema_instance
+
+_OUTPUT_MODEL = re.compile(r"complete (\w+) object")
+
+
+def request_key(params: dict) -> str:
+    """Content hash of the parts of a request that determine its answer."""
+    material = json.dumps(
+        {k: params.get(k) for k in ("model", "system", "messages", "tools", "thinking")},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+def output_model_name(params: dict) -> str:
+    """The output model a structured-output request asks for (from its tool description)."""
+    match = _OUTPUT_MODEL.search(params["tools"][0].get("description", ""))
+    return match.group(1) if match else ""
+
+
+def _estimate_tokens(value) -> int:
+    return math.ceil(len(json.dumps(value, ensure_ascii=False)) / 4)
+
+
+def load_cassette(path: str | Path) -> dict[str, dict]:
+    """Read a cassette into a dict of request key → recorded call."""
+    entries: dict[str, dict] = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                entry = json.loads(line)
+                entries[entry["key"]] = entry
+    return entries
+
+
+# ---------------------------------------------------------------------------
+# Recording
+# ---------------------------------------------------------------------------
+
+class _RecordingStream:
+    def __init__(self, stream, on_done: Callable[[float | None, object], None]) -> None:
+        self._stream = stream
+        self._on_done = on_done
+        self._start = time.perf_counter()
+        self._ttft: float | None = None
+
+    def __enter__(self) -> "_RecordingStream":
+        self._inner = self._stream.__enter__()
+        return self
+
+    def __exit__(self, *exc) -> bool | None:
+        return self._stream.__exit__(*exc)
+
+    def __iter__(self):
+        for event in self._inner:
+            if self._ttft is None and event.type == "content_block_delta":
+                self._ttft = time.perf_counter() - self._start
+            yield event
+
+    def get_final_message(self):
+        message = self._inner.get_final_message()
+        self._on_done(self._ttft, message)
+        return message
+
+
+class _RecordingMessages:
+    def __init__(self, client: "RecordingClient") -> None:
+        self._client = client
+
+    def stream(self, **params):
+        start = time.perf_counter()
+
+        def on_done(ttft_s: float | None, message) -> None:
+            self._client.record(params, ttft_s, time.perf_counter() - start, message)
+
+        return _RecordingStream(self._client.inner.messages.stream(**params), on_done)
+
+    def __getattr__(self, name: str):
+        return getattr(self._client.inner.messages, name)
+
+
+class RecordingClient:
+    """Wraps a live client; every completed streamed call is appended to ``cassette``."""
+
+    def __init__(self, inner, cassette: str | Path) -> None:
+        self.inner = inner
+        self.cassette = Path(cassette)
+        self.cassette.parent.mkdir(parents=True, exist_ok=True)
+        self.messages = _RecordingMessages(self)
+        self._lock = threading.Lock()
+
+    def record(self, params: dict, ttft_s: float | None, total_s: float, message) -> None:
+        tool_input = next(
+            (b.input for b in message.content if getattr(b, "type", "") == "tool_use"), None
+        )
+        if tool_input is None:
+            return
+        entry = {
+            "key": request_key(params),
+            "output_model": output_model_name(params),
+            "model": params.get("model"),
+            "ttft_s": round(ttft_s if ttft_s is not None else total_s, 4),
+            "total_s": round(total_s, 4),
+            "input_tokens": message.usage.input_tokens,
+            "output_tokens": message.usage.output_tokens,
+            "tool_input": tool_input,
+        }
+        with self._lock, open(self.cassette, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+
+
+# ---------------------------------------------------------------------------
+# Replay
+# ---------------------------------------------------------------------------
+
+class _ReplayStream:
+    """Streams one tool input as ``input_json_delta`` events over the given timings."""
+
+    def __init__(self, message: Message, ttft_s: float, total_s: float, chunk_chars: int = 64) -> None:
+        self._message = message
+        self._ttft_s = ttft_s
+        self._total_s = max(total_s, ttft_s)
+        text = json.dumps(message.content[0].input, ensure_ascii=False)
+        self._parts = [text[i:i + chunk_chars] for i in range(0, len(text), chunk_chars)] or [""]
+
+    def __enter__(self) -> "_ReplayStream":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        return None
+
+    def __iter__(self):
+        start = time.perf_counter()
+        yield SimpleNamespace(type="message_start")
+        step = (self._total_s - self._ttft_s) / len(self._parts)
+        for i, part in enumerate(self._parts):
+            # Sleep until this chunk's due time, so slow consumers are not double-charged
+            due = self._ttft_s + i * step - (time.perf_counter() - start)
+            if due > 0:
+                time.sleep(due)
+            yield SimpleNamespace(
+                type="content_block_delta",
+                delta=SimpleNamespace(type="input_json_delta", partial_json=part),
+            )
+        yield SimpleNamespace(type="message_stop")
+
+    def get_final_message(self) -> Message:
+        return self._message
+
+
+class _ReplayMessages:
+    def __init__(self, client: "ReplayClient") -> None:
+        self._client = client
+
+    def stream(self, **params) -> _ReplayStream:
+        return self._client.respond(params)
+
+    def count_tokens(self, **params):
+        return SimpleNamespace(input_tokens=_estimate_tokens([params.get("system"), params.get("messages")]))
+
+
+class ReplayClient:
+    """Offline stand-in for ``anthropic.Anthropic`` (see the module docstring).
+
+    ``latency_scale`` multiplies every replayed or modelled delay (0 = instant).
+    ``hits`` / ``misses`` count requests answered from the cassette or not.
+    """
+
+    def __init__(
+        self,
+        cassette: str | Path | None = None,
+        responders: dict[str, Callable[[dict], dict]] | None = None,
+        ttft_s: float = 0.8,
+        tokens_per_s: float = 80.0,
+        latency_scale: float = 1.0,
+    ) -> None:
+        self.recorded = load_cassette(cassette) if cassette else {}
+        self.responders = responders or {}
+        self.ttft_s = ttft_s
+        self.tokens_per_s = tokens_per_s
+        self.latency_scale = latency_scale
+        self.hits = 0
+        self.misses = 0
+        self.messages = _ReplayMessages(self)
+        self._lock = threading.Lock()
+
+    def respond(self, params: dict) -> _ReplayStream:
+        message = build_message(params)
+        entry = self.recorded.get(request_key(params))
+        with self._lock:
+            if entry is not None:
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if entry is not None:
+            tool_input = entry["tool_input"]
+            ttft_s, total_s = entry["ttft_s"], entry["total_s"]
+        else:
+            responder = self.responders.get(output_model_name(params))
+            schema = params["tools"][0]["input_schema"]
+            tool_input = responder(params) if responder else schema_instance(schema)
+            ttft_s = self.ttft_s
+            total_s = ttft_s + _estimate_tokens(tool_input) / self.tokens_per_s
+
+        message["content"][0]["input"] = tool_input
+        message["usage"]["output_tokens"] = _estimate_tokens(tool_input)
+        return _ReplayStream(
+            Message.model_validate(message),
+            ttft_s * self.latency_scale,
+            total_s * self.latency_scale,
+        )
@@ -0,0 +1,383 @@
+"""Offline benchmark suite — readers, pipeline stages and report writing, with a baseline.
+
+Generates synthetic specs (.xlsx / .docx / .pdf) and programs (.py / .R / .sas)
+at several sizes and measures, for each size:
+
+    read_sot/<format>/<size>      utils.file_reader.read_sot_file
+    read_code/<language>/<size>   utils.file_reader.read_code_file
+    pipeline/<size>/<stage>       Orchestrator stage wall times (RunMetrics), and .../total
+    write_report/<size>           utils.doc_writer.write_report
+
+Model calls go to ``benchmarks.replay.ReplayClient``: recorded responses from
+``--cassette`` where the request matches, otherwise answers derived from the
+synthetic inputs with modelled latency.  Every result has ``seconds`` and
+``peak_mib`` (tracemalloc, measured in a second pass with model latency off
+so tracing never affects the timings).
+
+Usage (from the project root):
+    python -m benchmarks.suite                              # run and compare with the baseline
+    python -m benchmarks.suite --save-baseline              # accept this run as the new baseline
+    python -m benchmarks.suite --sizes small --latency-scale 0.1
+    python -m benchmarks.suite --cassette benchmarks/cassettes/live.jsonl
+    python -m benchmarks.suite --record benchmarks/cassettes/live.jsonl   # live API, records calls
+
+A result regresses when it exceeds its baseline by more than the relative
+threshold in ``benchmarks/thresholds.yaml`` (and by more than the noise
+floor); the exit status is 1 if any result regressed.
+"""
+
+import argparse
+import copy
+import fnmatch
+import json
+import os
+import platform
+import re
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+import yaml
+
+from agents.orchestrator import Orchestrator
+from agents.runtime import Runtime, load_settings
+from benchmarks.replay import RecordingClient, ReplayClient
+from benchmarks.synthetic import (
+    make_findings,
+    make_rules,
+    write_docx,
+    write_pdf,
+    write_program,
+    write_xlsx,
+)
+from utils.doc_writer import write_report
+from utils.file_reader import read_code_file, read_sot_file
+from utils.models import LogicQCResult, StructureQCResult
+from utils.response_cache import BYPASS_ENV
+
+BENCH_DIR = Path(__file__).parent
+
+# rules in the spec / functions or DATA steps in each program
+SIZES = {
+    "small": {"rules": 20, "units": 20},
+    "medium": {"rules": 100, "units": 80},
+    "large": {"rules": 400, "units": 300},
+}
+LANGUAGES = ("python", "r", "sas")
+
+_RULE_TITLE = re.compile(r"Rule \d{4} derivation of VAR\d{4}")
+_UNIT_NAME = re.compile(r"derive_var\d{4}|data work\.var\d{4}")
+
+
+# ---------------------------------------------------------------------------
+# Measurement
+# ---------------------------------------------------------------------------
+
+def measure(fn: Callable[[], object], memory_fn: Callable[[], object] | None = None) -> dict:
+    """Time ``fn``; then run ``memory_fn`` (default ``fn``) under tracemalloc for the peak."""
+    start = time.perf_counter()
+    fn()
+    seconds = time.perf_counter() - start
+
+    tracemalloc.start()
+    (memory_fn or fn)()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {"seconds": round(seconds, 4), "peak_mib": round(peak / 2**20, 2)}
+
+
+# ---------------------------------------------------------------------------
+# Synthetic model answers
+# ---------------------------------------------------------------------------
+
+def synthetic_responders(rules: list[dict], sections: list[dict], language: str) -> dict:
+    """Answers per output model, sized to the rules / units named in each request."""
+    rules_by_title = {r["title"]: r for r in rules}
+    sections_by_name = {s["name"]: s for s in sections}
+
+    def request_text(params: dict) -> str:
+        return json.dumps(params["messages"], ensure_ascii=False)
+
+    def named_rules(params: dict) -> list[dict]:
+        titles = dict.fromkeys(_RULE_TITLE.findall(request_text(params)))
+        return [rules_by_title[t] for t in titles if t in rules_by_title]
+
+    def parsed_doc(params: dict) -> dict:
+        found = named_rules(params)
+        return {
+            "domain": "Synthetic derivations",
+            "rules": [
+                {"title": r["title"], "description": r["description"], "variables": r["variables"]}
+                for r in found
+            ],
+            "variables": [
+                {"name": r["variables"][0], "definition": f"Derived from {r['variables'][1]}"}
+                for r in found
+            ],
+        }
+
+    def parsed_code(params: dict) -> dict:
+        names = dict.fromkeys(_UNIT_NAME.findall(request_text(params)))
+        # "data work.var0001" (SAS) names the same unit as "derive_var0001"
+        keys = (n if n.startswith("derive_") else f"derive_{n.split('.')[-1]}" for n in names)
+        found = [sections_by_name[k] for k in keys if k in sections_by_name]
+        return {
+            "language": language,
+            "summary": f"Derives {len(found)} variable(s).",
+            "sections": [
+                {
+                    "name": s["name"],
+                    "description": f"Derives {s['variables'][0]}",
+                    "code_snippet": s["code_snippet"],
+                    "line_range": s["line_range"],
+                }
+                for s in found
+            ],
+            "variables": [v for s in found for v in s["variables"]],
+            "transformations": [f"{s['variables'][0]} from {s['variables'][1]}" for s in found],
+            "filters": [],
+            "hardcoded_values": [],
+        }
+
+    def logic_result(params: dict) -> dict:
+        statuses = ("PASS", "PASS", "FAIL", "WARNING")
+        return {
+            "findings": [
+                {
+                    "title": r["title"],
+                    "status": statuses[i % 4],
+                    "detail": f"{r['variables'][0]} is derived as specified from {r['variables'][1]}.",
+                    "recommendation": "None required" if i % 4 < 2 else "Align the derivation with the spec.",
+                    "priority": "Low" if i % 4 < 2 else "High",
+                    "rule": r["title"],
+                }
+                for i, r in enumerate(named_rules(params))
+            ]
+        }
+
+    def structure_result(params: dict) -> dict:
+        return {
+            "findings": [
+                {
+                    "title": title,
+                    "status": "PASS",
+                    "detail": "Consistent throughout the program.",
+                    "recommendation": "None required",
+                    "priority": "Low",
+                }
+                for title in ("Modularity", "Readability", "Error handling", "Logging")
+            ]
+        }
+
+    return {
+        "ParsedDoc": parsed_doc,
+        "ParsedCode": parsed_code,
+        "LogicQCResult": logic_result,
+        "StructureQCResult": structure_result,
+    }
+
+
+# ---------------------------------------------------------------------------
+# Benchmarks
+# ---------------------------------------------------------------------------
+
+def bench_readers(work: Path, size: str, rules: list[dict], units: int) -> dict[str, dict]:
+    results: dict[str, dict] = {}
+    specs = {
+        "xlsx": write_xlsx(work / f"spec_{size}.xlsx", rules),
+        "docx": write_docx(work / f"spec_{size}.docx", rules),
+        "pdf": write_pdf(work / f"spec_{size}.pdf", pages=max(1, len(rules) // 10)),
+    }
+    for fmt, path in specs.items():
+        results[f"read_sot/{fmt}/{size}"] = measure(lambda: read_sot_file(str(path)))
+    for language in LANGUAGES:
+        path, _ = write_program(work / f"prog_{size}", language, units)
+        results[f"read_code/{language}/{size}"] = measure(lambda: read_code_file(str(path)))
+    return results
+
+
+def _pipeline_config() -> dict:
+    config = copy.deepcopy(load_settings())
+    config.setdefault("cache", {})["enabled"] = False
+    config.setdefault("checkpoints", {})["enabled"] = False
+    config.setdefault("scheduler", {}).update(requests_per_minute=0, input_tokens_per_minute=0)
+    config.setdefault("report", {})["formats"] = ["docx"]
+    config.setdefault("metrics", {}).update(json=True, prometheus=False)
+    return config
+
+
+def bench_pipeline(
+    work: Path,
+    size: str,
+    rules: list[dict],
+    units: int,
+    client_factory: Callable[[dict], object],
+) -> dict[str, dict]:
+    """Run the whole pipeline on the xlsx spec and the SAS program of ``size``."""
+    sot_path = write_xlsx(work / f"pipeline_{size}.xlsx", rules)
+    code_path, sections = write_program(work / f"pipeline_{size}", "sas", units)
+    responders = synthetic_responders(rules, sections, "sas")
+    config = _pipeline_config()
+
+    def run(latency: bool) -> dict:
+        runtime = Runtime(config=config, client=client_factory(responders, latency))
+        out = work / f"out_{size}_{'timed' if latency else 'traced'}"
+        report = Orchestrator(verbose=False, state_dir=str(out / "state"), runtime=runtime).run(
+            str(sot_path), str(code_path), output_dir=str(out)
+        )
+        return json.loads(Path(report).with_suffix(".metrics.json").read_text(encoding="utf-8"))
+
+    start = time.perf_counter()
+    record = run(latency=True)
+    total = time.perf_counter() - start
+
+    tracemalloc.start()
+    run(latency=False)
+    peak = round(tracemalloc.get_traced_memory()[1] / 2**20, 2)
+    tracemalloc.stop()
+
+    results = {
+        f"pipeline/{size}/{stage}": {"seconds": round(seconds, 4)}
+        for stage, seconds in record["stages"].items()
+    }
+    results[f"pipeline/{size}/total"] = {"seconds": round(total, 4), "peak_mib": peak}
+    return results
+
+
+def bench_report(work: Path, size: str, findings: int) -> dict[str, dict]:
+    items = make_findings(findings)
+    logic = LogicQCResult(findings=items[: findings // 2])
+    structure = StructureQCResult(findings=items[findings // 2:])
+    path = work / f"report_{size}.docx"
+    return {
+        f"write_report/{size}": measure(
+            lambda: write_report("spec.xlsx", "prog.sas", logic, structure, str(path))
+        )
+    }
+
+
+# ---------------------------------------------------------------------------
+# Baseline comparison
+# ---------------------------------------------------------------------------
+
+def load_thresholds(path: str | Path) -> dict:
+    with open(path, encoding="utf-8") as f:
+        return yaml.safe_load(f) or {}
+
+
+def compare(results: dict[str, dict], baseline: dict[str, dict], thresholds: dict) -> list[str]:
+    """Return one line per metric that regressed against ``baseline``."""
+    default = thresholds.get("default", {})
+    floor = thresholds.get("floor", {})
+    overrides = thresholds.get("overrides", {}) or {}
+    regressions = []
+    for name, current in results.items():
+        before = baseline.get(name)
+        if before is None:
+            continue
+        limits = dict(default)
+        for pattern, override in overrides.items():
+            if fnmatch.fnmatch(name, pattern):
+                limits.update(override)
+                break
+        for metric, value in current.items():
+            old = before.get(metric)
+            if old is None or metric not in limits:
+                continue
+            allowed = old * (1 + limits[metric])
+            if value > allowed and value - old > floor.get(metric, 0):
+                regressions.append(
+                    f"{name} {metric}: {value:g} vs baseline {old:g} (+{value / old - 1:.0%} "
+                    f"> +{limits[metric]:.0%})" if old else f"{name} {metric}: {value:g} vs baseline 0"
+                )
+    return regressions
+
+
+# ---------------------------------------------------------------------------
+# CLI
+# ---------------------------------------------------------------------------
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", nargs="+", choices=list(SIZES), default=["small", "medium"])
+    parser.add_argument("--cassette", help="Recorded model responses to replay (JSON Lines)")
+    parser.add_argument("--record", help="Call the live API and append its responses to this cassette")
+    parser.add_argument(
+        "--latency-scale", type=float, default=1.0, help="Multiply replayed model latency (0 = none)"
+    )
+    parser.add_argument("--baseline", default=str(BENCH_DIR / "baseline.json"))
+    parser.add_argument("--thresholds", default=str(BENCH_DIR / "thresholds.yaml"))
+    parser.add_argument("--save-baseline", action="store_true", help="Write this run as the baseline")
+    parser.add_argument("--output", help="Also write this run's results to a JSON file")
+    args = parser.parse_args()
+
+    os.environ[BYPASS_ENV] = "1"  # every call must reach the (replay) client
+
+    def client_factory(responders: dict, latency: bool):
+        if args.record:
+            return RecordingClient(Runtime.default().client, args.record)
+        return ReplayClient(
+            cassette=args.cassette,
+            responders=responders,
+            latency_scale=args.latency_scale if latency else 0.0,
+        )
+
+    results: dict[str, dict] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        work = Path(tmp)
+        for size in args.sizes:
+            spec = SIZES[size]
+            rules = make_rules(spec["rules"])
+            print(f"[{size}] {spec['rules']} rules, {spec['units']} units per program")
+            results.update(bench_readers(work, size, rules, spec["units"]))
+            results.update(bench_pipeline(work, size, rules, spec["units"], client_factory))
+            results.update(bench_report(work, size, spec["rules"]))
+
+    print(f"\n{'result':<34}{'seconds':>10}{'peak MiB':>10}")
+    for name, value in results.items():
+        peak = value.get("peak_mib")
+        print(f"{name:<34}{value['seconds']:>10.3f}{'' if peak is None else f'{peak:.1f}':>10}")
+
+    record = {
+        "meta": {
+            "created": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "sizes": args.sizes,
+            "latency_scale": args.latency_scale,
+            "cassette": args.cassette or "",
+        },
+        "results": results,
+    }
+    if args.output:
+        Path(args.output).write_text(json.dumps(record, indent=2), encoding="utf-8")
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        baseline_path.write_text(json.dumps(record, indent=2), encoding="utf-8")
+        print(f"\nBaseline saved to {baseline_path}")
+        return
+    if not baseline_path.exists():
+        print(f"\nNo baseline at {baseline_path} — run with --save-baseline to create one.")
+        return
+
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    for key in ("latency_scale", "cassette"):
+        if baseline["meta"].get(key) != record["meta"][key]:
+            print(f"\nNote: baseline was recorded with {key}={baseline['meta'].get(key)!r}.")
+    regressions = compare(results, baseline["results"], load_thresholds(args.thresholds))
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) against {baseline_path}:")
+        for line in regressions:
+            print(f"  ✗ {line}")
+        sys.exit(1)
+    print(f"\nNo regressions against {baseline_path}.")
+
+
+if __name__ == "__main__":
+    main()
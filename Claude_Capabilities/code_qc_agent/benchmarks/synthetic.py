@@ -0,0 +1,190 @@
+"""Synthetic input generators for the benchmarks (no network, no extra dependencies).
+
+Every generator is deterministic, so the same size always yields the same
+extracted text — and therefore the same prompts, which is what lets recorded
+model responses (``benchmarks.replay``) be replayed against regenerated files.
+"""
+
+from pathlib import Path
+
+_LOREM = (
+    "The derived variable must be computed from the collected value after applying "
+    "the visit window and baseline flag rules described in this section"
+)
+
+
+def write_pdf(path: str | Path, pages: int, lines_per_page: int = 40) -> Path:
+    """Write a plain-text PDF with ``pages`` pages using only the PDF 1.4 core syntax."""
+    path = Path(path)
+    objects: list[bytes] = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        b"",  # Pages object, filled in once the page object numbers are known
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    ]
+    page_ids: list[int] = []
+    for n in range(1, pages + 1):
+        lines = [f"Page {n} rule {i}: {_LOREM}." for i in range(lines_per_page)]
+        ops = ["BT", "/F1 8 Tf", "10 TL", "20 780 Td"]
+        ops += [f"({line[:110]}) Tj T*" for line in lines]
+        ops.append("ET")
+        stream = "\n".join(ops).encode("latin-1")
+        objects.append(b"<< /Length %d >>\nstream\n%s\nendstream" % (len(stream), stream))
+        content_id = len(objects)
+        objects.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % content_id
+        )
+        page_ids.append(len(objects))
+    kids = b" ".join(b"%d 0 R" % i for i in page_ids)
+    objects[1] = b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_ids))
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets: list[int] = []
+    for i, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += b"%d 0 obj\n%s\nendobj\n" % (i, body)
+    xref = len(out)
+    out += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objects) + 1)
+    out += b"".join(b"%010d 00000 n \n" % off for off in offsets)
+    out += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objects) + 1, xref)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(bytes(out))
+    return path
+
+
+def make_findings(count: int) -> list:
+    """Return ``count`` QC findings cycling through every status and priority."""
+    from utils.models import QCFinding
+
+    statuses = ("PASS", "FAIL", "WARNING")
+    priorities = ("High", "Medium", "Low")
+    return [
+        QCFinding(
+            title=f"Rule {i}: derived variable check",
+            status=statuses[i % 3],
+            detail=f"{_LOREM} (finding {i}).\nSecond line of detail.",
+            recommendation="Apply the visit window before deriving the baseline flag.",
+            priority=priorities[i % 3],
+            rule=f"Rule {i}",
+        )
+        for i in range(count)
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Specs
+# ---------------------------------------------------------------------------
+
+def make_rules(count: int) -> list[dict]:
+    """Return ``count`` spec rules as dicts with title, description and variables."""
+    return [
+        {
+            "title": f"Rule {i:04d} derivation of VAR{i:04d}",
+            "description": f"VAR{i:04d} is derived from SRC{i % 50:02d}. {_LOREM}.",
+            "variables": [f"VAR{i:04d}", f"SRC{i % 50:02d}"],
+        }
+        for i in range(count)
+    ]
+
+
+def write_xlsx(path: str | Path, rules: list[dict]) -> Path:
+    """Write a spec workbook with one rule per row (Variable, Title, Derivation)."""
+    from openpyxl import Workbook
+
+    path = Path(path)
+    workbook = Workbook(write_only=True)
+    sheet = workbook.create_sheet("Spec")
+    sheet.append(["Variable", "Title", "Derivation"])
+    for rule in rules:
+        sheet.append([rule["variables"][0], rule["title"], rule["description"]])
+    path.parent.mkdir(parents=True, exist_ok=True)
+    workbook.save(path)
+    return path
+
+
+def write_docx(path: str | Path, rules: list[dict], merged_table_every: int = 0) -> Path:
+    """Write a spec document: a heading and paragraph per rule, plus a variable table.
+
+    With ``merged_table_every`` > 0, every that many rules are followed by a
+    code-list table whose title row is merged across all columns and whose
+    first column is merged down the rows — the layout specs commonly use.
+    """
+    from docx import Document
+
+    path = Path(path)
+    doc = Document()
+    doc.add_heading("Derivation specification", level=1)
+    for i, rule in enumerate(rules, 1):
+        doc.add_heading(rule["title"], level=2)
+        doc.add_paragraph(rule["description"])
+        if merged_table_every and i % merged_table_every == 0:
+            _add_merged_table(doc, rule)
+    table = doc.add_table(rows=1 + len(rules), cols=2)
+    table.rows[0].cells[0].text = "Variable"
+    table.rows[0].cells[1].text = "Source"
+    for row, rule in zip(table.rows[1:], rules):
+        row.cells[0].text, row.cells[1].text = rule["variables"]
+    path.parent.mkdir(parents=True, exist_ok=True)
+    doc.save(path)
+    return path
+
+
+def _add_merged_table(doc, rule: dict, codes: int = 6, columns: int = 4) -> None:
+    var = rule["variables"][0]
+    table = doc.add_table(rows=1 + codes, cols=columns)
+    title = table.cell(0, 0).merge(table.cell(0, columns - 1))
+    title.text = f"Code list for {var} — {rule['description']}"
+    group = table.cell(1, 0).merge(table.cell(codes, 0))
+    group.text = f"{var} categories derived per the rule above"
+    for r in range(1, codes + 1):
+        table.cell(r, 1).text = f"C{r:02d}"
+        table.cell(r, 2).text = f"Category {r} of {var}"
+        table.cell(r, 3).text = str(r * 10)
+
+
+# ---------------------------------------------------------------------------
+# Programs
+# ---------------------------------------------------------------------------
+
+_PROGRAM_EXT = {"python": ".py", "r": ".R", "sas": ".sas"}
+
+
+def _unit(language: str, i: int, body_lines: int) -> list[str]:
+    """One function / DATA step deriving VAR<i>."""
+    var, src = f"VAR{i:04d}", f"SRC{i % 50:02d}"
+    if language == "python":
+        body = [f"    df['{var}'] = df['{src}'] * {i % 7 + 1}  # step {k}" for k in range(body_lines)]
+        return [f"def derive_{var.lower()}(df):", f'    """Derive {var}."""', *body, "    return df", ""]
+    if language == "r":
+        body = [f"  df${var} <- df${src} * {i % 7 + 1}  # step {k}" for k in range(body_lines)]
+        return [f"derive_{var.lower()} <- function(df) {{", *body, "  df", "}", ""]
+    body = [f"  {var} = {src} * {i % 7 + 1}; /* step {k} */" for k in range(body_lines)]
+    return [f"data work.{var.lower()};", "  set work.adsl;", *body, "run;", ""]
+
+
+def write_program(
+    path: str | Path, language: str, units: int, body_lines: int = 8
+) -> tuple[Path, list[dict]]:
+    """Write a program of ``units`` functions / DATA steps; return (path, sections).
+
+    Each section dict has the name, line range and variables of one unit.
+    """
+    path = Path(path).with_suffix(_PROGRAM_EXT[language])
+    lines: list[str] = []
+    sections: list[dict] = []
+    for i in range(units):
+        unit = _unit(language, i, body_lines)
+        start = len(lines) + 1
+        lines.extend(unit)
+        sections.append(
+            {
+                "name": f"derive_var{i:04d}",
+                "line_range": f"{start}-{len(lines) - 1}",
+                "variables": [f"VAR{i:04d}", f"SRC{i % 50:02d}"],
+                "code_snippet": unit[0],
+            }
+        )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path, sections
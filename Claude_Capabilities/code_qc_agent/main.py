@@ -2,11 +2,35 @@
 
 Usage:
     python main.py
+    python main.py --batch [--manifest pairs.csv] [--workers N]
+    python main.py --no-cache          # ignore cached model responses
+    python main.py --incremental       # re-QC only what changed since the last run
+    python main.py --formats sarif,json   # report formats for this run (default: report.formats)
+    python main.py --bulk [--manifest pairs.csv]   # submit via the Message Batches API
+    python main.py --bulk --resume outputs/bulk/job_YYYYMMDD_HHMMSS
+    python main.py --daemon [--workers N] [--port 8787]
 
-Auto-detects the first file in inputs/source_of_truth/ and inputs/code/,
-runs the full QC pipeline, and writes a Word report to outputs/reports/.
+Without arguments, auto-detects the first file in inputs/source_of_truth/ and
+inputs/code/, runs the full QC pipeline, and writes the reports selected in
+report.formats (a Word report by default) to outputs/reports/.
+
+With --batch, QCs many spec/code pairs on a pool of concurrent pipelines.
+Pairs come from a CSV manifest (columns: sot, code) or, by default, from the
+two input directories: a single spec is paired with every code file,
+otherwise files are paired by matching file stem.
+
+With --bulk, the same pairs are QC'd through asynchronous message batches
+(cheaper, not interactive); the job's state is saved so an interrupted run
+can be continued with --resume.
+
+With --daemon, the process stays up with a warm runtime: new or changed pairs
+in the two input directories, and pairs POSTed to the local HTTP API, are
+queued and QC'd on a worker pool; GET /status reports the queue depth and
+stage latencies.
 """
 
+import argparse
+import os
 import sys
 from pathlib import Path
 
@@ -22,7 +46,145 @@ def _find_first_file(directory: str) -> Path | None:
     return None
 
 
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Code QC Agent")
+    parser.add_argument("--batch", action="store_true", help="QC many spec/code pairs")
+    parser.add_argument(
+        "--bulk", action="store_true", help="QC many pairs through the Message Batches API"
+    )
+    parser.add_argument("--resume", help="Bulk job directory to continue")
+    parser.add_argument(
+        "--daemon", action="store_true", help="Keep running: watch the inputs and serve a job API"
+    )
+    parser.add_argument("--port", type=int, help="HTTP port in daemon mode (default: daemon.port)")
+    parser.add_argument("--manifest", help="CSV manifest of pairs (columns: sot, code)")
+    parser.add_argument("--workers", type=int, help="Concurrent pipelines in batch or daemon mode")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the model response cache")
+    parser.add_argument(
+        "--incremental", action="store_true", help="Re-QC only the parts changed since the last run"
+    )
+    parser.add_argument(
+        "--formats", help="Comma-separated report formats (docx, json, markdown, html, sarif)"
+    )
+    return parser.parse_args()
+
+
+def _load_pairs(args: argparse.Namespace) -> list:
+    from agents.batch_runner import pairs_from_directories, pairs_from_manifest
+
+    if args.manifest:
+        pairs = pairs_from_manifest(args.manifest)
+    else:
+        pairs = pairs_from_directories("inputs/source_of_truth", "inputs/code")
+
+    if not pairs:
+        print("ERROR — no spec/code pairs found for batch mode.")
+        sys.exit(1)
+    return pairs
+
+
+def _print_summary(results: list) -> None:
+    failed = [r for r in results if not r.ok]
+
+    print()
+    print("=" * 60)
+    print(f"  {len(results) - len(failed)} succeeded | {len(failed)} failed")
+    for r in failed:
+        print(f"  • {Path(r.pair.code_path).name}: {r.error}")
+    print("=" * 60)
+
+    if failed:
+        sys.exit(1)
+
+
+def _run_batch(args: argparse.Namespace) -> None:
+    from agents.batch_runner import BatchRunner
+    from agents.runtime import Runtime
+
+    pairs = _load_pairs(args)
+
+    # The process-wide runtime loads .env and settings.yaml once; BatchRunner shares it
+    runtime = Runtime.default()
+    workers = args.workers
+    if workers is None:
+        workers = runtime.config.get("batch", {}).get("workers", 4)
+
+    print("=" * 60)
+    print("  Code QC Agent — batch mode")
+    print("=" * 60)
+    print(f"  Pairs   : {len(pairs)}")
+    print(f"  Workers : {workers}")
+    print("=" * 60)
+    print()
+
+    results = BatchRunner(workers=workers, incremental=args.incremental, runtime=runtime).run(pairs)
+    _print_summary(results)
+
+
+def _run_bulk(args: argparse.Namespace) -> None:
+    from agents.bulk_runner import BulkRunner
+
+    if args.resume:
+        runner = BulkRunner(args.resume)
+    else:
+        runner = BulkRunner.create(_load_pairs(args))
+
+    print("=" * 60)
+    print("  Code QC Agent — bulk mode (Message Batches)")
+    print("=" * 60)
+    print(f"  Job     : {runner.job_dir}")
+    print(f"  Pairs   : {len(runner.job.pairs)}")
+    print("=" * 60)
+    print()
+
+    _print_summary(runner.run())
+
+
+def _run_daemon(args: argparse.Namespace) -> None:
+    from agents.daemon import QCDaemon
+
+    daemon = QCDaemon(workers=args.workers, incremental=args.incremental)
+    if args.port is not None:
+        daemon.port = args.port
+    daemon.start()
+
+    print("=" * 60)
+    print("  Code QC Agent — daemon mode (Ctrl+C to stop)")
+    print("=" * 60)
+    print(f"  Workers : {daemon.workers}")
+    if daemon.watch:
+        print(f"  Watching: {daemon.sot_dir}, {daemon.code_dir}")
+    if daemon.api_url:
+        print(f"  API     : {daemon.api_url}/status")
+    print("=" * 60)
+    print()
+
+    daemon.wait()
+
+
 def main() -> None:
+    args = _parse_args()
+    if args.no_cache:
+        from utils.response_cache import BYPASS_ENV
+
+        os.environ[BYPASS_ENV] = "1"
+    if args.formats:
+        from utils.report_writers import FORMATS_ENV
+
+        os.environ[FORMATS_ENV] = args.formats
+
+    if args.bulk or args.resume:
+        _run_bulk(args)
+        return
+
+    if args.daemon:
+        _run_daemon(args)
+        return
+
+    if args.batch:
+        _run_batch(args)
+        return
+
     sot_path = _find_first_file("inputs/source_of_truth")
     code_path = _find_first_file("inputs/code")
 
@@ -54,7 +216,7 @@ def main() -> None:
 
     from agents.orchestrator import Orchestrator
 
-    report_path = Orchestrator().run(str(sot_path), str(code_path))
+    report_path = Orchestrator(incremental=args.incremental).run(str(sot_path), str(code_path))
 
     print()
     print("=" * 60)
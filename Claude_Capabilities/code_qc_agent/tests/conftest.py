@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# The pipeline imports its packages (agents, utils, tools) from the project root.
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
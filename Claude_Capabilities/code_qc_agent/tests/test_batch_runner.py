@@ -0,0 +1,29 @@
+import threading
+
+import pytest
+
+from agents.batch_runner import BatchRunner
+
+
+class _FailingOrchestrator:
+    def __init__(self) -> None:
+        self.loads = 0
+
+    def load_spec(self, sot_path):
+        self.loads += 1
+        raise ValueError(f"Unsupported source-of-truth format: {sot_path!r}")
+
+
+def test_a_shared_spec_that_fails_to_load_fails_every_pair_without_reparsing():
+    runner = BatchRunner(runtime=object())
+    runner._spec_locks = {"spec.txt": threading.Lock()}
+    orchestrator = _FailingOrchestrator()
+
+    errors = []
+    for _ in range(3):
+        with pytest.raises(ValueError) as info:
+            runner._shared_spec(orchestrator, "spec.txt")
+        errors.append(info.value)
+
+    assert orchestrator.loads == 1
+    assert errors[0] is errors[1] is errors[2]
@@ -0,0 +1,69 @@
+import os
+import time
+from pathlib import Path
+
+from utils import checkpoints
+from utils.checkpoints import RunCheckpoints, prune
+from utils.models import INCOMPLETE_TITLE, LogicQCResult, ParsedDoc, QCFinding
+from utils.response_cache import BYPASS_ENV
+
+
+def _finding(title: str, status: str = "PASS") -> QCFinding:
+    return QCFinding(title=title, status=status, detail="", recommendation="", priority="Low")
+
+
+def test_complete_stage_result_is_saved(tmp_path):
+    saved = RunCheckpoints(tmp_path, "a" * 64, "prog_0123")
+    result = LogicQCResult(findings=[_finding("Rule holds")])
+    saved.save("logic_qc", result)
+    assert saved.load("logic_qc") == result
+
+
+def test_result_cut_short_by_budget_is_not_saved(tmp_path):
+    saved = RunCheckpoints(tmp_path, "a" * 64, "prog_0123")
+    partial = LogicQCResult(findings=[_finding("Rule holds"), _finding(INCOMPLETE_TITLE, "WARNING")])
+    saved.save("logic_qc", partial)
+    assert saved.load("logic_qc") is None
+
+
+def _doc():
+    return ParsedDoc(domain="SDTM", rules=[], variables=[])
+
+
+def test_parsed_doc_is_keyed_by_parser_version(tmp_path):
+    RunCheckpoints(tmp_path, "b" * 64, doc_version="v1").save("doc_parse", _doc())
+    assert RunCheckpoints(tmp_path, "b" * 64, doc_version="v1").load("doc_parse") == _doc()
+    assert RunCheckpoints(tmp_path, "b" * 64, doc_version="v2").load("doc_parse") is None
+
+
+def test_parsed_doc_reuse_honours_cache_bypass(tmp_path, monkeypatch):
+    RunCheckpoints(tmp_path, "b" * 64, doc_version="v1").save("doc_parse", _doc())
+    assert RunCheckpoints(tmp_path, "b" * 64, doc_version="v1", reuse_doc=False).load("doc_parse") is None
+    monkeypatch.setenv(BYPASS_ENV, "1")
+    assert RunCheckpoints(tmp_path, "b" * 64, doc_version="v1").load("doc_parse") is None
+
+
+def test_old_checkpoints_are_pruned(tmp_path):
+    saved = RunCheckpoints(tmp_path, "b" * 64, doc_version="v1")
+    saved.save("doc_parse", _doc())
+    path = next(tmp_path.rglob("*.json"))
+    old = time.time() - 3 * 86400
+    os.utime(path, (old, old))
+    assert RunCheckpoints(tmp_path, "b" * 64, doc_version="v1", max_age_days=2).load("doc_parse") is None
+
+    saved.save("doc_parse", _doc())
+    os.utime(path, (old, old))
+    fresh = tmp_path / ("c" * 16)
+    fresh.mkdir()  # just created by another run: kept although empty
+    os.utime(saved.spec_dir, (old, old))
+    prune(tmp_path, max_age_days=2)
+    assert list(tmp_path.iterdir()) == [fresh]
+
+
+def test_prune_once_scans_each_root_once_per_process(tmp_path, monkeypatch):
+    passes: list[Path] = []
+    monkeypatch.setattr(checkpoints, "prune", lambda root, max_age_days: passes.append(root))
+    for _ in range(3):
+        checkpoints.prune_once(tmp_path / "a", 30)
+    checkpoints.prune_once(tmp_path / "b", 30)
+    assert passes == [tmp_path / "a", tmp_path / "b"]
@@ -0,0 +1,109 @@
+import pytest
+
+from benchmarks.synthetic import write_program
+from utils.code_chunking import code_boundaries, merge_parsed_code, split_code
+from utils.models import ParsedCode, Section
+
+
+def _assert_covers(chunks, source: str, max_lines: int) -> None:
+    """Chunks are contiguous, cover every line exactly once and respect the size limit."""
+    lines = source.splitlines()
+    assert chunks[0].start_line == 1 and chunks[-1].end_line == len(lines)
+    for before, after in zip(chunks, chunks[1:]):
+        assert after.start_line == before.end_line + 1
+    for chunk in chunks:
+        assert chunk.end_line - chunk.start_line + 1 <= max_lines
+        assert chunk.text == "\n".join(lines[chunk.start_line - 1:chunk.end_line])
+
+
+@pytest.mark.parametrize("language", ["python", "r", "sas"])
+def test_chunks_cover_the_program_and_cut_only_between_units(tmp_path, language):
+    path, sections = write_program(tmp_path / "prog", language, units=20, body_lines=6)
+    source = path.read_text(encoding="utf-8")
+    chunks = split_code(source, language, max_lines=40)
+
+    assert len(chunks) > 1
+    _assert_covers(chunks, source, 40)
+    unit_starts = {int(s["line_range"].split("-")[0]) for s in sections}
+    assert {c.start_line for c in chunks} <= unit_starts
+
+
+def test_small_program_is_one_chunk():
+    (chunk,) = split_code("x = 1\ny = 2\n", "python", max_lines=10)
+    assert (chunk.start_line, chunk.end_line, chunk.line_offset) == (1, 2, 0)
+
+
+def test_comments_above_a_unit_stay_with_it():
+    source = "x = 1\n\n# Derive age\n# from birth date\ndef age():\n    return 1\n"
+    assert code_boundaries(source, "python") == [(1, 0), (3, 0)]
+
+
+def test_sas_boundaries_ignore_commented_steps_and_nest_macro_steps():
+    source = "\n".join(
+        [
+            "/* data skipped; run; */",   # 1 comment, pulled into the next unit
+            "%macro derive;",             # 2
+            "data a;",                    # 3
+            "  x = 1;",                   # 4
+            "run;",                       # 5
+            "proc sort data=a;",          # 6
+            "run;",                       # 7
+            "%mend;",                     # 8
+            "options nodate;",            # 9
+        ]
+    )
+    assert code_boundaries(source, "sas") == [(1, 0), (3, 1), (6, 1), (9, 0)]
+
+
+def test_r_boundaries_skip_continued_and_bracketed_lines():
+    source = "\n".join(
+        [
+            "df <- read.csv('a.csv') %>%",  # 1
+            "  filter(x > 1)",              # 2 continued
+            "f <- function(x) {",           # 3
+            "  y <- x + 1",                 # 4 nested
+            "  y",                          # 5 nested
+            "}",                            # 6
+            "out <- c(1,",                  # 7
+            "         2)",                  # 8 inside brackets
+        ]
+    )
+    assert code_boundaries(source, "r") == [(1, 0), (3, 0), (4, 1), (5, 1), (7, 0)]
+
+
+def test_oversized_unit_splits_at_nested_boundaries_then_lines():
+    methods = [f"    def m{i}(self):\n        return {i}\n" for i in range(6)]
+    source = "class Big:\n" + "".join(methods) + "z = 1\n"
+    chunks = split_code(source, "python", max_lines=5)
+    _assert_covers(chunks, source, 5)
+    assert [c.start_line for c in chunks] == [1, 6, 10]  # methods start at 2, 4, ..., 12
+
+    # A unit with no nested boundaries falls back to plain line cuts
+    source = "x = [\n" + "".join(f"    {i},\n" for i in range(25)) + "]\n"
+    chunks = split_code(source, "python", max_lines=10)
+    _assert_covers(chunks, source, 10)
+    assert [c.start_line for c in chunks] == [1, 11, 21]
+
+
+def test_merge_orders_sections_and_dedupes_lists():
+    def part(sections, variables, summary):
+        return ParsedCode(
+            language="sas",
+            summary=summary,
+            sections=[Section(name=n, description="", code_snippet="", line_range=r) for n, r in sections],
+            variables=variables,
+            transformations=[],
+            filters=[],
+            hardcoded_values=[],
+        )
+
+    merged = merge_parsed_code(
+        [
+            part([("Later", "41-60"), ("Shared", "20-40")], ["AGE", "sex"], "Part two."),
+            part([("First", "1-19"), ("shared", "20-40")], ["age ", "TRT"], "Part one."),
+        ],
+        "sas",
+    )
+    assert [s.line_range for s in merged.sections] == ["1-19", "20-40", "41-60"]
+    assert merged.variables == ["AGE", "sex", "TRT"]
+    assert merged.summary == "Part two. (Parsed in 2 chunks.)"
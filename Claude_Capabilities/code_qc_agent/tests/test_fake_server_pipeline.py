@@ -0,0 +1,79 @@
+"""End-to-end runs of the streamed and bulk pipelines against ``tools.fake_anthropic_server``."""
+
+import copy
+import json
+from pathlib import Path
+
+import anthropic
+import pytest
+
+from agents.batch_runner import QCPair
+from agents.bulk_runner import BulkRunner
+from agents.orchestrator import Orchestrator
+from agents.runtime import Runtime, load_settings
+from benchmarks.synthetic import make_rules, write_program, write_xlsx
+from tools.fake_anthropic_server import FakeAnthropicServer
+
+
+@pytest.fixture
+def server():
+    fake = FakeAnthropicServer(("127.0.0.1", 0), batch_delay=0.2).start()
+    yield fake
+    fake.shutdown()
+    fake.server_close()
+
+
+@pytest.fixture
+def workspace(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)  # relative outputs/ paths (incremental state) land here
+    sot_path = write_xlsx(tmp_path / "spec.xlsx", make_rules(3))
+    code_path, _ = write_program(tmp_path / "program", "sas", units=3)
+    return tmp_path, str(sot_path), str(code_path)
+
+
+def _runtime(server: FakeAnthropicServer, tmp_path: Path) -> Runtime:
+    config = copy.deepcopy(load_settings())
+    config["cache"].update(enabled=True, path=str(tmp_path / "cache" / "responses.sqlite"))
+    config["checkpoints"]["dir"] = str(tmp_path / "checkpoints")
+    config["report"]["formats"] = ["docx", "json"]
+    config["bulk"]["poll_interval_s"] = 0.05
+    # The SDK's own HTTP client, so the test does not depend on the pool settings
+    client = anthropic.Anthropic(api_key="test-key", base_url=server.base_url, max_retries=0)
+    return Runtime(config=config, client=client, project_root=tmp_path)
+
+
+def test_streamed_pipeline_end_to_end(server, workspace):
+    tmp_path, sot_path, code_path = workspace
+    runtime = _runtime(server, tmp_path)
+    report = Orchestrator(verbose=False, runtime=runtime).run(
+        sot_path, code_path, output_dir=str(tmp_path / "reports")
+    )
+
+    assert Path(report).exists()
+    record = json.loads(Path(report).with_suffix(".metrics.json").read_text(encoding="utf-8"))
+    assert {call["stage"] for call in record["calls"]} >= {
+        "DocParserAgent",
+        "CodeParserAgent",
+        "LogicQCAgent",
+        "StructureQCAgent",
+    }
+    assert server.counts["accepted"] == len(record["calls"])
+    assert not list((tmp_path / "checkpoints").rglob("logic_qc.json"))  # cleared after the report
+
+
+def test_bulk_pipeline_end_to_end(server, workspace):
+    tmp_path, sot_path, code_path = workspace
+    runtime = _runtime(server, tmp_path)
+    runner = BulkRunner.create(
+        [QCPair(sot_path, code_path)],
+        job_root=tmp_path / "bulk",
+        output_dir=str(tmp_path / "reports"),
+        runtime=runtime,
+    )
+    (result,) = runner.run()
+
+    assert result.error == ""
+    assert Path(result.report_path).exists()
+    assert server.counts["accepted"] == 0  # every model call went through a batch
+    assert len(server.batches) == 2  # parse round, then QC round
+    assert all(record.collected for record in runner.job.batches)
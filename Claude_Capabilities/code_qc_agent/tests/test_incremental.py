@@ -0,0 +1,119 @@
+from utils.incremental import QCState, carry_forward, load_state, plan_update, save_state, touched_rules
+from utils.models import (
+    INCOMPLETE_TITLE,
+    LogicQCResult,
+    ParsedCode,
+    ParsedDoc,
+    QCFinding,
+    Rule,
+    Section,
+    StructureQCResult,
+)
+
+OLD_SOURCE = "\n".join(
+    [
+        "data adsl;",          # 1
+        "  set dm;",           # 2
+        "  agegr1 = 'A';",     # 3
+        "run;",                # 4
+        "data adae;",          # 5
+        "  set ae;",           # 6
+        "  trtemfl = 'Y';",    # 7
+        "run;",                # 8
+    ]
+)
+NEW_SOURCE = OLD_SOURCE.replace("  trtemfl = 'Y';", "  trtemfl = 'N';")
+
+PREVIOUS = ParsedCode(
+    language="sas",
+    summary="",
+    sections=[
+        Section(name="ADSL derivation", description="", code_snippet="", line_range="1-4"),
+        Section(name="ADAE derivation", description="", code_snippet="", line_range="5-8"),
+    ],
+    variables=["agegr1", "trtemfl"],
+    transformations=[],
+    filters=[],
+    hardcoded_values=[],
+)
+
+RULES = [
+    Rule(title="Age Group Derivation", description="", variables=["agegr1"]),
+    Rule(title="Treatment-Emergent Flag", description="", variables=["trtemfl"]),
+]
+
+
+def _finding(title: str, rule: str = "", detail: str = "", status: str = "FAIL") -> QCFinding:
+    return QCFinding(
+        title=title, status=status, detail=detail, recommendation="", priority="High", rule=rule
+    )
+
+
+def _plan():
+    plan = plan_update(PREVIOUS, OLD_SOURCE, NEW_SOURCE)
+    assert plan is not None
+    assert plan.old_regions == [(5, 8)]
+    assert plan.touched_sections == ["ADAE derivation"]
+    return plan
+
+
+def test_rechecked_rule_matches_despite_case_whitespace_and_paraphrase():
+    plan = _plan()
+    previous = [
+        _finding("Age group ok", rule="Age Group Derivation"),
+        _finding("TEAE flag wrong", rule="  treatment-emergent   FLAG "),
+        _finding("TEAE flag wrong (2)", rule="Treatment emergent flags"),
+    ]
+    rechecked = touched_rules(ParsedDoc(domain="", rules=RULES, variables=[]), previous, plan, [])
+    assert [r.title for r in rechecked] == ["Treatment-Emergent Flag"]
+
+    fresh = [_finding("TEAE flag fixed", rule="Treatment-Emergent Flag")]
+    merged = carry_forward(previous, rechecked, fresh, plan, RULES)
+    assert [f.title for f in merged] == ["Age group ok", "TEAE flag fixed"]
+
+
+def test_undocumented_findings_in_changed_code_are_dropped():
+    plan = _plan()
+    previous = [
+        _finding("Hardcoded value", detail="Lines 6-7 hardcode the flag."),
+        _finding("Unused dataset", detail="The ADAE derivation reads an unused dataset."),
+        _finding("Magic constant", detail="Line 3 hardcodes 'A'."),
+    ]
+    merged = carry_forward(previous, [], [], plan, RULES)
+    assert [f.title for f in merged] == ["Magic constant"]
+
+
+def test_undocumented_finding_replaced_by_new_finding_with_same_title():
+    plan = _plan()
+    previous = [_finding("Magic Constant", detail="Line 3 hardcodes 'A'.")]
+    fresh = [_finding("magic constant", detail="Line 3 still hardcodes 'A'.")]
+    assert carry_forward(previous, [], fresh, plan, RULES) == fresh
+
+
+def _state(logic_findings: list[QCFinding]) -> QCState:
+    return QCState(
+        code_path="prog.sas",
+        language="sas",
+        raw_code=OLD_SOURCE,
+        sot_hash="0" * 64,
+        parsed_doc=ParsedDoc(domain="", rules=RULES, variables=[]),
+        parsed_code=PREVIOUS,
+        logic_result=LogicQCResult(findings=logic_findings),
+        structure_result=StructureQCResult(findings=[]),
+    )
+
+
+def test_state_with_a_result_cut_short_is_not_saved(tmp_path):
+    complete = _state([_finding("Age group ok", rule="Age Group Derivation")])
+    assert save_state(str(tmp_path), complete)
+
+    truncated = _state(complete.logic_result.findings + [_finding(INCOMPLETE_TITLE, status="WARNING")])
+    assert not save_state(str(tmp_path), truncated)
+    assert load_state(str(tmp_path), "prog.sas") == complete
+
+
+def test_incomplete_warning_is_not_carried_forward():
+    plan = _plan()
+    previous = [_finding("Age group ok", rule="Age Group Derivation"), _finding(INCOMPLETE_TITLE, status="WARNING")]
+    merged = carry_forward(previous, [], [], plan, RULES)
+    assert [f.title for f in merged] == ["Age group ok"]
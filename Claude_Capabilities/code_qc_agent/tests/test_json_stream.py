@@ -0,0 +1,94 @@
+import copy
+import json
+
+import anthropic
+import pytest
+
+from agents.base_agent import BaseAgent
+from agents.runtime import Runtime, load_settings
+from tools.fake_anthropic_server import FakeAnthropicServer
+from utils.json_stream import FindingsScanner
+from utils.models import INCOMPLETE_TITLE, LogicQCResult
+from utils.response_cache import ResponseCache
+
+
+def _feed_all(fragments) -> list[dict]:
+    scanner = FindingsScanner()
+    found = []
+    for fragment in fragments:
+        found.extend(scanner.feed(fragment))
+    return found
+
+
+def test_every_split_of_a_document_yields_the_same_findings():
+    document = json.dumps(
+        {
+            "summary": 'has "quotes", a \\ backslash and {braces} [brackets]',
+            "findings": [
+                {"title": 'AGE "derived"', "detail": "ends in \\"},
+                {"title": "}{][", "nested": {"findings": [{"x": 1}]}},
+            ],
+        }
+    )
+    expected = json.loads(document)["findings"]
+
+    assert _feed_all([document]) == expected
+    assert _feed_all(list(document)) == expected
+    for cut in range(1, len(document)):
+        assert _feed_all([document[:cut], document[cut:]]) == expected
+
+
+def test_escaped_quote_split_across_fragments_does_not_end_the_string():
+    document = '{"findings": [{"title": "say \\"hi\\" twice"}]}'
+    cut = document.index('\\"') + 1  # fragment ends on the backslash
+    assert _feed_all([document[:cut], document[cut:]]) == [{"title": 'say "hi" twice'}]
+
+
+def test_findings_key_below_the_top_level_is_ignored():
+    document = '{"meta": {"findings": [{"a": 1}]}, "findings": [{"b": 2}]}'
+    assert _feed_all(list(document)) == [{"b": 2}]
+
+
+def test_findings_as_a_string_value_does_not_open_the_array():
+    document = '{"note": "findings", "other": [{"a": 1}], "findings": [{"b": 2}]}'
+    assert _feed_all(list(document)) == [{"b": 2}]
+
+
+def test_items_are_returned_by_the_fragment_that_completes_them():
+    scanner = FindingsScanner()
+    assert scanner.feed('{"findings": [{"title": "one"') == []
+    assert scanner.feed('}, {"title": "tw') == [{"title": "one"}]
+    assert scanner.feed('o"}') == [{"title": "two"}]
+    assert scanner.feed("]}") == []
+
+
+@pytest.fixture
+def server():
+    fake = FakeAnthropicServer(("127.0.0.1", 0)).start()
+    yield fake
+    fake.shutdown()
+    fake.server_close()
+
+
+def test_stream_cut_short_returns_partial_findings_and_is_not_cached(server, tmp_path):
+    config = copy.deepcopy(load_settings())
+    config["cache"].update(enabled=True, path=str(tmp_path / "responses.sqlite"))
+    # The fake streams 64-character deltas of a two-finding result; the first
+    # finding ends in the third delta, which also passes ~45 output tokens.
+    config["streaming"].update(time_budget_s=0, output_token_budget=45)
+    client = anthropic.Anthropic(api_key="test-key", base_url=server.base_url, max_retries=0)
+    agent = BaseAgent(Runtime(config=config, client=client, project_root=tmp_path))
+
+    streamed = []
+    messages = [{"role": "user", "content": "Check the program."}]
+    result = agent._call_route(
+        agent.routing.route, messages, "system", LogicQCResult, on_finding=streamed.append
+    )
+
+    assert [f.title for f in result.findings] == ["title example", INCOMPLETE_TITLE]
+    assert result.findings[-1].status == "WARNING"
+    assert streamed == result.findings[:1]
+    key = ResponseCache.make_key(
+        agent.routing.route.cache_id, "system", messages, LogicQCResult.model_json_schema()
+    )
+    assert agent.cache.enabled and agent.cache.get(key) is None
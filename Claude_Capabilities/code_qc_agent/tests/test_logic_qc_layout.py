@@ -0,0 +1,66 @@
+import anthropic
+
+from agents.logic_qc_agent import LogicQCAgent
+from agents.runtime import Runtime, load_settings
+from utils.models import LogicQCResult, ParsedCode, ParsedDoc, Rule, Section, VarDef
+from utils.response_cache import ResponseCache
+
+
+def _agent(tmp_path, **logic_qc) -> tuple[LogicQCAgent, list[list[dict]]]:
+    config = load_settings()
+    config["logic_qc"] = {"batch_size": 2, "max_workers": 1, "section_top_k": 0, **logic_qc}
+    runtime = Runtime(
+        config=config,
+        client=anthropic.Anthropic(api_key="test"),
+        cache=ResponseCache(tmp_path / "cache.sqlite", enabled=False),
+    )
+    agent = LogicQCAgent(runtime=runtime)
+    sent: list[list[dict]] = []
+
+    def record(messages, system, output_model, on_finding=None):
+        sent.append(messages[0]["content"])
+        return LogicQCResult(findings=[])
+
+    agent._stream_parse = record
+    return agent, sent
+
+
+DOC = ParsedDoc(
+    domain="ADaM",
+    rules=[Rule(title=f"Rule {i}", description="x" * 400, variables=[f"v{i}"]) for i in range(5)],
+    variables=[VarDef(name=f"v{i}", definition="y" * 400) for i in range(5)],
+)
+CODE = ParsedCode(
+    language="sas",
+    summary="",
+    sections=[Section(name="All", description="", code_snippet="z" * 2000, line_range="1-50")],
+    variables=[f"v{i}" for i in range(5)],
+    transformations=[],
+    filters=[],
+    hardcoded_values=[],
+)
+
+
+def _prefix(content: list[dict]) -> list[str]:
+    """Text of the blocks up to and including the last cache breakpoint."""
+    last = max(i for i, block in enumerate(content) if "cache_control" in block)
+    return [block["text"] for block in content[: last + 1]]
+
+
+def test_sharded_batches_share_one_cacheable_prefix(tmp_path):
+    agent, sent = _agent(tmp_path)
+    agent.check(DOC, CODE)
+    assert len(sent) == 4  # three rule batches and the undocumented-logic call
+    prefixes = {tuple(_prefix(content)) for content in sent}
+    assert len(prefixes) == 1
+    prefix = prefixes.pop()
+    assert "Rule 0" not in "".join(prefix)  # the batch's own rules follow the breakpoint
+    assert "zzz" in prefix[-1]
+
+
+def test_single_call_keeps_spec_then_code_prefix(tmp_path):
+    agent, sent = _agent(tmp_path, batch_size=0)
+    agent.check(DOC, CODE)
+    (content,) = sent
+    spec, code = _prefix(content)
+    assert "Rule 4" in spec and code.startswith("=== CODE ANALYSIS ===")
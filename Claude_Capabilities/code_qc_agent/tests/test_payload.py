@@ -0,0 +1,29 @@
+from utils.models import ParsedCode, ParsedDoc, Rule, Section, VarDef
+from utils.payload import encode_parsed_code_compact, encode_parsed_doc_compact
+
+
+def test_pipes_in_spec_fields_are_escaped_not_rewritten():
+    doc = ParsedDoc(
+        domain="ADaM",
+        rules=[Rule(title="Flag", description="if a | b then c || d", conditions=["x|y"])],
+        variables=[VarDef(name="FL", definition="a | b")],
+    )
+    text = encode_parsed_doc_compact(doc)
+    assert "Flag | if a \\| b then c \\|\\| d |  | x\\|y | " in text
+    assert "FL | a \\| b | " in text
+    assert "/" not in text.replace("\\|", "")
+
+
+def test_code_payload_keeps_operators_verbatim():
+    code = ParsedCode(
+        language="sas",
+        summary="keeps a | b",
+        sections=[Section(name="Step", description="or | concat ||", code_snippet="if a | b;", line_range="1")],
+        variables=["a"],
+        transformations=["c = a || b"],
+        filters=["where x | y"],
+        hardcoded_values=[],
+    )
+    text = encode_parsed_code_compact(code)
+    for fragment in ("keeps a | b", "or | concat ||", "if a | b;", "- c = a || b", "- where x | y"):
+        assert fragment in text
@@ -0,0 +1,25 @@
+import pytest
+
+from agents.runtime import load_settings
+from utils.routing import routing_for
+
+
+def test_shipped_settings_route_every_agent_to_the_default_model():
+    config = load_settings()
+    for agent in ("DocParserAgent", "CodeParserAgent", "LogicQCAgent", "StructureQCAgent"):
+        routing = routing_for(config, agent)
+        assert routing.fast is None
+        assert routing.route.model == config["model"]["name"]
+
+
+def test_thinking_budget_must_be_below_max_tokens():
+    config = {
+        "model": {"name": "m", "max_tokens": 4000, "thinking": 2000},
+        "agents": {"LogicQCAgent": {"fast": {"max_tokens": 2000}}},
+    }
+    assert routing_for(config, "DocParserAgent").route.request_params()["thinking"] == {
+        "type": "enabled",
+        "budget_tokens": 2000,
+    }
+    with pytest.raises(ValueError, match="below max_tokens"):
+        routing_for(config, "LogicQCAgent")  # the fast route inherits thinking: 2000
@@ -0,0 +1,139 @@
+import random
+
+import anthropic
+import pytest
+
+from tools.fake_anthropic_server import FakeAnthropicServer
+from utils.scheduler import RequestScheduler, TokenBucket
+
+
+class FakeClock:
+    """A monotonic clock that only moves when something sleeps on it."""
+
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps: list[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+@pytest.fixture
+def server():
+    fake = FakeAnthropicServer(("127.0.0.1", 0), retry_after=7).start()
+    yield fake
+    fake.shutdown()
+    fake.server_close()
+
+
+def _message(server: FakeAnthropicServer):
+    client = anthropic.Anthropic(api_key="test-key", base_url=server.base_url, max_retries=0)
+    return lambda: client.messages.create(
+        model="fake", max_tokens=10, messages=[{"role": "user", "content": "hi"}]
+    )
+
+
+def test_token_bucket_refills_continuously():
+    clock = FakeClock()
+    bucket = TokenBucket(60, clock, clock.sleep)
+    assert bucket.acquire(60) == 0.0
+    assert bucket.acquire(1) == pytest.approx(1.0)  # 60/min = one token a second
+    clock.now += 10
+    assert bucket.acquire(10) == 0.0
+
+
+def test_token_bucket_caps_oversized_requests_at_capacity():
+    clock = FakeClock()
+    bucket = TokenBucket(30, clock, clock.sleep)
+    bucket.acquire(30)
+    assert bucket.acquire(1000) == pytest.approx(60.0)  # one full minute, not forever
+
+
+def test_scheduler_paces_requests_per_minute(server):
+    clock = FakeClock()
+    scheduler = RequestScheduler(requests_per_minute=2, clock=clock, sleep=clock.sleep)
+    call = _message(server)
+    for _ in range(3):
+        scheduler.call(call)
+    assert clock.sleeps == [pytest.approx(30.0)]
+    assert server.counts["accepted"] == 3
+
+
+def test_throttling_halves_concurrency_and_honours_retry_after(server):
+    clock = FakeClock()
+    server.throttle_rate = 1.0
+    scheduler = RequestScheduler(max_concurrency=8, max_retries=3, clock=clock, sleep=clock.sleep)
+    retries: list[tuple[int, float]] = []
+
+    with pytest.raises(anthropic.RateLimitError):
+        scheduler.call(
+            _message(server), on_retry=lambda attempt, delay, exc: retries.append((attempt, delay))
+        )
+
+    assert retries == [(1, 7.0), (2, 7.0), (3, 7.0)]
+    assert clock.sleeps == [7.0, 7.0, 7.0]
+    assert scheduler.throttled == 4
+    assert scheduler.limit == 1  # 8 → 4 → 2 → 1 → 1, never below min_concurrency
+    assert scheduler.in_flight == 0
+
+
+def test_successes_raise_concurrency_one_window_at_a_time(server):
+    clock = FakeClock()
+    scheduler = RequestScheduler(max_concurrency=3, clock=clock, sleep=clock.sleep)
+    scheduler.limit = 1
+    call = _message(server)
+    scheduler.call(call)
+    assert scheduler.limit == 2
+    scheduler.call(call)
+    assert scheduler.limit == 2  # a window is as many successes as the current limit
+    scheduler.call(call)
+    assert scheduler.limit == 3
+    for _ in range(3):
+        scheduler.call(call)
+    assert scheduler.limit == 3  # capped at max_concurrency
+
+
+def test_rpm_rejections_are_retried_after_the_server_delay(server):
+    clock = FakeClock()
+    server.rpm = 1
+    scheduler = RequestScheduler(max_retries=2, clock=clock, sleep=clock.sleep)
+    call = _message(server)
+    scheduler.call(call)
+    with pytest.raises(anthropic.RateLimitError):
+        scheduler.call(call)
+    assert clock.sleeps == [7.0, 7.0]
+    assert server.counts == {"accepted": 1, "rate_limited": 3, "overloaded": 0}
+
+
+def test_backoff_is_full_jitter_capped_at_the_maximum():
+    scheduler = RequestScheduler(backoff_base_s=1, backoff_max_s=10, rng=random.Random(3))
+    expected = random.Random(3)
+    delays = [scheduler._backoff(attempt) for attempt in range(6)]
+    assert delays == [expected.uniform(0, min(10, 2**attempt)) for attempt in range(6)]
+    assert all(0 <= d <= 10 for d in delays)
+
+
+def test_a_paced_call_holds_no_concurrency_slot_while_it_waits(server):
+    clock = FakeClock()
+    in_flight_while_waiting: list[int] = []
+
+    def sleep(seconds: float) -> None:
+        in_flight_while_waiting.append(scheduler.in_flight)
+        clock.sleep(seconds)
+
+    scheduler = RequestScheduler(requests_per_minute=1, clock=clock, sleep=sleep)
+    call = _message(server)
+    scheduler.call(call)
+    scheduler.call(call)
+    assert in_flight_while_waiting == [0]
+
+
+def test_default_settings_do_not_pace_calls():
+    from agents.runtime import load_settings
+
+    scheduler = RequestScheduler.from_settings(load_settings()["scheduler"])
+    assert scheduler.requests is None and scheduler.input_tokens is None
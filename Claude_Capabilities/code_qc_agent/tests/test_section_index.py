@@ -0,0 +1,41 @@
+from agents.logic_qc_agent import LogicQCAgent
+from utils.models import ParsedCode, ParsedDoc, Rule, Section
+from utils.section_index import SectionIndex, format_sections, rule_traceability
+
+CODE = ParsedCode(
+    language="python",
+    summary="",
+    sections=[
+        Section(name="Age groups", description="derive agegr1 from age", code_snippet="", line_range="1-5"),
+        Section(name="Flags", description="set trtemfl", code_snippet="", line_range="6-9"),
+        Section(name="Output", description="write adsl", code_snippet="", line_range="10-12"),
+    ],
+    variables=["agegr1", "trtemfl"],
+    transformations=[],
+    filters=[],
+    hardcoded_values=[],
+)
+MATCHED = Rule(title="Age group", description="agegr1 from age", variables=["agegr1"])
+UNMATCHED = Rule(title="Currency rounding", description="round amounts to cents")
+
+
+def test_batch_with_matching_rules_gets_only_their_sections():
+    index = SectionIndex(CODE)
+    doc = ParsedDoc(domain="", rules=[MATCHED], variables=[])
+    pruned = LogicQCAgent._relevant(index, doc, CODE, [MATCHED], top_k=1)
+    assert [s.name for s in pruned.sections] == ["Age groups"]
+
+
+def test_batch_with_an_unmatched_rule_falls_back_to_every_section():
+    index = SectionIndex(CODE)
+    doc = ParsedDoc(domain="", rules=[MATCHED, UNMATCHED], variables=[])
+    assert LogicQCAgent._relevant(index, doc, CODE, [UNMATCHED], top_k=1) is CODE
+    assert LogicQCAgent._relevant(index, doc, CODE, [MATCHED, UNMATCHED], top_k=1) is CODE
+
+
+def test_traceability_records_the_fallback():
+    doc = ParsedDoc(domain="", rules=[MATCHED, UNMATCHED], variables=[])
+    matched, unmatched = rule_traceability(doc, CODE, {"section_top_k": 1})
+    assert not matched.fallback and [m.name for m in matched.sections] == ["Age groups"]
+    assert unmatched.fallback and unmatched.sections == []
+    assert format_sections(unmatched) == "No matching section (checked against all sections)"
@@ -0,0 +1 @@
+"""Developer tools — run as modules from the project root."""
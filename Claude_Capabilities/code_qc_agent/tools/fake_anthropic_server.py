@@ -0,0 +1,391 @@
+"""Local stand-in for the Anthropic Messages and Message Batches endpoints.
+
+Answers every request with a ``structured_output`` tool call whose input is a
+minimal valid instance of the request's tool schema, so the whole pipeline —
+interactive (streamed) or bulk (batched) — can run offline and for free.
+
+Usage (from the project root):
+    python -m tools.fake_anthropic_server --port 8765 --latency 0.5 --batch-delay 5
+    python -m tools.fake_anthropic_server --rpm 30 --max-concurrent 4 --overload-rate 0.05
+
+then point the pipeline at it with ``api.base_url: http://127.0.0.1:8765`` in
+``config/settings.yaml`` (or ``ANTHROPIC_BASE_URL``) and any ``ANTHROPIC_API_KEY``.
+
+Endpoints:
+    POST /v1/messages                    (``stream: true`` answers with SSE)
+    POST /v1/messages/count_tokens
+    POST /v1/messages/batches
+    GET  /v1/messages/batches/<id>       (ends ``--batch-delay`` s after creation)
+    GET  /v1/messages/batches/<id>/results
+
+Throttling can be injected on /v1/messages to exercise the request scheduler:
+``--rpm`` and ``--max-concurrent`` answer 429 over those limits, and
+``--throttle-rate`` / ``--overload-rate`` answer 429 / 529 at random.  Every
+rejection carries ``retry-after: --retry-after``.
+"""
+
+import argparse
+import itertools
+import json
+import math
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+_ids = itertools.count(1)
+_BATCH_PATH = re.compile(r"^/v1/messages/batches/(?P<id>[\w-]+)(?P<results>/results)?$")
+
+
+# ---------------------------------------------------------------------------
+# Canned responses
+# ---------------------------------------------------------------------------
+
+def schema_instance(schema: dict, defs: dict | None = None, name: str = "value"):
+    """Return a small value that validates against a (Pydantic-generated) JSON schema."""
+    defs = defs if defs is not None else schema.get("$defs", {})
+    if "$ref" in schema:
+        return schema_instance(defs[schema["$ref"].rsplit("/", 1)[-1]], defs, name)
+    for key in ("anyOf", "oneOf", "allOf"):
+        if key in schema:
+            options = [s for s in schema[key] if s.get("type") != "null"] or schema[key]
+            return schema_instance(options[0], defs, name)
+    if "const" in schema:
+        return schema["const"]
+    if "enum" in schema:
+        return schema["enum"][0]
+
+    kind = schema.get("type")
+    if kind == "object":
+        return {
+            key: schema_instance(prop, defs, key)
+            for key, prop in schema.get("properties", {}).items()
+        }
+    if kind == "array":
+        return [schema_instance(schema.get("items", {}), defs, name) for _ in range(2)]
+    if kind == "string":
+        return f"{name} example"
+    if kind == "integer":
+        return 0
+    if kind == "number":
+        return 0.0
+    if kind == "boolean":
+        return False
+    return None
+
+
+def _iso(timestamp: float) -> str:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat()
+
+
+def _estimate_tokens(value) -> int:
+    return math.ceil(len(json.dumps(value, ensure_ascii=False)) / 4)
+
+
+def build_message(params: dict) -> dict:
+    """Return a complete Messages API response for one request body."""
+    tools = params.get("tools") or [{"name": "structured_output", "input_schema": {}}]
+    choice = params.get("tool_choice") or {}
+    tool = next((t for t in tools if t.get("name") == choice.get("name")), tools[0])
+    tool_input = schema_instance(tool.get("input_schema", {}))
+    return {
+        "id": f"msg_fake_{next(_ids)}",
+        "type": "message",
+        "role": "assistant",
+        "model": params.get("model", "fake"),
+        "content": [
+            {
+                "type": "tool_use",
+                "id": f"toolu_fake_{next(_ids)}",
+                "name": tool["name"],
+                "input": tool_input,
+            }
+        ],
+        "stop_reason": "tool_use",
+        "stop_sequence": None,
+        "usage": {
+            "input_tokens": _estimate_tokens([params.get("system"), params.get("messages"), tools]),
+            "output_tokens": _estimate_tokens(tool_input),
+            "cache_creation_input_tokens": 0,
+            "cache_read_input_tokens": 0,
+        },
+    }
+
+
+def stream_events(message: dict, chunk_chars: int = 64):
+    """Yield (event, data) pairs that stream ``message`` the way the API does."""
+    block = message["content"][0]
+    usage = {**message["usage"], "output_tokens": 1}
+    start = {**message, "content": [], "stop_reason": None, "usage": usage}
+    yield "message_start", {"type": "message_start", "message": start}
+    yield "content_block_start", {
+        "type": "content_block_start",
+        "index": 0,
+        "content_block": {**block, "input": {}},
+    }
+    text = json.dumps(block["input"])
+    for i in range(0, len(text), chunk_chars):
+        yield "content_block_delta", {
+            "type": "content_block_delta",
+            "index": 0,
+            "delta": {"type": "input_json_delta", "partial_json": text[i:i + chunk_chars]},
+        }
+    yield "content_block_stop", {"type": "content_block_stop", "index": 0}
+    yield "message_delta", {
+        "type": "message_delta",
+        "delta": {"stop_reason": message["stop_reason"], "stop_sequence": None},
+        "usage": {"output_tokens": message["usage"]["output_tokens"]},
+    }
+    yield "message_stop", {"type": "message_stop"}
+
+
+# ---------------------------------------------------------------------------
+# Server
+# ---------------------------------------------------------------------------
+
+class FakeAnthropicServer(ThreadingHTTPServer):
+    """HTTP server holding the simulated latency settings and submitted batches."""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        latency: float = 0.0,
+        batch_delay: float = 0.0,
+        rpm: int = 0,
+        max_concurrent: int = 0,
+        throttle_rate: float = 0.0,
+        overload_rate: float = 0.0,
+        retry_after: float = 1.0,
+        seed: int | None = None,
+    ) -> None:
+        super().__init__(address, _Handler)
+        self.latency = latency
+        self.batch_delay = batch_delay
+        self.rpm = rpm
+        self.max_concurrent = max_concurrent
+        self.throttle_rate = throttle_rate
+        self.overload_rate = overload_rate
+        self.retry_after = retry_after
+        self.batches: dict[str, dict] = {}
+        self.lock = threading.Lock()
+
+        self.counts = {"accepted": 0, "rate_limited": 0, "overloaded": 0}
+        self.peak_concurrent = 0
+        self._random = random.Random(seed)
+        self._recent: list[float] = []  # accepted request times in the last minute
+        self._in_flight = 0
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeAnthropicServer":
+        """Serve on a daemon thread and return self (for in-process use)."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def admit(self) -> tuple[int, str] | None:
+        """Admit a message request, or return the (status, error type) to reject it with."""
+        with self.lock:
+            now = time.time()
+            self._recent = [t for t in self._recent if now - t < 60]
+            draw = self._random.random()
+            if draw < self.overload_rate:
+                rejection = (529, "overloaded_error")
+            elif (
+                draw < self.overload_rate + self.throttle_rate
+                or (self.rpm and len(self._recent) >= self.rpm)
+                or (self.max_concurrent and self._in_flight >= self.max_concurrent)
+            ):
+                rejection = (429, "rate_limit_error")
+            else:
+                self._recent.append(now)
+                self._in_flight += 1
+                self.peak_concurrent = max(self.peak_concurrent, self._in_flight)
+                self.counts["accepted"] += 1
+                return None
+            self.counts["overloaded" if rejection[0] == 529 else "rate_limited"] += 1
+            return rejection
+
+    def done(self) -> None:
+        with self.lock:
+            self._in_flight -= 1
+
+    def batch_object(self, batch_id: str) -> dict:
+        batch = self.batches[batch_id]
+        created = batch["created"]
+        ended = time.time() - created >= self.batch_delay
+        total = len(batch["requests"])
+        return {
+            "id": batch_id,
+            "type": "message_batch",
+            "processing_status": "ended" if ended else "in_progress",
+            "request_counts": {
+                "processing": 0 if ended else total,
+                "succeeded": total if ended else 0,
+                "errored": 0,
+                "canceled": 0,
+                "expired": 0,
+            },
+            "created_at": _iso(created),
+            "expires_at": _iso(created + 86400),
+            "ended_at": _iso(created + self.batch_delay) if ended else None,
+            "archived_at": None,
+            "cancel_initiated_at": None,
+            "results_url": (
+                f"{self.base_url}/v1/messages/batches/{batch_id}/results" if ended else None
+            ),
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: FakeAnthropicServer
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format: str, *args) -> None:  # keep the console quiet
+        pass
+
+    # -- helpers --------------------------------------------------------
+
+    def _body(self) -> dict:
+        length = int(self.headers.get("Content-Length", 0))
+        return json.loads(self.rfile.read(length) or b"{}")
+
+    def _send_json(self, payload: dict, status: int = 200, headers: dict | None = None) -> None:
+        data = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _not_found(self) -> None:
+        self._send_json(
+            {"type": "error", "error": {"type": "not_found_error", "message": self.path}}, 404
+        )
+
+    # -- routes ---------------------------------------------------------
+
+    def do_POST(self) -> None:
+        path = self.path.split("?", 1)[0]
+        body = self._body()
+        if path == "/v1/messages":
+            self._messages(body)
+        elif path == "/v1/messages/count_tokens":
+            self._send_json({"input_tokens": _estimate_tokens(body)})
+        elif path == "/v1/messages/batches":
+            batch_id = f"msgbatch_fake_{next(_ids)}"
+            with self.server.lock:
+                self.server.batches[batch_id] = {
+                    "requests": body.get("requests", []),
+                    "created": time.time(),
+                }
+                self._send_json(self.server.batch_object(batch_id))
+        else:
+            self._not_found()
+
+    def do_GET(self) -> None:
+        match = _BATCH_PATH.match(self.path.split("?", 1)[0])
+        if match is None or match["id"] not in self.server.batches:
+            self._not_found()
+            return
+        with self.server.lock:
+            batch = self.server.batch_object(match["id"])
+            requests = self.server.batches[match["id"]]["requests"]
+        if not match["results"]:
+            self._send_json(batch)
+            return
+        if batch["processing_status"] != "ended":
+            self._not_found()
+            return
+        lines = [
+            json.dumps(
+                {
+                    "custom_id": request["custom_id"],
+                    "result": {"type": "succeeded", "message": build_message(request["params"])},
+                }
+            )
+            for request in requests
+        ]
+        data = ("\n".join(lines) + "\n").encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/binary")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _messages(self, params: dict) -> None:
+        rejection = self.server.admit()
+        if rejection is not None:
+            status, error_type = rejection
+            self._send_json(
+                {"type": "error", "error": {"type": error_type, "message": "injected by fake server"}},
+                status,
+                headers={"retry-after": f"{self.server.retry_after:g}"},
+            )
+            return
+        try:
+            self._reply(params)
+        finally:
+            self.server.done()
+
+    def _reply(self, params: dict) -> None:
+        if self.server.latency:
+            time.sleep(self.server.latency)
+        message = build_message(params)
+        if not params.get("stream"):
+            self._send_json(message)
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        for event, data in stream_events(message):
+            self.wfile.write(f"event: {event}\ndata: {json.dumps(data)}\n\n".encode("utf-8"))
+            self.wfile.flush()
+        self.close_connection = True
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds before each message reply")
+    parser.add_argument("--batch-delay", type=float, default=0.0, help="Seconds until a batch ends")
+    parser.add_argument("--rpm", type=int, default=0, help="429 above this many requests a minute")
+    parser.add_argument("--max-concurrent", type=int, default=0, help="429 above this many in flight")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Random share answered 429")
+    parser.add_argument("--overload-rate", type=float, default=0.0, help="Random share answered 529")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="retry-after seconds on rejections")
+    parser.add_argument("--seed", type=int, help="Seed for the random rejections")
+    args = parser.parse_args()
+
+    server = FakeAnthropicServer(
+        (args.host, args.port),
+        latency=args.latency,
+        batch_delay=args.batch_delay,
+        rpm=args.rpm,
+        max_concurrent=args.max_concurrent,
+        throttle_rate=args.throttle_rate,
+        overload_rate=args.overload_rate,
+        retry_after=args.retry_after,
+        seed=args.seed,
+    )
+    print(f"Fake Anthropic API on {server.base_url} (Ctrl+C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
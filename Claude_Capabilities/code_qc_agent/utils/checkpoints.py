@@ -0,0 +1,193 @@
+"""Stage checkpoints — parse a spec once, resume a failed run at its last completed stage.
+
+Layout under ``checkpoints.dir``::
+
+    <spec key>/parsed_doc_<doc version>.json   shared by every program QC'd against the spec
+    <spec key>/<code stem>_<code key>/<stage>.json
+
+The spec key is the hash of the SOT file's bytes and the code key the hash of
+the program text, so an edited file never picks up stale output.  The doc
+version identifies the DocParserAgent routes and prompt
+(``DocParserAgent.output_id``), so a new model or prompt parses the spec
+again.  A program's stage checkpoints are deleted once its report is written;
+the ``ParsedDoc`` is kept for the next program governed by the same spec,
+until it is older than ``checkpoints.max_age_days`` (``prune_once``, run by
+the first Orchestrator of a process).  Like the response cache, a kept
+``ParsedDoc`` is neither read nor written with ``cache.enabled: false`` or
+``QC_CACHE_BYPASS`` / ``--no-cache``.
+
+The Orchestrator activates a ``RunCheckpoints`` for the stages of a full run
+(``activate``); work handed to a pool keeps it when submitted with
+``utils.metrics.submit_in_context``.
+"""
+
+import contextvars
+import hashlib
+import shutil
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+from pydantic import BaseModel
+
+from utils.models import LogicQCResult, ParsedCode, ParsedDoc, StructureQCResult, is_incomplete
+from utils.response_cache import bypass_requested
+
+# Pipeline stage → output model
+STAGE_MODELS: dict[str, type[BaseModel]] = {
+    "doc_parse": ParsedDoc,
+    "code_parse": ParsedCode,
+    "logic_qc": LogicQCResult,
+    "structure_qc": StructureQCResult,
+}
+
+
+def file_hash(path: str | Path) -> str:
+    """SHA-256 of a file's bytes, read in blocks."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class RunCheckpoints:
+    """Stage outputs of one spec (and optionally one program) on disk."""
+
+    def __init__(
+        self,
+        root: str | Path,
+        spec_key: str,
+        program: str | None = None,
+        doc_version: str = "",
+        max_age_days: float = 30,
+        reuse_doc: bool = True,
+    ) -> None:
+        self.spec_dir = Path(root) / spec_key[:16]
+        self.program_dir = self.spec_dir / program if program else None
+        self.doc_version = doc_version
+        self.reuse_doc = reuse_doc
+        self.max_age_seconds = max_age_days * 86400
+
+    @classmethod
+    def for_program(
+        cls,
+        root: str | Path,
+        spec_key: str,
+        code_path: str,
+        raw_code: str,
+        **kwargs,
+    ) -> "RunCheckpoints":
+        code_key = hashlib.sha256(raw_code.encode("utf-8")).hexdigest()[:16]
+        return cls(root, spec_key, f"{Path(code_path).stem}_{code_key}", **kwargs)
+
+    def _path(self, stage: str) -> Path | None:
+        if stage == "doc_parse":
+            if not self.reuse_doc or bypass_requested():
+                return None
+            return self.spec_dir / f"parsed_doc_{self.doc_version or 'default'}.json"
+        if self.program_dir is None:
+            return None
+        return self.program_dir / f"{stage}.json"
+
+    def load(self, stage: str) -> BaseModel | None:
+        """Return the saved output of ``stage``, or None if there is none (or it is unreadable)."""
+        path = self._path(stage)
+        if path is None or stage not in STAGE_MODELS or not path.exists():
+            return None
+        if time.time() - path.stat().st_mtime > self.max_age_seconds:
+            path.unlink(missing_ok=True)
+            return None
+        try:
+            return STAGE_MODELS[stage].model_validate_json(path.read_text(encoding="utf-8"))
+        except ValueError:
+            # Written by an older model schema — run the stage again.
+            return None
+
+    def save(self, stage: str, result: BaseModel) -> None:
+        """Write ``stage``'s output; a result cut short by a streaming budget is not saved."""
+        path = self._path(stage)
+        if path is None or stage not in STAGE_MODELS or is_incomplete(result):
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(result.model_dump_json(), encoding="utf-8")
+        tmp.replace(path)
+
+    def clear_program(self) -> None:
+        """Drop this program's stage checkpoints (its run completed)."""
+        if self.program_dir is not None:
+            shutil.rmtree(self.program_dir, ignore_errors=True)
+
+
+def prune(root: str | Path, max_age_days: float) -> None:
+    """Delete checkpoints older than ``max_age_days`` and the old directories they leave empty.
+
+    Kept ``ParsedDoc`` files age out here, as do the stage outputs of
+    programs whose run failed and was never resumed.  A directory is removed
+    only if it was already that old before the pass, so one another run has
+    just created is left alone.
+    """
+    root = Path(root)
+    if not root.is_dir():
+        return
+    cutoff = time.time() - max_age_days * 86400
+    stale_dirs: list[Path] = []
+    for directory in root.rglob("*"):
+        try:
+            if directory.is_dir() and directory.stat().st_mtime < cutoff:
+                stale_dirs.append(directory)
+        except OSError:
+            pass
+    for path in root.rglob("*.json"):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+        except OSError:
+            pass  # removed by a concurrent run
+    for directory in sorted(stale_dirs, key=lambda p: -len(p.parts)):
+        try:
+            directory.rmdir()  # only succeeds when empty
+        except OSError:
+            pass
+
+
+_pruned: set[str] = set()
+_prune_lock = threading.Lock()
+
+
+def prune_once(root: str | Path, max_age_days: float) -> None:
+    """``prune`` ``root`` the first time this process asks; later calls return at once.
+
+    Batch and daemon runs build an Orchestrator per pair, so pruning on each
+    would rescan the tree while other pipelines write to it.  Callers wait
+    for the first pass to finish, so no pipeline of this process saves a
+    checkpoint during it.
+    """
+    key = str(Path(root).resolve())
+    with _prune_lock:
+        if key in _pruned:
+            return
+        _pruned.add(key)
+        prune(root, max_age_days)
+
+
+_current: contextvars.ContextVar[RunCheckpoints | None] = contextvars.ContextVar(
+    "qc_run_checkpoints", default=None
+)
+
+
+def current() -> RunCheckpoints | None:
+    """Return the checkpoints of the stages running in this context, if any."""
+    return _current.get()
+
+
+@contextmanager
+def activate(saved: RunCheckpoints | None) -> Iterator[RunCheckpoints | None]:
+    token = _current.set(saved)
+    try:
+        yield saved
+    finally:
+        _current.reset(token)
@@ -0,0 +1,237 @@
+"""Split large programs into parse-sized chunks on language boundaries and merge the results.
+
+Chunks are cut only where a new top-level unit starts:
+
+- SAS: DATA / PROC steps, ``%macro`` blocks and global statements between them
+- R: top-level statements (function definitions included), outside any open
+  bracket or continued expression
+- Python: top-level statements, ``def`` and ``class`` (decorators included)
+
+Comment lines directly above a unit stay with it.  Whole units are packed
+into chunks of at most ``max_lines``; a unit longer than that on its own is
+split at its nested boundaries (steps inside a macro, methods of a class,
+statements of a function body) and, failing those, on plain line boundaries.
+Every chunk records its first line so the sections parsed from it can be
+shifted to absolute line numbers.
+"""
+
+import ast
+import re
+from dataclasses import dataclass
+
+from utils.line_ranges import parse_line_range
+from utils.models import ParsedCode, Section
+from utils.static_analysis import STRING_RE, strip_comments
+
+
+@dataclass
+class CodeChunk:
+    text: str
+    start_line: int  # 1-based line of the chunk's first line in the whole program
+    end_line: int
+
+    @property
+    def line_offset(self) -> int:
+        return self.start_line - 1
+
+
+# A boundary is (line, depth): ``line`` (1-based) starts a unit nested ``depth`` levels deep.
+Boundary = tuple[int, int]
+
+
+# ---------------------------------------------------------------------------
+# Boundaries
+# ---------------------------------------------------------------------------
+
+def _python_boundaries(raw_code: str) -> list[Boundary]:
+    try:
+        tree = ast.parse(raw_code)
+    except SyntaxError:
+        # Not parseable on its own (e.g. an excerpt) — fall back to definition lines
+        return [
+            (i, 1 if m.group(1) else 0)
+            for i, line in enumerate(raw_code.splitlines(), 1)
+            if (m := re.match(r"^(\s*)(?:@|def |async def |class )", line))
+        ]
+
+    def first_line(node: ast.stmt) -> int:
+        decorators = getattr(node, "decorator_list", [])
+        return min([node.lineno] + [d.lineno for d in decorators])
+
+    boundaries: list[Boundary] = []
+    for node in tree.body:
+        boundaries.append((first_line(node), 0))
+        if isinstance(node, (ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            boundaries.extend((first_line(child), 1) for child in node.body[1:])
+    return boundaries
+
+
+_R_CONTINUATION_RE = re.compile(r"(?:[-+*/,&|=<>~^!]|%[^%\s]*%|\|>|<-)\s*$")
+
+
+def _r_boundaries(raw_code: str) -> list[Boundary]:
+    boundaries: list[Boundary] = []
+    braces = brackets = 0
+    continued = False
+    for i, line in enumerate(strip_comments(raw_code, "r").splitlines(), 1):
+        stripped = line.strip()
+        if not stripped:
+            continue
+        if brackets == 0 and not continued and not re.match(r"^(?:}|else\b)", stripped):
+            boundaries.append((i, braces))
+        for ch in STRING_RE.sub("", line):
+            if ch == "{":
+                braces += 1
+            elif ch == "}":
+                braces = max(0, braces - 1)
+            elif ch in "([":
+                brackets += 1
+            elif ch in ")]":
+                brackets = max(0, brackets - 1)
+        continued = bool(_R_CONTINUATION_RE.search(stripped))
+    return boundaries
+
+
+_SAS_UNIT_RE = re.compile(r"^\s*(?:data|proc)\b(?!\s*=)", re.IGNORECASE)
+_SAS_MACRO_RE = re.compile(r"^\s*%macro\b", re.IGNORECASE)
+_SAS_MEND_RE = re.compile(r"^\s*%mend\b", re.IGNORECASE)
+_SAS_STEP_END_RE = re.compile(r"^\s*(?:run|quit)\s*;", re.IGNORECASE)
+
+
+def _sas_boundaries(raw_code: str) -> list[Boundary]:
+    boundaries: list[Boundary] = []
+    depth = 0  # %macro nesting
+    in_step = False
+    statement_start = True
+    for i, line in enumerate(strip_comments(raw_code, "sas").splitlines(), 1):
+        stripped = line.strip()
+        if not stripped:
+            continue
+        if _SAS_MACRO_RE.match(line):
+            boundaries.append((i, depth))
+            depth += 1
+            in_step = False
+        elif _SAS_MEND_RE.match(line):
+            depth = max(0, depth - 1)
+            in_step = False
+        elif statement_start and (_SAS_UNIT_RE.match(line) or not in_step):
+            # A DATA / PROC step (which also ends an unterminated one) or a global statement
+            boundaries.append((i, depth))
+            in_step = bool(_SAS_UNIT_RE.match(line))
+        if in_step and _SAS_STEP_END_RE.match(line):
+            in_step = False
+        statement_start = stripped.endswith(";")
+    return boundaries
+
+
+_BOUNDARIES = {"python": _python_boundaries, "r": _r_boundaries, "sas": _sas_boundaries}
+
+
+def code_boundaries(raw_code: str, language: str) -> list[Boundary]:
+    """Return the unit boundaries of ``raw_code``, each pulled up over the comments above it."""
+    scan = _BOUNDARIES.get(language.lower())
+    if scan is None:
+        return []
+    raw_lines = raw_code.splitlines()
+    code_lines = strip_comments(raw_code, "sas" if language.lower() == "sas" else "r").splitlines()
+
+    def is_comment(line: int) -> bool:
+        return bool(raw_lines[line - 1].strip()) and not code_lines[line - 1].strip()
+
+    boundaries: list[Boundary] = []
+    for line, depth in sorted(set(scan(raw_code))):
+        floor = boundaries[-1][0] + 1 if boundaries else 1
+        while line > floor and is_comment(line - 1):
+            line -= 1
+        if boundaries and boundaries[-1][0] == line:
+            continue
+        boundaries.append((line, depth))
+    return boundaries
+
+
+# ---------------------------------------------------------------------------
+# Split
+# ---------------------------------------------------------------------------
+
+def _pack(start: int, end: int, boundaries: list[Boundary], max_lines: int, depth: int = 0) -> list[tuple[int, int]]:
+    """Cover lines ``start``..``end`` with ranges of at most ``max_lines``, cut at boundaries."""
+    cuts = sorted({start} | {line for line, d in boundaries if d <= depth and start < line <= end})
+    units = [(a, b - 1) for a, b in zip(cuts, cuts[1:] + [end + 1])]
+
+    ranges: list[tuple[int, int]] = []
+    for a, b in units:
+        if b - a + 1 > max_lines:
+            nested = [(line, d) for line, d in boundaries if a < line <= b and d > depth]
+            if nested:
+                ranges.extend(_pack(a, b, boundaries, max_lines, depth + 1))
+            else:
+                ranges.extend((s, min(s + max_lines - 1, b)) for s in range(a, b + 1, max_lines))
+            continue
+        if ranges and b - ranges[-1][0] + 1 <= max_lines:
+            ranges[-1] = (ranges[-1][0], b)
+        else:
+            ranges.append((a, b))
+    return ranges
+
+
+def split_code(raw_code: str, language: str, max_lines: int) -> list[CodeChunk]:
+    """Split ``raw_code`` into chunks of at most ~``max_lines`` lines on unit boundaries."""
+    lines = raw_code.splitlines()
+    if len(lines) <= max_lines:
+        return [CodeChunk(raw_code, 1, max(1, len(lines)))]
+
+    boundaries = code_boundaries(raw_code, language)
+    return [
+        CodeChunk("\n".join(lines[a - 1:b]), a, b)
+        for a, b in _pack(1, len(lines), boundaries, max_lines)
+    ]
+
+
+# ---------------------------------------------------------------------------
+# Merge
+# ---------------------------------------------------------------------------
+
+def _key(text: str) -> str:
+    return " ".join(text.lower().split())
+
+
+def _dedupe(items: list[str]) -> list[str]:
+    seen: set[str] = set()
+    out: list[str] = []
+    for item in items:
+        key = _key(item)
+        if key and key not in seen:
+            seen.add(key)
+            out.append(item)
+    return out
+
+
+def merge_parsed_code(parts: list[ParsedCode], language: str) -> ParsedCode:
+    """Merge per-chunk ``ParsedCode`` results (already at absolute line numbers) into one.
+
+    Sections are ordered by their first line, dropping exact repeats (same
+    name and line range); the variable, transformation, filter and
+    hardcoded-value lists are de-duplicated case- and whitespace-insensitively.
+    The summary is the first chunk's (it sees the program's header and setup)
+    plus a note of the chunk count, so it stays one summary however many
+    chunks there were.
+    """
+    sections: dict[tuple[str, str], Section] = {}
+    for part in parts:
+        for section in part.sections:
+            sections.setdefault((_key(section.name), section.line_range), section)
+    ordered = sorted(sections.values(), key=lambda s: (parse_line_range(s.line_range) or (0, 0))[0])
+
+    summary = next((p.summary.strip() for p in parts if p.summary.strip()), "")
+    if len(parts) > 1:
+        summary = f"{summary} (Parsed in {len(parts)} chunks.)".strip()
+
+    return ParsedCode(
+        language=language,
+        summary=summary,
+        sections=ordered,
+        variables=_dedupe([v for p in parts for v in p.variables]),
+        transformations=_dedupe([t for p in parts for t in p.transformations]),
+        filters=_dedupe([f for p in parts for f in p.filters]),
+        hardcoded_values=_dedupe([h for p in parts for h in p.hardcoded_values]),
+    )
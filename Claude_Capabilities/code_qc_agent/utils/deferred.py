@@ -0,0 +1,49 @@
+"""Deferred model calls — collect requests instead of sending them.
+
+While a ``RequestCollector`` is active (``collecting``), ``BaseAgent._stream_parse``
+does not call the API on a response-cache miss: it records the request under
+its cache key and raises ``ResultsPending``.  Bulk mode runs the normal
+pipeline this way, submits the collected requests as a message batch, stores
+the results under the same keys, and runs the pipeline again until it
+completes from stored results alone.
+"""
+
+import contextvars
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+
+class ResultsPending(Exception):
+    """Raised in place of a model call whose result has not been produced yet."""
+
+
+class RequestCollector:
+    """Thread-safe map of cache key → Messages API request parameters."""
+
+    def __init__(self) -> None:
+        self.requests: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def add(self, key: str, params: dict) -> None:
+        with self._lock:
+            self.requests[key] = params
+
+
+_current: contextvars.ContextVar[RequestCollector | None] = contextvars.ContextVar(
+    "qc_request_collector", default=None
+)
+
+
+def current() -> RequestCollector | None:
+    """Return the active collector, or None when calls should be sent normally."""
+    return _current.get()
+
+
+@contextmanager
+def collecting(collector: RequestCollector) -> Iterator[RequestCollector]:
+    token = _current.set(collector)
+    try:
+        yield collector
+    finally:
+        _current.reset(token)
@@ -1,7 +1,9 @@
 """Word document report writer for the Code QC Agent."""
 
+from copy import deepcopy
 from datetime import datetime
 from pathlib import Path
+from typing import Callable, Hashable, Iterable
 
 from docx import Document
 from docx.oxml import OxmlElement
@@ -10,6 +12,7 @@ from docx.shared import RGBColor
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 
 from utils.models import LogicQCResult, StructureQCResult, QCFinding
+from utils.section_index import TraceLink, format_sections
 
 
 # Hex fill colours for status cells
@@ -64,6 +67,38 @@ def _add_header_row(table, headers: list[str]) -> None:
         _set_cell_text(cell, label, bold=True, color=_WHITE)
 
 
+def _add_rows(
+    table,
+    rows: Iterable[tuple[Hashable, list[str]]],
+    style: Callable[[list, Hashable], None],
+) -> None:
+    """Append ``(style key, cell texts)`` rows to ``table`` in bulk.
+
+    ``table.cell()`` rebuilds the whole cell grid on every call, so filling a
+    table cell by cell is quadratic in its size.  Instead, one empty row per
+    distinct style key is formatted with ``style(cells, key)`` through the
+    normal python-docx API and detached as a template; every data row is a deep
+    copy of its template with the texts filled in, appended to the table XML.
+    """
+    tbl = table._tbl
+    templates: dict[Hashable, object] = {}
+    for key, values in rows:
+        template = templates.get(key)
+        if template is None:
+            row = table.add_row()
+            for cell in row.cells:
+                cell.text = ""
+            style(row.cells, key)
+            template = templates[key] = row._tr
+            tbl.remove(template)
+
+        tr = deepcopy(template)
+        for tc, value in zip(tr.iterchildren(qn("w:tc")), values):
+            # Same run content as ``cell.text = value`` (tabs and line breaks included)
+            tc.find(qn("w:p")).find(qn("w:r")).text = value
+        tbl.append(tr)
+
+
 # ---------------------------------------------------------------------------
 # Findings table
 # ---------------------------------------------------------------------------
@@ -74,28 +109,27 @@ def _add_findings_table(doc: Document, findings: list[QCFinding]) -> None:
         return
 
     headers = ["Title", "Status", "Detail", "Recommendation", "Priority"]
-    table = doc.add_table(rows=1 + len(findings), cols=len(headers))
+    table = doc.add_table(rows=1, cols=len(headers))
     table.style = "Table Grid"
     _add_header_row(table, headers)
 
-    for row_idx, finding in enumerate(findings, start=1):
-        values = [
-            finding.title,
-            finding.status,
-            finding.detail,
-            finding.recommendation,
-            finding.priority,
-        ]
-        for col_idx, val in enumerate(values):
-            cell = table.cell(row_idx, col_idx)
-            cell.text = val
-
-            # Colour the Status cell
-            if col_idx == 1:
-                bg = _STATUS_BG.get(finding.status, "FFFFFF")
-                _set_cell_bg(cell, bg)
-                if finding.status == "FAIL" and cell.paragraphs[0].runs:
-                    cell.paragraphs[0].runs[0].font.color.rgb = _WHITE
+    def style(cells, status) -> None:
+        # Colour the Status cell
+        _set_cell_bg(cells[1], _STATUS_BG.get(status, "FFFFFF"))
+        if status == "FAIL":
+            cells[1].paragraphs[0].runs[0].font.color.rgb = _WHITE
+
+    _add_rows(
+        table,
+        (
+            (
+                finding.status,
+                [finding.title, finding.status, finding.detail, finding.recommendation, finding.priority],
+            )
+            for finding in findings
+        ),
+        style,
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -117,28 +151,56 @@ def _add_summary_table(
         ("Total",        total_pass,                  total_fail,                  total_warn),
     ]
 
-    table = doc.add_table(rows=1 + len(rows_data), cols=4)
+    table = doc.add_table(rows=1, cols=4)
     table.style = "Table Grid"
     _add_header_row(table, ["Category", "PASS", "FAIL", "WARNING"])
 
-    for row_idx, (label, passes, fails, warns) in enumerate(rows_data, start=1):
-        table.cell(row_idx, 0).text = label
+    def style(cells, key) -> None:
+        has_fails, has_warns = key
+        _set_cell_bg(cells[1], "00B050")
+        if has_fails:
+            _set_cell_bg(cells[2], "C00000")
+            cells[2].paragraphs[0].runs[0].font.color.rgb = _WHITE
+        if has_warns:
+            _set_cell_bg(cells[3], "FF8C00")
+
+    _add_rows(
+        table,
+        (
+            ((fails > 0, warns > 0), [label, str(passes), str(fails), str(warns)])
+            for label, passes, fails, warns in rows_data
+        ),
+        style,
+    )
 
-        pass_cell = table.cell(row_idx, 1)
-        pass_cell.text = str(passes)
-        _set_cell_bg(pass_cell, "00B050")
 
-        fail_cell = table.cell(row_idx, 2)
-        fail_cell.text = str(fails)
-        if fails > 0:
-            _set_cell_bg(fail_cell, "C00000")
-            if fail_cell.paragraphs[0].runs:
-                fail_cell.paragraphs[0].runs[0].font.color.rgb = _WHITE
+# ---------------------------------------------------------------------------
+# Traceability table
+# ---------------------------------------------------------------------------
 
-        warn_cell = table.cell(row_idx, 3)
-        warn_cell.text = str(warns)
-        if warns > 0:
-            _set_cell_bg(warn_cell, "FF8C00")
+def _add_traceability_table(doc: Document, traceability: list[TraceLink]) -> None:
+    if not traceability:
+        doc.add_paragraph("No specification rules recorded.")
+        return
+
+    headers = ["Rule", "Code Sections", "Shared Variables"]
+    table = doc.add_table(rows=1, cols=len(headers))
+    table.style = "Table Grid"
+    _add_header_row(table, headers)
+
+    def style(cells, unmatched) -> None:
+        # Rules with no matching section stand out
+        if unmatched:
+            _set_cell_bg(cells[1], _STATUS_BG["WARNING"])
+
+    _add_rows(
+        table,
+        (
+            (not link.sections, [link.rule, format_sections(link), ", ".join(link.variables)])
+            for link in traceability
+        ),
+        style,
+    )
 
 
 # ---------------------------------------------------------------------------
@@ -151,8 +213,13 @@ def write_report(
     logic_result: LogicQCResult,
     structure_result: StructureQCResult,
     output_path: str,
+    traceability: list[TraceLink] | None = None,
 ) -> None:
-    """Build and save the QC Word report."""
+    """Build and save the QC Word report.
+
+    ``traceability`` (rule → code sections, from ``utils.section_index``) adds
+    a Rule Traceability table after the findings.
+    """
     doc = Document()
 
     # --- Title ---
@@ -178,6 +245,12 @@ def write_report(
     doc.add_heading("Structure QC Findings", level=1)
     _add_findings_table(doc, structure_result.findings)
 
+    # --- Rule Traceability ---
+    if traceability is not None:
+        doc.add_paragraph("")
+        doc.add_heading("Rule Traceability", level=1)
+        _add_traceability_table(doc, traceability)
+
     # --- Save ---
     Path(output_path).parent.mkdir(parents=True, exist_ok=True)
     doc.save(output_path)
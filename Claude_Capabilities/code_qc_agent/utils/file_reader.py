@@ -1,12 +1,22 @@
 """File reading utilities for source-of-truth and code files."""
 
+import multiprocessing
+import os
+import posixpath
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Iterator
 
 
-def read_sot_file(path: str) -> str:
+def read_sot_file(path: str, pdf_workers: int = 1) -> str:
     """Read a source-of-truth file and return its content as text.
 
     Supported formats: .xlsx, .docx, .pdf
+    ``pdf_workers`` > 1 extracts PDF pages on a process pool.
+
+    The streaming readers below bound the memory used while *extracting*; the
+    joined text is still held whole, since the pipeline hashes, diffs and
+    sends the full spec.
     """
     p = Path(path)
     ext = p.suffix.lower()
@@ -16,60 +26,312 @@ def read_sot_file(path: str) -> str:
     elif ext == ".docx":
         return _read_docx(p)
     elif ext == ".pdf":
-        return _read_pdf(p)
+        return _read_pdf(p, workers=pdf_workers)
     else:
         raise ValueError(f"Unsupported source-of-truth format: {ext!r}. Use .xlsx, .docx, or .pdf")
 
 
 def _read_xlsx(path: Path) -> str:
+    return "\n".join(iter_xlsx_lines(path))
+
+
+def iter_xlsx_lines(path: str | Path) -> Iterator[str]:
+    """Stream a workbook sheet by sheet as compact, header-keyed text lines.
+
+    The workbook is opened read-only (rows are streamed, styles are never
+    loaded).  Each sheet starts with ``=== Sheet: name ===``; once a header
+    row is found it is emitted once as ``Columns: ...`` and every following
+    row as ``Header: value | Header: value`` with empty cells left out.
+    """
     import openpyxl
 
-    wb = openpyxl.load_workbook(path, data_only=True)
-    parts: list[str] = []
+    wb = openpyxl.load_workbook(path, read_only=True, data_only=True)
+    try:
+        for ws in wb.worksheets:
+            yield f"=== Sheet: {ws.title} ==="
+            yield from _compact_rows(ws.iter_rows(values_only=True))
+    finally:
+        wb.close()
+
 
-    for sheet_name in wb.sheetnames:
-        ws = wb[sheet_name]
-        parts.append(f"=== Sheet: {sheet_name} ===")
-        for row in ws.iter_rows(values_only=True):
-            row_text = "\t".join(str(v) if v is not None else "" for v in row)
-            if row_text.strip():
-                parts.append(row_text)
+def _cell_text(value: object) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    if hasattr(value, "isoformat"):
+        text = value.isoformat()
+        return text[:-9] if text.endswith("T00:00:00") else text
+    return str(value).strip()
 
-    return "\n".join(parts)
+
+def _looks_like_header(cells: list[str], raw: tuple) -> bool:
+    """A header has 2+ filled cells, all text, covering most of its width."""
+    filled = [i for i, c in enumerate(cells) if c]
+    return (
+        len(filled) >= 2
+        and all(isinstance(raw[i], str) for i in filled)
+        and len(filled) * 2 >= len(cells)
+    )
+
+
+def _compact_rows(rows: Iterator[tuple]) -> Iterator[str]:
+    header: list[str] | None = None
+    for raw in rows:
+        cells = [_cell_text(v) for v in raw]
+        while cells and not cells[-1]:
+            cells.pop()
+        if not cells:
+            continue
+
+        if header is None:
+            if _looks_like_header(cells, raw):
+                header = [c or f"col{i + 1}" for i, c in enumerate(cells)]
+                yield "Columns: " + " | ".join(header)
+            else:
+                yield " | ".join(c for c in cells if c)
+            continue
+
+        yield " | ".join(
+            f"{header[i] if i < len(header) else f'col{i + 1}'}: {c}"
+            for i, c in enumerate(cells)
+            if c
+        )
 
 
 def _read_docx(path: Path) -> str:
-    from docx import Document
+    return "\n".join(iter_docx_lines(path))
+
+
+_W = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+_R_ID = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id"
+_OFFICE_DOCUMENT = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument"
+_STYLES = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/styles"
+
+# Run content that contributes text, as python-docx reads it
+_TEXT_TAGS = {f"{_W}t": None, f"{_W}tab": "\t", f"{_W}br": "\n", f"{_W}cr": "\n"}
+# Never descend into these when collecting a paragraph's text
+_SKIPPED_TAGS = {f"{_W}del", f"{_W}txbxContent", f"{_W}pPr", f"{_W}rPr"}
+
+
+def iter_docx_lines(path: str | Path) -> Iterator[str]:
+    """Stream a Word document's body in document order, in one pass over its XML.
+
+    Paragraphs are yielded as text; Heading / Title paragraphs become
+    ``=== Heading 1: text ===`` section markers.  Each table is yielded where
+    it appears (after the heading it belongs to) as ``[TABLE]`` followed by one
+    ``a | b | c`` line per non-empty row.  A merged cell is emitted once: a
+    ``gridSpan`` cell counts once, and the continuation cells of a vertical
+    merge are left empty instead of repeating the merged text.  Tables nested
+    in a cell follow the row that contains them.
+
+    The body is parsed incrementally and each top-level block is freed once it
+    has been yielded, so memory does not grow with the document.
+    """
+    import zipfile
+
+    from lxml import etree
+
+    with zipfile.ZipFile(path) as archive:
+        document_part, styles_part = _docx_parts(archive, etree)
+        style_names = _docx_style_names(archive, styles_part, etree)
+        with archive.open(document_part) as stream:
+            for _, elem in etree.iterparse(stream, events=("end",), tag=(f"{_W}p", f"{_W}tbl")):
+                if not _is_body_block(elem):
+                    continue  # part of a table or text box; handled with its block
+                if elem.tag == f"{_W}p":
+                    line = _docx_paragraph_line(elem, style_names)
+                    if line:
+                        yield line
+                else:
+                    yield from _docx_table_lines(elem)
+                # Free the block and everything before it
+                elem.clear()
+                parent = elem.getparent()
+                while elem.getprevious() is not None:
+                    del parent[0]
+
+
+def _docx_parts(archive, etree) -> tuple[str, str | None]:
+    """Return the document and styles part names, following the package relationships."""
 
-    doc = Document(str(path))
+    def targets(rels_name: str, base: str) -> dict[str, str]:
+        try:
+            root = etree.fromstring(archive.read(rels_name))
+        except KeyError:
+            return {}
+        return {
+            rel.get("Type"): posixpath.normpath(posixpath.join(base, rel.get("Target"))).lstrip("/")
+            for rel in root.iter(f"{_REL}Relationship")
+            if rel.get("TargetMode") != "External"
+        }
+
+    document = targets("_rels/.rels", "").get(_OFFICE_DOCUMENT, "word/document.xml")
+    directory, name = posixpath.split(document)
+    styles = targets(posixpath.join(directory, "_rels", f"{name}.rels"), directory).get(_STYLES)
+    return document, styles
+
+
+def _docx_style_names(archive, styles_part: str | None, etree) -> dict[str, str]:
+    """Map paragraph style ids to their display names (``heading 1`` → ``Heading 1``)."""
+    names: dict[str, str] = {}
+    if styles_part is None:
+        return names
+    try:
+        root = etree.fromstring(archive.read(styles_part))
+    except KeyError:
+        return names
+    for style in root.iter(f"{_W}style"):
+        name = style.find(f"{_W}name")
+        if name is not None and style.get(f"{_W}type") == "paragraph":
+            # Built-in styles are stored lower-case; python-docx shows them capitalised
+            value = name.get(f"{_W}val", "")
+            names[style.get(f"{_W}styleId")] = value[:1].upper() + value[1:]
+    return names
+
+
+def _is_body_block(elem) -> bool:
+    """True for a paragraph or table directly in the body (content controls included)."""
+    parent = elem.getparent()
+    while parent is not None:
+        tag = parent.tag
+        if tag == f"{_W}body":
+            return True
+        if tag not in (f"{_W}sdtContent", f"{_W}sdt", f"{_W}customXml"):
+            return False
+        parent = parent.getparent()
+    return False
+
+
+def _docx_text(elem) -> str:
+    """Text of a paragraph's runs, hyperlinks and insertions (not deletions or text boxes)."""
     parts: list[str] = []
+    stack = [iter(elem)]
+    while stack:
+        child = next(stack[-1], None)
+        if child is None:
+            stack.pop()
+            continue
+        tag = child.tag
+        if tag in _TEXT_TAGS:
+            parts.append(child.text or "" if _TEXT_TAGS[tag] is None else _TEXT_TAGS[tag])
+        elif tag not in _SKIPPED_TAGS:
+            stack.append(iter(child))
+    return "".join(parts)
+
+
+def _docx_paragraph_line(p, style_names: dict[str, str]) -> str:
+    text = _docx_text(p)
+    if not text.strip():
+        return ""
+    style_id = p.find(f"{_W}pPr/{_W}pStyle")
+    style = style_names.get(style_id.get(f"{_W}val"), "") if style_id is not None else ""
+    # Headings become section markers so the text can be split on them
+    if style.startswith("Heading") or style == "Title":
+        return f"=== {style}: {text.strip()} ==="
+    return text
+
+
+def _docx_table_lines(tbl) -> Iterator[str]:
+    yield "[TABLE]"
+    for tr in tbl.iterchildren(f"{_W}tr"):
+        cells: list[str] = []
+        nested: list = []
+        for tc in tr.iter(f"{_W}tc"):
+            if tc.getparent() is not tr and tc.getparent().tag != f"{_W}sdtContent":
+                continue  # a cell of a nested table
+            cells.append("" if _is_merge_continuation(tc) else _docx_cell_text(tc, nested))
+        row_text = " | ".join(cells)
+        if row_text.strip(" |"):
+            yield row_text
+        for inner in nested:
+            yield from _docx_table_lines(inner)
+
 
-    for para in doc.paragraphs:
-        if para.text.strip():
-            parts.append(para.text)
+def _is_merge_continuation(tc) -> bool:
+    """True for a cell continuing a vertical (or legacy horizontal) merge from the cell before it."""
+    props = tc.find(f"{_W}tcPr")
+    if props is None:
+        return False
+    for tag in (f"{_W}vMerge", f"{_W}hMerge"):
+        merge = props.find(tag)
+        if merge is not None and merge.get(f"{_W}val", "continue") == "continue":
+            return True
+    return False
 
-    for table in doc.tables:
-        parts.append("[TABLE]")
-        for row in table.rows:
-            row_text = " | ".join(cell.text.strip() for cell in row.cells)
-            if row_text.strip():
-                parts.append(row_text)
 
-    return "\n".join(parts)
+def _docx_cell_text(tc, nested: list) -> str:
+    """A cell's paragraphs, one per line; its nested tables are added to ``nested``."""
+    lines: list[str] = []
+    for child in tc:
+        if child.tag == f"{_W}p":
+            lines.append(_docx_text(child))
+        elif child.tag == f"{_W}tbl":
+            nested.append(child)
+    return "\n".join(lines).strip()
 
 
-def _read_pdf(path: Path) -> str:
+def _read_pdf(path: Path, workers: int = 1) -> str:
+    return "\n".join(iter_pdf_pages(path, workers=workers))
+
+
+def iter_pdf_pages(path: str | Path, workers: int = 1, pages_per_task: int = 16) -> Iterator[str]:
+    """Yield ``"=== Page N ===\n<text>"`` for each non-empty PDF page, in page order.
+
+    With ``workers`` > 1 the page range is split into ``pages_per_task``-page
+    slices extracted on a process pool (capped at the CPU count).  At most two
+    slices per worker are in flight, so extraction memory stays bounded however
+    long the document is (a caller that joins the pages still holds the whole
+    text).  Workers are spawned, not forked: the reader runs inside
+    threaded batch, daemon and ``run_many`` processes, and a forked child can
+    inherit a lock (HTTP pool, logging, SQLite) held by another thread.
+    """
     import pdfplumber
 
-    parts: list[str] = []
+    workers = min(workers, os.cpu_count() or 1)
+
     with pdfplumber.open(str(path)) as pdf:
-        for i, page in enumerate(pdf.pages, 1):
+        page_count = len(pdf.pages)
+        if workers <= 1 or page_count <= pages_per_task:
+            for i, page in enumerate(pdf.pages, 1):
+                text = page.extract_text()
+                page.close()  # release the page's cached layout objects
+                if text:
+                    yield f"=== Page {i} ===\n{text}"
+            return
+
+    slices = [
+        (start, min(start + pages_per_task, page_count))
+        for start in range(0, page_count, pages_per_task)
+    ]
+    window = workers * 2
+    spawn = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=spawn) as pool:
+        pending = [pool.submit(_extract_pdf_pages, str(path), s, e) for s, e in slices[:window]]
+        next_slice = window
+        while pending:
+            pages = pending.pop(0).result()
+            if next_slice < len(slices):
+                s, e = slices[next_slice]
+                pending.append(pool.submit(_extract_pdf_pages, str(path), s, e))
+                next_slice += 1
+            for number, text in pages:
+                yield f"=== Page {number} ===\n{text}"
+
+
+def _extract_pdf_pages(path: str, start: int, end: int) -> list[tuple[int, str]]:
+    """Process-pool worker: extract pages ``start..end-1`` (0-based) as ``(page number, text)``."""
+    import pdfplumber
+
+    out: list[tuple[int, str]] = []
+    with pdfplumber.open(path, pages=list(range(start + 1, end + 1))) as pdf:
+        for page in pdf.pages:
             text = page.extract_text()
             if text:
-                parts.append(f"=== Page {i} ===")
-                parts.append(text)
-
-    return "\n".join(parts)
+                out.append((page.page_number, text))
+            page.close()
+    return out
 
 
 def read_code_file(path: str) -> tuple[str, str]:
@@ -0,0 +1,328 @@
+"""Incremental re-QC — diff a program against its last QC run and plan the minimum rework.
+
+The previous run's inputs and results are kept as a ``QCState`` JSON file per
+code file.  On the next run ``plan_update`` diffs the old and new source,
+keeps every section the edit did not touch (with its line range shifted to
+the new numbering) and returns the regions of the new source that must be
+re-parsed.  ``touched_rules`` then picks the spec rules whose variables
+appear in the edited text, so only those are sent back to Logic QC.
+"""
+
+import difflib
+import hashlib
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from pydantic import BaseModel
+
+from utils.line_ranges import format_line_range, parse_line_range
+from utils.models import (
+    INCOMPLETE_TITLE,
+    LogicQCResult,
+    ParsedCode,
+    ParsedDoc,
+    QCFinding,
+    Rule,
+    Section,
+    StructureQCResult,
+    is_incomplete,
+)
+
+
+class QCState(BaseModel):
+    """Everything from a completed run that the next incremental run can reuse."""
+
+    code_path: str
+    language: str
+    raw_code: str
+    sot_hash: str
+    parsed_doc: ParsedDoc
+    parsed_code: ParsedCode
+    logic_result: LogicQCResult
+    structure_result: StructureQCResult
+
+
+def text_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _state_file(state_dir: str, code_path: str) -> Path:
+    resolved = str(Path(code_path).resolve())
+    digest = hashlib.sha256(resolved.encode("utf-8")).hexdigest()[:16]
+    return Path(state_dir) / f"{Path(code_path).stem}_{digest}.json"
+
+
+def load_state(state_dir: str, code_path: str) -> QCState | None:
+    path = _state_file(state_dir, code_path)
+    if not path.exists():
+        return None
+    try:
+        return QCState.model_validate_json(path.read_text(encoding="utf-8"))
+    except ValueError:
+        # Written by an older model schema — start over with a full run.
+        return None
+
+
+def save_state(state_dir: str, state: QCState) -> bool:
+    """Write ``state``; return False (keeping the last complete state) if a QC result was cut short.
+
+    An unchanged program reuses its saved results as they are, so a result
+    truncated by a streaming budget must not become the state.
+    """
+    if is_incomplete(state.logic_result) or is_incomplete(state.structure_result):
+        return False
+    path = _state_file(state_dir, state.code_path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(state.model_dump_json(), encoding="utf-8")
+    return True
+
+
+# ---------------------------------------------------------------------------
+# Diff planning
+# ---------------------------------------------------------------------------
+
+@dataclass
+class UpdatePlan:
+    kept_sections: list[Section] = field(default_factory=list)
+    # 1-based, inclusive line ranges of the NEW source that must be re-parsed
+    regions: list[tuple[int, int]] = field(default_factory=list)
+    # The same regions in the OLD numbering — what previous findings cite
+    old_regions: list[tuple[int, int]] = field(default_factory=list)
+    # Names of previous sections the edit touched
+    touched_sections: list[str] = field(default_factory=list)
+    # Removed and inserted source lines — used to decide which rules were touched
+    changed_text: str = ""
+
+    @property
+    def unchanged(self) -> bool:
+        return not self.regions and not self.changed_text
+
+
+def plan_update(previous: ParsedCode, old_source: str, new_source: str) -> UpdatePlan | None:
+    """Diff two versions of a program against the previous ``ParsedCode``.
+
+    Returns None when the previous sections carry no usable line ranges, in
+    which case the caller should fall back to a full parse.
+    """
+    ranges = [parse_line_range(s.line_range) for s in previous.sections]
+    if not previous.sections or any(r is None for r in ranges):
+        return None
+
+    old_lines = old_source.splitlines()
+    new_lines = new_source.splitlines()
+    opcodes = difflib.SequenceMatcher(None, old_lines, new_lines, autojunk=False).get_opcodes()
+
+    plan = UpdatePlan()
+    hunks = [op for op in opcodes if op[0] != "equal"]
+    if not hunks:
+        plan.kept_sections = list(previous.sections)
+        return plan
+
+    changed: list[str] = []
+    for _, i1, i2, j1, j2 in hunks:
+        changed.extend(old_lines[i1:i2])
+        changed.extend(new_lines[j1:j2])
+    plan.changed_text = "\n".join(changed)
+
+    def old_to_new(line: int) -> int:
+        """Map a 1-based old line number to the new numbering (nearest line for edits)."""
+        for tag, i1, i2, j1, j2 in opcodes:
+            if i1 < line <= i2 or (i1 == i2 and line == i1):
+                if tag == "equal":
+                    return j1 + (line - i1)
+                return min(max(j1 + 1, j1 + (line - i1)), max(j2, j1 + 1))
+        return max(len(new_lines), 1)
+
+    regions: list[tuple[int, int]] = []
+    old_regions: list[tuple[int, int]] = []
+    for section, (start, end) in zip(previous.sections, ranges):
+        touched = any(
+            # Replaced/deleted old lines overlap the section, or an insertion lands inside it
+            (i1 < end and i2 >= start) if i2 > i1 else (start <= i1 + 1 <= end + 1)
+            for _, i1, i2, _, _ in hunks
+        )
+        new_start, new_end = old_to_new(start), old_to_new(end)
+        if touched:
+            regions.append((new_start, new_end))
+            old_regions.append((start, end))
+            plan.touched_sections.append(section.name)
+        else:
+            plan.kept_sections.append(
+                section.model_copy(update={"line_range": format_line_range(new_start, new_end)})
+            )
+
+    # Inserted/replaced lines that fall outside every section (e.g. appended code)
+    for _, i1, i2, j1, j2 in hunks:
+        if j2 > j1:
+            regions.append((j1 + 1, j2))
+        # Deleted lines, or the old line an insertion follows
+        old_regions.append((i1 + 1, i2) if i2 > i1 else (max(i1, 1), i1 + 1))
+
+    plan.regions = _merge_regions(regions, len(new_lines))
+    plan.old_regions = _merge_regions(old_regions, len(old_lines))
+    return plan
+
+
+def _merge_regions(regions: list[tuple[int, int]], line_count: int) -> list[tuple[int, int]]:
+    merged: list[tuple[int, int]] = []
+    for start, end in sorted(regions):
+        start, end = max(1, start), min(max(end, start), line_count)
+        if start > end:
+            continue
+        if merged and start <= merged[-1][1] + 1:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _dedupe(items: list[str]) -> list[str]:
+    seen: set[str] = set()
+    out: list[str] = []
+    for item in items:
+        key = item.strip().lower()
+        if key and key not in seen:
+            seen.add(key)
+            out.append(item)
+    return out
+
+
+def _words(text: str) -> set[str]:
+    return {w.lower() for w in re.findall(r"[A-Za-z_][A-Za-z0-9_.]*", text)}
+
+
+def splice_parsed_code(
+    previous: ParsedCode,
+    plan: UpdatePlan,
+    region_results: list[ParsedCode],
+    new_source: str,
+) -> ParsedCode:
+    """Combine the kept sections with freshly parsed regions into one ``ParsedCode``.
+
+    Variables that no longer occur anywhere in the new source are dropped;
+    the free-text lists are unioned.
+    """
+    sections = plan.kept_sections + [s for r in region_results for s in r.sections]
+    sections.sort(key=lambda s: (parse_line_range(s.line_range) or (0, 0))[0])
+
+    source_words = _words(new_source)
+    variables = [v for v in previous.variables if v.lower() in source_words]
+
+    return ParsedCode(
+        language=previous.language,
+        summary=previous.summary,
+        sections=sections,
+        variables=_dedupe(variables + [v for r in region_results for v in r.variables]),
+        transformations=_dedupe(
+            previous.transformations + [t for r in region_results for t in r.transformations]
+        ),
+        filters=_dedupe(previous.filters + [f for r in region_results for f in r.filters]),
+        hardcoded_values=_dedupe(
+            previous.hardcoded_values + [h for r in region_results for h in r.hardcoded_values]
+        ),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Rule selection and finding carry-forward
+# ---------------------------------------------------------------------------
+
+_LINE_CITE_RE = re.compile(r"\blines?\s+(\d+)(?:\s*(?:-|–|—|to|\.\.)\s*(\d+))?", re.IGNORECASE)
+# Similarity above which a finding's ``rule`` text is taken to name a spec rule
+_PARAPHRASE_RATIO = 0.75
+
+
+def _rule_key(text: str) -> str:
+    """Normalise a rule title so case, whitespace and punctuation do not matter."""
+    return " ".join(re.findall(r"[a-z0-9]+", text.lower()))
+
+
+def _match_rule(text: str, keys: set[str]) -> str | None:
+    """Map a finding's ``rule`` text to one of ``keys``, tolerating a paraphrase."""
+    key = _rule_key(text)
+    if not key:
+        return None
+    if key in keys:
+        return key
+    contained = [k for k in keys if k and (k in key or key in k)]
+    if contained:
+        return max(contained, key=len)
+    scored = [(difflib.SequenceMatcher(None, key, k).ratio(), k) for k in keys]
+    best = max(scored, default=(0.0, None))
+    return best[1] if best[0] >= _PARAPHRASE_RATIO else None
+
+
+def _cites_change(finding: QCFinding, plan: UpdatePlan) -> bool:
+    """Whether a finding cites an edited line range or a touched section."""
+    text = f"{finding.title}\n{finding.detail}"
+    for m in _LINE_CITE_RE.finditer(text):
+        start = int(m.group(1))
+        end = int(m.group(2) or start)
+        start, end = min(start, end), max(start, end)
+        if any(start <= r_end and end >= r_start for r_start, r_end in plan.old_regions):
+            return True
+    lowered = text.lower()
+    return any(name.strip() and name.strip().lower() in lowered for name in plan.touched_sections)
+
+
+def touched_rules(
+    parsed_doc: ParsedDoc,
+    previous_findings: list[QCFinding],
+    plan: UpdatePlan,
+    region_results: list[ParsedCode],
+) -> list[Rule]:
+    """Return the rules that must be re-checked after an edit.
+
+    A rule is re-checked when one of its variables appears in the edited
+    lines or in a re-parsed region, when it names no variables at all (no
+    way to rule it out), or when the previous run has no finding for it.
+    """
+    touched_words = _words(plan.changed_text)
+    for result in region_results:
+        touched_words.update(v.lower() for v in result.variables)
+
+    keys = {_rule_key(r.title) for r in parsed_doc.rules}
+    checked = {_match_rule(f.rule, keys) for f in previous_findings if f.rule}
+    selected: list[Rule] = []
+    for rule in parsed_doc.rules:
+        if (
+            not rule.variables
+            or _rule_key(rule.title) not in checked
+            or any(v.lower() in touched_words for v in rule.variables)
+        ):
+            selected.append(rule)
+    return selected
+
+
+def carry_forward(
+    previous_findings: list[QCFinding],
+    rechecked: list[Rule],
+    new_findings: list[QCFinding],
+    plan: UpdatePlan,
+    rules: list[Rule],
+) -> list[QCFinding]:
+    """Merge new findings with previous ones that the edit cannot have invalidated.
+
+    Every previous finding tied to a re-checked rule is dropped — titles are
+    compared normalised, so a differently cased or paraphrased ``rule`` still
+    matches; ``rules`` is the full spec, so a paraphrase resolves to the
+    closest rule overall rather than to the closest re-checked one.
+    Undocumented-logic findings (no ``rule``) are dropped when a new finding
+    has the same title or when they cite an edited line range or section, and
+    an earlier "Incomplete QC response" warning is never carried forward.
+    """
+    keys = {_rule_key(r.title) for r in rules}
+    rechecked_keys = {_rule_key(r.title) for r in rechecked}
+    new_titles = {_rule_key(f.title) for f in new_findings}
+    kept: list[QCFinding] = []
+    for f in previous_findings:
+        if f.title == INCOMPLETE_TITLE:
+            continue  # belonged to a truncated call, not to this code
+        if f.rule:
+            if _match_rule(f.rule, keys) in rechecked_keys:
+                continue
+        elif _rule_key(f.title) in new_titles or _cites_change(f, plan):
+            continue
+        kept.append(f)
+    return kept + new_findings
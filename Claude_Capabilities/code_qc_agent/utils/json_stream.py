@@ -0,0 +1,77 @@
+"""Incremental scanner that pulls complete findings out of a streaming JSON object.
+
+The structured_output tool input arrives as ``input_json_delta`` fragments.
+``FindingsScanner`` is fed those fragments and returns every element of the
+top-level ``"findings"`` array as soon as its closing brace arrives, so
+findings can be shown (and kept) long before the whole response is done.
+"""
+
+import json
+
+
+class FindingsScanner:
+    """Feed JSON fragments; get back each completed ``findings[]`` element as a dict."""
+
+    def __init__(self, array_key: str = "findings") -> None:
+        self.array_key = array_key
+        self._text = ""          # unconsumed tail still needed for an open string or item
+        self._pos = 0            # scan position within _text
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = -1
+        self._last_string = ""
+        self._array_depth = -1   # depth inside the findings array, -1 until entered
+        self._item_start = -1
+
+    def feed(self, fragment: str) -> list[dict]:
+        """Consume a fragment and return the findings it completed (possibly none)."""
+        text = self._text + fragment
+        completed: list[dict] = []
+
+        for i in range(self._pos, len(text)):
+            ch = text[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1:
+                        self._last_string = text[self._string_start + 1:i]
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._string_start = i
+            elif ch in "{[":
+                if ch == "[" and self._depth == 1 and self._last_string == self.array_key:
+                    self._array_depth = self._depth + 1
+                self._depth += 1
+                if ch == "{" and self._depth == self._array_depth + 1 and self._array_depth > 0:
+                    self._item_start = i
+            elif ch in "}]":
+                if ch == "}" and self._depth == self._array_depth + 1 and self._item_start >= 0:
+                    try:
+                        completed.append(json.loads(text[self._item_start:i + 1]))
+                    except ValueError:
+                        pass
+                    self._item_start = -1
+                if ch == "]" and self._depth == self._array_depth:
+                    self._array_depth = -1
+                self._depth -= 1
+
+        # Keep only what an open key string or findings item still needs.
+        keep = len(text)
+        if self._in_string:
+            keep = min(keep, self._string_start)
+        if self._item_start >= 0:
+            keep = min(keep, self._item_start)
+        self._text = text[keep:]
+        self._pos = len(text) - keep
+        if self._in_string:
+            self._string_start -= keep
+        if self._item_start >= 0:
+            self._item_start -= keep
+        return completed
@@ -0,0 +1,33 @@
+"""Helpers for the free-text ``Section.line_range`` values produced by CodeParserAgent."""
+
+import re
+
+_RANGE_RE = re.compile(r"(\d+)\s*(?:-|–|—|to|\.\.)\s*(\d+)")
+_SINGLE_RE = re.compile(r"(\d+)")
+
+
+def parse_line_range(text: str) -> tuple[int, int] | None:
+    """Parse ``"12-40"``, ``"lines 12–40"`` or ``"12"`` into ``(start, end)``; None if absent."""
+    if not text:
+        return None
+    m = _RANGE_RE.search(text)
+    if m:
+        start, end = int(m.group(1)), int(m.group(2))
+        return (min(start, end), max(start, end))
+    m = _SINGLE_RE.search(text)
+    if m:
+        line = int(m.group(1))
+        return (line, line)
+    return None
+
+
+def format_line_range(start: int, end: int) -> str:
+    return f"{start}-{end}" if start != end else str(start)
+
+
+def shift_line_range(text: str, offset: int) -> str:
+    """Shift a line range by ``offset`` lines, leaving unparseable text untouched."""
+    parsed = parse_line_range(text)
+    if parsed is None or offset == 0:
+        return text
+    return format_line_range(parsed[0] + offset, parsed[1] + offset)
@@ -0,0 +1,284 @@
+"""Run metrics — stage wall times, model-call usage, reader and report timings.
+
+The Orchestrator creates one ``RunMetrics`` per run and activates it in a
+context variable; ``BaseAgent._stream_parse`` records each model call into
+whichever run is active.  Work handed to a thread pool must be submitted with
+``submit_in_context`` so the pool thread sees the same run.
+
+Each run is written as JSON next to its report and, optionally, in the
+Prometheus text format (for the node_exporter textfile collector).
+"""
+
+import contextvars
+import json
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import Executor, Future
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from pathlib import Path
+
+
+@dataclass
+class CallStats:
+    """Timings and token usage for one streamed model call (seconds from request start)."""
+
+    stage: str
+    model: str = ""
+    ttft_s: float | None = None           # first streamed delta
+    first_finding_s: float | None = None  # first complete finding parsed from the stream
+    total_s: float = 0.0
+    findings_streamed: int = 0
+    aborted: str = ""                     # why the call was cut short, empty if it finished
+    retries: int = 0                      # attempts beyond the first (utils.scheduler)
+    preflight_input_tokens: int = 0       # pre-flight count (payload.token_counting)
+    thinking_tokens: int = 0              # estimated from streamed thinking text
+    # From response.usage (zero when the call was cut short)
+    input_tokens: int = 0                 # uncached input tokens
+    output_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_creation_tokens: int = 0
+
+
+@dataclass
+class ReaderTiming:
+    """One input file read."""
+
+    kind: str        # "sot" or "code"
+    file_type: str   # lower-case suffix, e.g. ".pdf"
+    bytes: int
+    chars: int
+    seconds: float
+
+
+@dataclass
+class RunMetrics:
+    """Everything measured during one spec/code pipeline run."""
+
+    sot_path: str
+    code_path: str
+    started_at: str = field(default_factory=lambda: datetime.now().isoformat(timespec="seconds"))
+    total_s: float = 0.0
+    stages: dict[str, float] = field(default_factory=dict)
+    readers: list[ReaderTiming] = field(default_factory=list)
+    calls: list[CallStats] = field(default_factory=list)
+    response_cache_hits: dict[str, int] = field(default_factory=dict)
+    escalations: list[dict[str, str]] = field(default_factory=list)  # fast → full route (utils.routing)
+    report_write_s: float = 0.0
+    report_path: str = ""
+
+    def __post_init__(self) -> None:
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Recording
+    # ------------------------------------------------------------------
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        """Time a block and add its wall time to ``stages[name]``."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            with self._lock:
+                self.stages[name] = self.stages.get(name, 0.0) + elapsed
+
+    def record_reader(self, timing: ReaderTiming) -> None:
+        with self._lock:
+            self.readers.append(timing)
+
+    def record_call(self, stats: CallStats) -> None:
+        with self._lock:
+            self.calls.append(stats)
+
+    def record_cache_hit(self, stage: str) -> None:
+        with self._lock:
+            self.response_cache_hits[stage] = self.response_cache_hits.get(stage, 0) + 1
+
+    def record_escalation(self, stage: str, reason: str) -> None:
+        with self._lock:
+            self.escalations.append({"stage": stage, "reason": reason})
+
+    # ------------------------------------------------------------------
+    # Summaries and export
+    # ------------------------------------------------------------------
+
+    def call_totals(self) -> dict[str, dict[str, float]]:
+        """Sum call stats per stage (agent class name)."""
+        totals: dict[str, dict[str, float]] = {}
+        for call in self.calls:
+            t = totals.setdefault(
+                call.stage,
+                {
+                    "calls": 0,
+                    "seconds": 0.0,
+                    "max_ttft_s": 0.0,
+                    "aborted": 0,
+                    "retries": 0,
+                    "preflight_input_tokens": 0,
+                    "input_tokens": 0,
+                    "output_tokens": 0,
+                    "thinking_tokens": 0,
+                    "cache_read_tokens": 0,
+                    "cache_creation_tokens": 0,
+                },
+            )
+            t["calls"] += 1
+            t["seconds"] += call.total_s
+            t["max_ttft_s"] = max(t["max_ttft_s"], call.ttft_s or 0.0)
+            t["aborted"] += bool(call.aborted)
+            for key in (
+                "retries",
+                "preflight_input_tokens",
+                "input_tokens",
+                "output_tokens",
+                "thinking_tokens",
+                "cache_read_tokens",
+                "cache_creation_tokens",
+            ):
+                t[key] += getattr(call, key)
+        return totals
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            record = {
+                "sot_path": self.sot_path,
+                "code_path": self.code_path,
+                "started_at": self.started_at,
+                "total_s": round(self.total_s, 3),
+                "stages": {k: round(v, 3) for k, v in self.stages.items()},
+                "readers": [asdict(r) for r in self.readers],
+                "report_write_s": round(self.report_write_s, 3),
+                "report_path": self.report_path,
+                "response_cache_hits": dict(self.response_cache_hits),
+                "escalations": list(self.escalations),
+                "call_totals": self.call_totals(),
+                "calls": [asdict(c) for c in self.calls],
+            }
+        return record
+
+    def write_json(self, path: str | Path) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+        return path
+
+    def write_prometheus(self, path: str | Path) -> Path:
+        """Write the run as Prometheus text-format gauges labelled by program."""
+        program = Path(self.code_path).stem
+        lines: list[str] = []
+
+        def gauge(name: str, help_text: str, samples: list[tuple[dict, float]]) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} gauge")
+            for labels, value in samples:
+                pairs = ",".join(f'{k}="{_label(v)}"' for k, v in {"program": program, **labels}.items())
+                lines.append(f"{name}{{{pairs}}} {value}")
+
+        totals = self.call_totals()
+        gauge("qc_run_seconds", "Wall time of the whole QC run.", [({}, self.total_s)])
+        gauge(
+            "qc_stage_seconds",
+            "Wall time per pipeline stage.",
+            [({"stage": k}, v) for k, v in self.stages.items()],
+        )
+        gauge(
+            "qc_reader_seconds",
+            "Time to read each input file.",
+            [({"kind": r.kind, "file_type": r.file_type}, r.seconds) for r in self.readers],
+        )
+        gauge(
+            "qc_reader_bytes",
+            "Size of each input file.",
+            [({"kind": r.kind, "file_type": r.file_type}, r.bytes) for r in self.readers],
+        )
+        gauge("qc_report_write_seconds", "Time to write the report.", [({}, self.report_write_s)])
+        gauge(
+            "qc_model_calls",
+            "Model calls per agent.",
+            [({"agent": a}, t["calls"]) for a, t in totals.items()],
+        )
+        gauge(
+            "qc_model_call_seconds",
+            "Summed model-call wall time per agent.",
+            [({"agent": a}, t["seconds"]) for a, t in totals.items()],
+        )
+        gauge(
+            "qc_model_ttft_seconds_max",
+            "Slowest time to first token per agent.",
+            [({"agent": a}, t["max_ttft_s"]) for a, t in totals.items()],
+        )
+        gauge(
+            "qc_model_retries",
+            "HTTP retries per agent.",
+            [({"agent": a}, t["retries"]) for a, t in totals.items()],
+        )
+        gauge(
+            "qc_model_tokens",
+            "Tokens per agent and kind.",
+            [
+                ({"agent": a, "kind": kind.removesuffix("_tokens")}, t[kind])
+                for a, t in totals.items()
+                for kind in (
+                    "input_tokens",
+                    "output_tokens",
+                    "thinking_tokens",
+                    "cache_read_tokens",
+                    "cache_creation_tokens",
+                )
+            ],
+        )
+        escalated: dict[str, int] = {}
+        for e in self.escalations:
+            escalated[e["stage"]] = escalated.get(e["stage"], 0) + 1
+        gauge(
+            "qc_model_escalations",
+            "Calls escalated from the fast to the full model route per agent.",
+            [({"agent": a}, n) for a, n in escalated.items()],
+        )
+        gauge(
+            "qc_response_cache_hits",
+            "Model calls served from the local response cache.",
+            [({"agent": a}, n) for a, n in self.response_cache_hits.items()],
+        )
+
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+        return path
+
+
+def _label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", " ")
+
+
+# ---------------------------------------------------------------------------
+# Active run (context variable)
+# ---------------------------------------------------------------------------
+
+_current_run: contextvars.ContextVar[RunMetrics | None] = contextvars.ContextVar(
+    "qc_run_metrics", default=None
+)
+
+
+def current() -> RunMetrics | None:
+    """Return the run being measured in this context, if any."""
+    return _current_run.get()
+
+
+@contextmanager
+def activate(metrics: RunMetrics) -> Iterator[RunMetrics]:
+    token = _current_run.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current_run.reset(token)
+
+
+def submit_in_context(pool: Executor, fn, /, *args, **kwargs) -> Future:
+    """``pool.submit`` that runs ``fn`` in a copy of the caller's context."""
+    return pool.submit(contextvars.copy_context().run, fn, *args, **kwargs)
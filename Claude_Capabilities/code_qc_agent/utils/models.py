@@ -3,6 +3,9 @@
 from typing import Literal
 from pydantic import BaseModel, model_validator
 
+# Title of the WARNING a QC result carries when its model call was cut short
+INCOMPLETE_TITLE = "Incomplete QC response"
+
 
 class Rule(BaseModel):
     title: str
@@ -47,6 +50,7 @@ class QCFinding(BaseModel):
     detail: str
     recommendation: str
     priority: Literal["High", "Medium", "Low"]
+    rule: str = ""  # Title of the spec rule checked; empty for undocumented logic / structure
 
 
 class LogicQCResult(BaseModel):
@@ -75,3 +79,9 @@ class StructureQCResult(BaseModel):
         self.fail_count = sum(1 for f in self.findings if f.status == "FAIL")
         self.warning_count = sum(1 for f in self.findings if f.status == "WARNING")
         return self
+
+
+def is_incomplete(result: BaseModel) -> bool:
+    """True for a QC result whose model call was stopped before it finished."""
+    findings = getattr(result, "findings", None) or []
+    return any(f.title == INCOMPLETE_TITLE and f.status == "WARNING" for f in findings)
@@ -0,0 +1,94 @@
+"""Encoders for the ParsedDoc / ParsedCode payloads embedded in QC prompts.
+
+``json`` is the original indented JSON.  ``compact`` is a line-oriented form
+that states each field name once per table instead of once per record and
+drops JSON punctuation and indentation.  ``auto`` (the default) switches to
+``compact`` once the indented JSON crosses ``payload.compact_threshold_chars``.
+"""
+
+import json
+import math
+
+from pydantic import BaseModel
+
+from utils.models import ParsedCode, ParsedDoc
+
+
+def _cell(text: str) -> str:
+    """Flatten a value onto one line."""
+    return " ".join(str(text).split())
+
+
+def _field(text: str) -> str:
+    """Flatten a value onto one ``|``-separated table field, escaping a literal ``|`` as ``\\|``.
+
+    The pipe is R's and SAS's "or" (and ``||`` SAS concatenation), so it is
+    escaped rather than replaced — the model must see the logic as written.
+    """
+    return _cell(text).replace("|", "\\|")
+
+
+def encode_parsed_doc_compact(doc: ParsedDoc) -> str:
+    lines = [
+        f"DOMAIN: {_cell(doc.domain)}",
+        "Table fields are separated by \" | \"; a \\| inside a field is a literal | of the text.",
+        "",
+    ]
+    lines.append(f"RULES ({len(doc.rules)}) — title | description | variables | conditions | source_ref")
+    for rule in doc.rules:
+        lines.append(
+            " | ".join(
+                [
+                    _field(rule.title),
+                    _field(rule.description),
+                    ", ".join(_field(v) for v in rule.variables),
+                    "; ".join(_field(c) for c in rule.conditions),
+                    _field(rule.source_ref),
+                ]
+            )
+        )
+    lines.append("")
+    lines.append(f"VARIABLES ({len(doc.variables)}) — name | definition | expected_transform")
+    for var in doc.variables:
+        lines.append(
+            " | ".join([_field(var.name), _field(var.definition), _field(var.expected_transform)])
+        )
+    return "\n".join(lines)
+
+
+def encode_parsed_code_compact(code: ParsedCode) -> str:
+    lines = [f"LANGUAGE: {code.language}", f"SUMMARY: {_cell(code.summary)}", ""]
+    lines.append(f"SECTIONS ({len(code.sections)})")
+    for section in code.sections:
+        where = f" (lines {section.line_range})" if section.line_range else ""
+        lines.append(f"## {_cell(section.name)}{where}: {_cell(section.description)}")
+        lines.extend(section.code_snippet.rstrip().splitlines())
+    lines.append("")
+    lines.append("VARIABLES: " + ", ".join(_cell(v) for v in code.variables))
+    for label, items in (
+        ("TRANSFORMATIONS", code.transformations),
+        ("FILTERS", code.filters),
+        ("HARDCODED VALUES", code.hardcoded_values),
+    ):
+        lines.append(f"{label}:")
+        lines.extend(f"- {_cell(item)}" for item in items)
+    return "\n".join(lines)
+
+
+def encode_payload(model: BaseModel, settings: dict) -> str:
+    """Encode a pipeline model for a prompt according to the ``payload:`` settings."""
+    mode = settings.get("encoding", "auto")
+    pretty = json.dumps(model.model_dump(), indent=2)
+    if mode == "json" or (mode == "auto" and len(pretty) <= settings.get("compact_threshold_chars", 20000)):
+        return pretty
+
+    if isinstance(model, ParsedDoc):
+        return encode_parsed_doc_compact(model)
+    if isinstance(model, ParsedCode):
+        return encode_parsed_code_compact(model)
+    return json.dumps(model.model_dump(), separators=(",", ":"), ensure_ascii=False)
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap offline token estimate (~4 characters per token)."""
+    return math.ceil(len(text) / 4)
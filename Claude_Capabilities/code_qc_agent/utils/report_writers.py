@@ -0,0 +1,443 @@
+"""Report writers — one registered writer per output format.
+
+``report.formats`` in ``config/settings.yaml`` (or ``QC_REPORT_FORMATS``,
+set by ``main.py --formats``) selects which writers run; every format is
+written for each run, the first one being the run's primary report.
+
+Text writers (JSON, Markdown, HTML, SARIF) stream: the file is opened when
+QC starts, each finding is written as soon as it arrives, and only the
+closing summary waits for the final results.  The Word writer needs the
+whole result, so it builds its document when the session closes.
+"""
+
+import html
+import json
+import os
+import threading
+from collections import Counter
+from dataclasses import asdict
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, TextIO
+
+from utils.doc_writer import _STATUS_BG, write_report
+from utils.models import LogicQCResult, QCFinding, StructureQCResult
+from utils.section_index import TraceLink, format_sections
+
+FORMATS_ENV = "QC_REPORT_FORMATS"
+
+# Finding sections, in report order
+SECTIONS = {"logic": "Logic QC", "structure": "Structure QC"}
+
+
+class ReportWriter:
+    """Base class: writes one report file for one run."""
+
+    extension = ""
+    streaming = True  # accepts findings before the results are final
+
+    def __init__(self, path: Path, sot_path: str, code_path: str) -> None:
+        self.path = path
+        self.sot_path = sot_path
+        self.code_path = code_path
+        self.generated = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    def open(self) -> None:
+        """Start the report (called before any finding)."""
+
+    def write_finding(self, section: str, finding: QCFinding) -> None:
+        """Write one finding of ``section`` ("logic" or "structure")."""
+
+    def close(
+        self,
+        logic_result: LogicQCResult,
+        structure_result: StructureQCResult,
+        traceability: list[TraceLink] | None = None,
+    ) -> None:
+        """Finish the report from the final results (and the rule → section mapping, if any)."""
+
+    def discard(self) -> None:
+        """Abandon an unfinished report and remove its file."""
+        self.path.unlink(missing_ok=True)
+
+
+class _TextWriter(ReportWriter):
+    """Streaming writer over one text file, flushed after every write."""
+
+    def open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file: TextIO = open(self.path, "w", encoding="utf-8")
+        self._write(self.head())
+
+    def write_finding(self, section: str, finding: QCFinding) -> None:
+        self._write(self.finding(section, finding))
+
+    def close(
+        self,
+        logic_result: LogicQCResult,
+        structure_result: StructureQCResult,
+        traceability: list[TraceLink] | None = None,
+    ) -> None:
+        self._write(self.tail(logic_result, structure_result, traceability))
+        self._file.close()
+
+    def discard(self) -> None:
+        self._file.close()
+        super().discard()
+
+    def _write(self, text: str) -> None:
+        self._file.write(text)
+        self._file.flush()
+
+    def head(self) -> str:
+        return ""
+
+    def finding(self, section: str, finding: QCFinding) -> str:
+        raise NotImplementedError
+
+    def tail(
+        self,
+        logic_result: LogicQCResult,
+        structure_result: StructureQCResult,
+        traceability: list[TraceLink] | None = None,
+    ) -> str:
+        return ""
+
+
+# ---------------------------------------------------------------------------
+# Registry
+# ---------------------------------------------------------------------------
+
+WRITERS: dict[str, type[ReportWriter]] = {}
+
+
+def register_writer(name: str) -> Callable[[type[ReportWriter]], type[ReportWriter]]:
+    """Class decorator registering a writer under a ``report.formats`` name."""
+
+    def decorator(cls: type[ReportWriter]) -> type[ReportWriter]:
+        WRITERS[name] = cls
+        return cls
+
+    return decorator
+
+
+def selected_formats(settings: dict) -> list[str]:
+    """Formats to write: ``QC_REPORT_FORMATS`` if set, else ``report.formats`` (default docx)."""
+    override = os.environ.get(FORMATS_ENV, "")
+    formats = [f.strip() for f in override.split(",") if f.strip()] or settings.get("formats", ["docx"])
+    unknown = [f for f in formats if f not in WRITERS]
+    if unknown:
+        raise ValueError(
+            f"Unknown report format(s) {', '.join(unknown)} — available: {', '.join(WRITERS)}"
+        )
+    return formats
+
+
+# ---------------------------------------------------------------------------
+# Session
+# ---------------------------------------------------------------------------
+
+class ReportSession:
+    """Feeds one run's findings to every selected writer.
+
+    ``add`` writes a finding the moment it streams in.  ``complete`` is called
+    with a stage's final findings and writes any that did not stream (static
+    analysis, cached or carried-forward findings, the note on a cut-short
+    response); later calls for the same section do nothing.  Safe to call from
+    several pipeline threads.
+    """
+
+    def __init__(self, writers: list[ReportWriter]) -> None:
+        self.writers = writers
+        self._streaming = [w for w in writers if w.streaming]
+        self._written: dict[str, Counter] = {section: Counter() for section in SECTIONS}
+        self._completed: set[str] = set()
+        self._lock = threading.Lock()
+        for writer in self._streaming:
+            writer.open()
+
+    @property
+    def paths(self) -> list[str]:
+        return [str(w.path.resolve()) for w in self.writers]
+
+    def add(self, section: str, finding: QCFinding) -> None:
+        with self._lock:
+            self._written[section][_identity(finding)] += 1
+            for writer in self._streaming:
+                writer.write_finding(section, finding)
+
+    def complete(self, section: str, findings: list[QCFinding]) -> None:
+        with self._lock:
+            if section in self._completed:
+                return
+            self._completed.add(section)
+            written = self._written[section]
+            for finding in findings:
+                key = _identity(finding)
+                if written[key]:
+                    written[key] -= 1
+                    continue
+                for writer in self._streaming:
+                    writer.write_finding(section, finding)
+
+    def close(
+        self,
+        logic_result: LogicQCResult,
+        structure_result: StructureQCResult,
+        traceability: list[TraceLink] | None = None,
+    ) -> list[str]:
+        """Finish every report and return their absolute paths."""
+        with self._lock:
+            for writer in self.writers:
+                writer.close(logic_result, structure_result, traceability)
+        return self.paths
+
+    def discard(self) -> None:
+        """Remove unfinished reports (the run failed or is waiting on batch results)."""
+        with self._lock:
+            for writer in self._streaming:
+                writer.discard()
+
+
+def _identity(finding: QCFinding) -> tuple:
+    return (finding.title, finding.status, finding.detail, finding.rule)
+
+
+def _summary(logic_result: LogicQCResult, structure_result: StructureQCResult) -> dict:
+    rows = {"logic": logic_result, "structure": structure_result}
+    summary = {
+        section: {"pass": r.pass_count, "fail": r.fail_count, "warning": r.warning_count}
+        for section, r in rows.items()
+    }
+    summary["total"] = {
+        key: sum(counts[key] for counts in summary.values()) for key in ("pass", "fail", "warning")
+    }
+    return summary
+
+
+# ---------------------------------------------------------------------------
+# Writers
+# ---------------------------------------------------------------------------
+
+@register_writer("docx")
+class DocxWriter(ReportWriter):
+    """The Word report (``utils.doc_writer``); built in one go at the end."""
+
+    extension = ".docx"
+    streaming = False
+
+    def close(
+        self,
+        logic_result: LogicQCResult,
+        structure_result: StructureQCResult,
+        traceability: list[TraceLink] | None = None,
+    ) -> None:
+        write_report(
+            sot_path=self.sot_path,
+            code_path=self.code_path,
+            logic_result=logic_result,
+            structure_result=structure_result,
+            output_path=str(self.path),
+            traceability=traceability,
+        )
+
+
+@register_writer("json")
+class JsonWriter(_TextWriter):
+    """One JSON object: run metadata, ``findings`` in arrival order, then ``summary``."""
+
+    extension = ".json"
+
+    def head(self) -> str:
+        meta = {
+            "generated": self.generated,
+            "source_of_truth": Path(self.sot_path).name,
+            "code_file": Path(self.code_path).name,
+        }
+        self._first = True
+        return json.dumps(meta, indent=2)[:-2] + ',\n  "findings": ['
+
+    def finding(self, section: str, finding: QCFinding) -> str:
+        sep = "\n    " if self._first else ",\n    "
+        self._first = False
+        return sep + json.dumps({"section": section, **finding.model_dump()}, ensure_ascii=False)
+
+    def tail(
+        self,
+        logic_result: LogicQCResult,
+        structure_result: StructureQCResult,
+        traceability: list[TraceLink] | None = None,
+    ) -> str:
+        summary = json.dumps(_summary(logic_result, structure_result))
+        trace = ""
+        if traceability is not None:
+            links = ",\n    ".join(json.dumps(asdict(link), ensure_ascii=False) for link in traceability)
+            trace = f',\n  "traceability": [\n    {links}\n  ]' if links else ',\n  "traceability": []'
+        return f'\n  ],\n  "summary": {summary}{trace}\n}}\n'
+
+
+@register_writer("markdown")
+class MarkdownWriter(_TextWriter):
+    """A Markdown findings table followed by the executive summary."""
+
+    extension = ".md"
+
+    def head(self) -> str:
+        return (
+            "# Code QC Report\n\n"
+            f"- Generated: {self.generated}\n"
+            f"- Source of Truth: {Path(self.sot_path).name}\n"
+            f"- Code File: {Path(self.code_path).name}\n\n"
+            "## Findings\n\n"
+            "| Check | Status | Priority | Title | Detail | Recommendation |\n"
+            "|---|---|---|---|---|---|\n"
+        )
+
+    def finding(self, section: str, finding: QCFinding) -> str:
+        cells = [
+            SECTIONS[section],
+            f"**{finding.status}**",
+            finding.priority,
+            finding.title,
+            finding.detail,
+            finding.recommendation,
+        ]
+        return "| " + " | ".join(_md_cell(c) for c in cells) + " |\n"
+
+    def tail(
+        self,
+        logic_result: LogicQCResult,
+        structure_result: StructureQCResult,
+        traceability: list[TraceLink] | None = None,
+    ) -> str:
+        summary = _summary(logic_result, structure_result)
+        lines = ["", "## Executive Summary", "", "| Category | PASS | FAIL | WARNING |", "|---|---|---|---|"]
+        for section, counts in summary.items():
+            label = SECTIONS.get(section, "Total")
+            lines.append(f"| {label} | {counts['pass']} | {counts['fail']} | {counts['warning']} |")
+        if traceability:
+            lines += ["", "## Rule Traceability", "", "| Rule | Code Sections | Shared Variables |", "|---|---|---|"]
+            for rule, sections, variables in _trace_rows(traceability):
+                lines.append(f"| {_md_cell(rule)} | {_md_cell(sections)} | {_md_cell(variables)} |")
+        return "\n".join(lines) + "\n"
+
+
+def _trace_rows(traceability: list[TraceLink]) -> list[tuple[str, str, str]]:
+    """(rule, sections, shared variables) texts for the traceability tables."""
+    return [(link.rule, format_sections(link), ", ".join(link.variables)) for link in traceability]
+
+
+def _md_cell(text: str) -> str:
+    return text.replace("|", "\\|").replace("\r\n", "\n").replace("\n", "<br>")
+
+
+@register_writer("html")
+class HtmlWriter(_TextWriter):
+    """A standalone HTML page with status-coloured cells, like the Word report."""
+
+    extension = ".html"
+
+    def head(self) -> str:
+        return (
+            "<!DOCTYPE html>\n<html><head><meta charset=\"utf-8\"><title>Code QC Report</title>\n"
+            "<style>body{font-family:sans-serif}table{border-collapse:collapse}"
+            "td,th{border:1px solid #999;padding:4px;vertical-align:top;white-space:pre-wrap}"
+            "th{background:#2F5496;color:#fff}</style></head><body>\n"
+            "<h1>Code QC Report</h1>\n"
+            f"<p>Generated: {self.generated}<br>"
+            f"Source of Truth: {html.escape(Path(self.sot_path).name)}<br>"
+            f"Code File: {html.escape(Path(self.code_path).name)}</p>\n"
+            "<h2>Findings</h2>\n<table>\n"
+            "<tr><th>Check</th><th>Status</th><th>Priority</th><th>Title</th>"
+            "<th>Detail</th><th>Recommendation</th></tr>\n"
+        )
+
+    def finding(self, section: str, finding: QCFinding) -> str:
+        color = _STATUS_BG.get(finding.status, "FFFFFF")
+        text = "#fff" if finding.status == "FAIL" else "#000"
+        cells = "".join(
+            f"<td>{html.escape(v)}</td>"
+            for v in (finding.priority, finding.title, finding.detail, finding.recommendation)
+        )
+        return (
+            f"<tr><td>{SECTIONS[section]}</td>"
+            f'<td style="background:#{color};color:{text}">{finding.status}</td>{cells}</tr>\n'
+        )
+
+    def tail(
+        self,
+        logic_result: LogicQCResult,
+        structure_result: StructureQCResult,
+        traceability: list[TraceLink] | None = None,
+    ) -> str:
+        rows = "".join(
+            f"<tr><td>{SECTIONS.get(section, 'Total')}</td><td>{c['pass']}</td>"
+            f"<td>{c['fail']}</td><td>{c['warning']}</td></tr>\n"
+            for section, c in _summary(logic_result, structure_result).items()
+        )
+        trace = ""
+        if traceability:
+            trace_rows = "".join(
+                "<tr>" + "".join(f"<td>{html.escape(v)}</td>" for v in row) + "</tr>\n"
+                for row in _trace_rows(traceability)
+            )
+            trace = (
+                "<h2>Rule Traceability</h2>\n<table>\n"
+                "<tr><th>Rule</th><th>Code Sections</th><th>Shared Variables</th></tr>\n"
+                f"{trace_rows}</table>\n"
+            )
+        return (
+            "</table>\n<h2>Executive Summary</h2>\n<table>\n"
+            "<tr><th>Category</th><th>PASS</th><th>FAIL</th><th>WARNING</th></tr>\n"
+            f"{rows}</table>\n{trace}</body></html>\n"
+        )
+
+
+@register_writer("sarif")
+class SarifWriter(_TextWriter):
+    """SARIF 2.1.0 log for code-scanning tools; one result per finding, against the code file."""
+
+    extension = ".sarif"
+
+    _LEVEL = {"FAIL": ("fail", "error"), "WARNING": ("fail", "warning"), "PASS": ("pass", "none")}
+
+    def head(self) -> str:
+        code = Path(self.code_path)
+        self._uri = code.as_uri() if code.is_absolute() else code.as_posix()
+        self._first = True
+        return (
+            '{\n  "$schema": "https://json.schemastore.org/sarif-2.1.0.json",\n'
+            '  "version": "2.1.0",\n'
+            '  "runs": [{\n'
+            '    "tool": {"driver": {"name": "code-qc-agent"}},\n'
+            '    "results": ['
+        )
+
+    def finding(self, section: str, finding: QCFinding) -> str:
+        kind, level = self._LEVEL[finding.status]
+        result = {
+            "ruleId": f"{section}/{finding.rule or finding.title}",
+            "kind": kind,
+            "level": level,
+            "message": {"text": f"{finding.title}: {finding.detail}"},
+            "locations": [
+                {"physicalLocation": {"artifactLocation": {"uri": self._uri}}}
+            ],
+            "properties": {
+                "section": section,
+                "priority": finding.priority,
+                "recommendation": finding.recommendation,
+                "sourceOfTruth": Path(self.sot_path).name,
+            },
+        }
+        sep = "\n      " if self._first else ",\n      "
+        self._first = False
+        return sep + json.dumps(result, ensure_ascii=False)
+
+    def tail(
+        self,
+        logic_result: LogicQCResult,
+        structure_result: StructureQCResult,
+        traceability: list[TraceLink] | None = None,
+    ) -> str:
+        return "\n    ]\n  }]\n}\n"
@@ -0,0 +1,141 @@
+"""Persistent, content-addressed cache for structured model responses.
+
+Entries are keyed on a SHA-256 of everything that determines the answer —
+model, system prompt, messages and the output model's JSON schema — and hold
+the validated Pydantic result as JSON.  Storage is a single SQLite file with
+least-recently-used eviction by total size and by age.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+# Set to 1/true to skip reads and writes for a run (same as cache.enabled: false).
+BYPASS_ENV = "QC_CACHE_BYPASS"
+
+
+def bypass_requested() -> bool:
+    """True when ``QC_CACHE_BYPASS`` (``--no-cache``) asks this run not to reuse stored results."""
+    return os.environ.get(BYPASS_ENV, "").lower() in {"1", "true", "yes"}
+
+
+class ResponseCache:
+    """SQLite-backed response cache with hit/miss counters.
+
+    ``bypassable=False`` ignores ``QC_CACHE_BYPASS`` — for stores that hold
+    results the run depends on (bulk-mode batch results), not just reuse.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        max_size_mb: float = 256,
+        max_age_days: float = 30,
+        enabled: bool = True,
+        bypassable: bool = True,
+    ) -> None:
+        self.path = Path(path)
+        self.max_bytes = int(max_size_mb * 1024 * 1024)
+        self.max_age_seconds = max_age_days * 86400
+        bypassed = bypassable and bypass_requested()
+        self.enabled = enabled and not bypassed
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._conn: sqlite3.Connection | None = None
+        if self.enabled:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                " key TEXT PRIMARY KEY,"
+                " payload TEXT NOT NULL,"
+                " size INTEGER NOT NULL,"
+                " created REAL NOT NULL,"
+                " accessed REAL NOT NULL)"
+            )
+            self._conn.commit()
+            self._evict()
+
+    # ------------------------------------------------------------------
+    # Keys
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def make_key(model: str, system: str, messages: list[dict], schema: dict) -> str:
+        """Return the content hash identifying one structured-output request."""
+        material = json.dumps(
+            {"model": model, "system": system, "messages": messages, "schema": schema},
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+        return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+    # ------------------------------------------------------------------
+    # Lookup / store
+    # ------------------------------------------------------------------
+
+    def get(self, key: str) -> str | None:
+        """Return the cached JSON payload for ``key``, or None on a miss."""
+        if self._conn is None:
+            return None
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT payload, created FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or now - row[1] > self.max_age_seconds:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+            self._conn.commit()
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, payload: str) -> None:
+        """Store a JSON payload and evict old entries if the cache is over budget."""
+        if self._conn is None:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, payload, size, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload.encode("utf-8")), now, now),
+            )
+            self._conn.commit()
+        self._evict()
+
+    def stats(self) -> dict:
+        return {"enabled": self.enabled, "hits": self.hits, "misses": self.misses}
+
+    # ------------------------------------------------------------------
+    # Eviction
+    # ------------------------------------------------------------------
+
+    def _evict(self) -> None:
+        """Drop expired entries, then least-recently-used ones until under max size."""
+        if self._conn is None:
+            return
+        with self._lock:
+            self._conn.execute(
+                "DELETE FROM responses WHERE created < ?", (time.time() - self.max_age_seconds,)
+            )
+            total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total > self.max_bytes:
+                rows = self._conn.execute(
+                    "SELECT key, size FROM responses ORDER BY accessed ASC"
+                ).fetchall()
+                stale: list[tuple[str]] = []
+                for key, size in rows:
+                    if total <= self.max_bytes:
+                        break
+                    stale.append((key,))
+                    total -= size
+                self._conn.executemany("DELETE FROM responses WHERE key = ?", stale)
+            self._conn.commit()
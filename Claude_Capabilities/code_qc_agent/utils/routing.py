@@ -0,0 +1,94 @@
+"""Per-agent model routing — model, thinking and max_tokens per agent, with an optional cascade.
+
+``model:`` in ``config/settings.yaml`` is the default route; ``agents.<AgentClass>``
+overrides any of its keys for one agent.  An agent entry may also name a
+``fast:`` route.  The agent then calls the fast route first and escalates to
+its full route only when the fast answer fails validation or, for QC results,
+when at least ``escalate_warning_ratio`` of its findings are WARNINGs (a sign
+of low confidence).
+
+``thinking`` is ``adaptive``, ``disabled`` or a number of budget tokens, which
+must be below the route's ``max_tokens``.
+"""
+
+from dataclasses import dataclass
+
+from pydantic import BaseModel
+
+
+@dataclass(frozen=True)
+class ModelRoute:
+    """One model configuration a request can be sent with."""
+
+    model: str
+    max_tokens: int
+    thinking: str | int = "adaptive"
+
+    @classmethod
+    def from_settings(cls, settings: dict, base: "ModelRoute | None" = None) -> "ModelRoute":
+        """Build a route from ``name`` / ``max_tokens`` / ``thinking`` keys, defaulting to ``base``.
+
+        Raises ``ValueError`` when a numeric thinking budget is not below ``max_tokens``,
+        which the API would reject on every call.
+        """
+        route = cls(
+            model=settings.get("name", base.model if base else None),
+            max_tokens=settings.get("max_tokens", base.max_tokens if base else 16000),
+            thinking=settings.get("thinking", base.thinking if base else "adaptive"),
+        )
+        numeric = route.thinking not in ("adaptive", "disabled", None, 0)
+        if numeric and int(route.thinking) >= route.max_tokens:
+            raise ValueError(
+                f"Thinking budget {route.thinking} must be below max_tokens {route.max_tokens} "
+                f"(model={route.model})"
+            )
+        return route
+
+    @property
+    def cache_id(self) -> str:
+        """Model identity for response-cache keys; thinking settings are part of it."""
+        if self.thinking == "adaptive":
+            return self.model
+        return f"{self.model}+thinking={self.thinking}"
+
+    def request_params(self) -> dict:
+        """The ``model`` / ``max_tokens`` / ``thinking`` request parameters."""
+        params: dict = {"model": self.model, "max_tokens": self.max_tokens}
+        if self.thinking == "adaptive":
+            params["thinking"] = {"type": "adaptive"}
+        elif self.thinking not in ("disabled", None, 0):
+            params["thinking"] = {"type": "enabled", "budget_tokens": int(self.thinking)}
+        return params
+
+    def __str__(self) -> str:
+        return f"{self.model} (thinking={self.thinking}, max_tokens={self.max_tokens})"
+
+
+@dataclass(frozen=True)
+class AgentRouting:
+    """The route an agent calls with, and the cheaper one it tries first, if any."""
+
+    route: ModelRoute
+    fast: ModelRoute | None = None
+    escalate_warning_ratio: float = 0.5
+
+    def low_confidence(self, result: BaseModel) -> bool:
+        """True when a fast result should be escalated for being WARNING-heavy."""
+        findings = getattr(result, "findings", None)
+        if not findings or self.escalate_warning_ratio <= 0:
+            return False
+        warnings = sum(1 for f in findings if f.status == "WARNING")
+        return warnings / len(findings) >= self.escalate_warning_ratio
+
+
+def routing_for(config: dict, agent_name: str) -> AgentRouting:
+    """Resolve the routing of ``agent_name`` from the ``model:`` and ``agents:`` settings."""
+    default = ModelRoute.from_settings(config.get("model", {}))
+    settings = (config.get("agents") or {}).get(agent_name) or {}
+    route = ModelRoute.from_settings(settings, default)
+    fast = settings.get("fast")
+    return AgentRouting(
+        route=route,
+        fast=ModelRoute.from_settings(fast, route) if fast else None,
+        escalate_warning_ratio=settings.get("escalate_warning_ratio", 0.5),
+    )
@@ -0,0 +1,228 @@
+"""Process-wide request scheduler — rate limits, retries and adaptive concurrency.
+
+Every model call goes through one ``RequestScheduler`` (owned by the Runtime),
+so parallel stages, Logic QC batches and batch-mode pipelines share a single
+view of the account's limits:
+
+* requests-per-minute and input-tokens-per-minute token buckets pace calls
+  before they are sent;
+* 429 / 529 / 5xx / connection errors are retried with jittered exponential
+  backoff, or exactly after the server's ``retry-after`` when it sends one;
+* the number of calls in flight adapts (AIMD): halved on every throttling
+  response, raised by one after a full window of successful calls.
+
+The Anthropic client is built with ``max_retries=0`` so retries happen here,
+where they are paced and counted, rather than inside the SDK.
+
+``clock`` / ``sleep`` (and the scheduler's ``rng``) default to the real
+monotonic clock, ``time.sleep`` and ``random``; tests inject their own.
+"""
+
+import random
+import threading
+import time
+from typing import Callable, TypeVar
+
+import anthropic
+
+R = TypeVar("R")
+
+# Status codes worth retrying; 429 and 529 also mean "slow down"
+_THROTTLE_STATUS = {429, 529}
+_TRANSIENT_STATUS = {500, 502, 503, 504}
+_THROTTLE_ERROR_TYPES = {"rate_limit_error", "overloaded_error"}
+
+
+class TokenBucket:
+    """Blocking token bucket refilled continuously at ``per_minute`` / 60 per second."""
+
+    def __init__(
+        self,
+        per_minute: float,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.capacity = float(per_minute)
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount: float = 1.0) -> float:
+        """Take ``amount`` tokens, sleeping until they are available; return seconds waited.
+
+        Requests larger than the bucket are capped at its capacity so they
+        wait for a full minute's budget instead of forever.
+        """
+        amount = min(amount, self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._tokens = min(
+                    self.capacity, self._tokens + (now - self._updated) * self.capacity / 60
+                )
+                self._updated = now
+                if self._tokens >= amount:
+                    self._tokens -= amount
+                    return waited
+                delay = (amount - self._tokens) * 60 / self.capacity
+            self._sleep(delay)
+            waited += delay
+
+
+class RequestScheduler:
+    """Paces, retries and bounds the concurrency of model calls."""
+
+    def __init__(
+        self,
+        requests_per_minute: float = 0,
+        input_tokens_per_minute: float = 0,
+        max_concurrency: int = 8,
+        min_concurrency: int = 1,
+        max_retries: int = 6,
+        backoff_base_s: float = 1.0,
+        backoff_max_s: float = 60.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+        rng: random.Random | None = None,
+    ) -> None:
+        self.requests = (
+            TokenBucket(requests_per_minute, clock, sleep) if requests_per_minute else None
+        )
+        self.input_tokens = (
+            TokenBucket(input_tokens_per_minute, clock, sleep) if input_tokens_per_minute else None
+        )
+        self._sleep = sleep
+        self._rng = rng if rng is not None else random.Random()
+        self.max_concurrency = max(1, max_concurrency)
+        self.min_concurrency = max(1, min(min_concurrency, self.max_concurrency))
+        self.max_retries = max_retries
+        self.backoff_base_s = backoff_base_s
+        self.backoff_max_s = backoff_max_s
+
+        self.limit = self.max_concurrency  # current concurrency limit
+        self.in_flight = 0
+        self.throttled = 0                 # throttling responses seen
+        self._successes = 0                # successes since the last limit change
+        self._cond = threading.Condition()
+
+    @classmethod
+    def from_settings(cls, settings: dict) -> "RequestScheduler":
+        return cls(
+            requests_per_minute=settings.get("requests_per_minute", 0),
+            input_tokens_per_minute=settings.get("input_tokens_per_minute", 0),
+            max_concurrency=settings.get("max_concurrency", 8),
+            min_concurrency=settings.get("min_concurrency", 1),
+            max_retries=settings.get("max_retries", 6),
+            backoff_base_s=settings.get("backoff_base_s", 1.0),
+            backoff_max_s=settings.get("backoff_max_s", 60.0),
+        )
+
+    # ------------------------------------------------------------------
+    # Calls
+    # ------------------------------------------------------------------
+
+    def call(
+        self,
+        fn: Callable[[], R],
+        input_tokens: int = 0,
+        on_retry: Callable[[int, float, Exception], None] | None = None,
+    ) -> R:
+        """Run ``fn`` within the limits, retrying retryable API errors.
+
+        ``input_tokens`` is charged to the token bucket before every attempt.
+        ``on_retry(attempt, delay_s, error)`` is called before each retry.
+        """
+        attempt = 0
+        while True:
+            self._acquire(input_tokens)
+            try:
+                result = fn()
+            except anthropic.APIError as exc:
+                self._release()
+                kind = _classify(exc)
+                if kind == "throttle":
+                    self._on_throttle()  # even on the last attempt: other callers must slow down
+                if kind is None or attempt >= self.max_retries:
+                    raise
+                delay = _retry_after(exc)
+                if delay is None:
+                    delay = self._backoff(attempt)
+                attempt += 1
+                if on_retry is not None:
+                    on_retry(attempt, delay, exc)
+                self._sleep(delay)
+            else:
+                self._release()
+                self._on_success()
+                return result
+
+    def _acquire(self, input_tokens: int) -> None:
+        # Pace first, so a call waiting on a bucket does not hold a concurrency slot
+        if self.requests is not None:
+            self.requests.acquire(1)
+        if self.input_tokens is not None and input_tokens:
+            self.input_tokens.acquire(input_tokens)
+        with self._cond:
+            while self.in_flight >= self.limit:
+                self._cond.wait()
+            self.in_flight += 1
+
+    def _release(self) -> None:
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+    # ------------------------------------------------------------------
+    # Adaptive concurrency (additive increase, multiplicative decrease)
+    # ------------------------------------------------------------------
+
+    def _on_throttle(self) -> None:
+        with self._cond:
+            self.throttled += 1
+            self.limit = max(self.min_concurrency, self.limit // 2)
+            self._successes = 0
+
+    def _on_success(self) -> None:
+        with self._cond:
+            self._successes += 1
+            if self._successes >= self.limit and self.limit < self.max_concurrency:
+                self.limit += 1
+                self._successes = 0
+                self._cond.notify_all()
+
+    def _backoff(self, attempt: int) -> float:
+        """Full-jitter exponential backoff."""
+        return self._rng.uniform(0, min(self.backoff_max_s, self.backoff_base_s * 2**attempt))
+
+
+def _classify(exc: anthropic.APIError) -> str | None:
+    """Return "throttle", "transient" or None (not retryable) for an API error."""
+    if isinstance(exc, anthropic.APIConnectionError):
+        return "transient"
+    error = exc.body.get("error") if isinstance(exc.body, dict) else None
+    error_type = error.get("type") if isinstance(error, dict) else None
+    status = getattr(exc, "status_code", None)
+    if status in _THROTTLE_STATUS or error_type in _THROTTLE_ERROR_TYPES:
+        return "throttle"
+    if status in _TRANSIENT_STATUS or error_type == "api_error":
+        return "transient"
+    return None
+
+
+def _retry_after(exc: anthropic.APIError) -> float | None:
+    """Seconds the server asked us to wait, if it said."""
+    response = getattr(exc, "response", None)
+    if response is None:
+        return None
+    headers = response.headers
+    for name, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = headers.get(name)
+        if value:
+            try:
+                return max(0.0, float(value) * scale)
+            except ValueError:
+                return None  # HTTP-date form; fall back to backoff
+    return None
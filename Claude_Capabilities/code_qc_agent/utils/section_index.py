@@ -0,0 +1,176 @@
+"""Local rule → code-section retrieval — which parts of a program each spec rule is about.
+
+``SectionIndex`` scores every ``ParsedCode.sections`` entry (name, description
+and snippet) against a rule's title, description, conditions and variables
+with BM25, computed as NumPy matrix products.  Sections that mention a
+variable both the rule and the program use (``Rule.variables`` or a
+``VarDef.name`` the rule refers to, matched exactly against
+``ParsedCode.variables``) get ``variable_boost`` added per such variable.
+
+Logic QC sends each rule batch only the union of its rules' top-k sections
+(every section when one of its rules matches none, so no rule is checked
+without code), and the same mapping is written to the report as a
+traceability table — both without a model call.
+"""
+
+import re
+from dataclasses import dataclass, field
+
+import numpy as np
+
+from utils.models import ParsedCode, ParsedDoc, Rule, Section, VarDef
+
+DEFAULT_TOP_K = 5
+
+_TOKEN_RE = re.compile(r"[A-Za-z0-9]+(?:[_.][A-Za-z0-9]+)*")
+
+# Words that carry no retrieval signal in specs or code descriptions
+_STOPWORDS = frozenset(
+    "a an and are as at be by each for from if in into is it its must of on or shall "
+    "should than that the then this to when where which with".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Lower-cased identifiers and words; ``adsl_age`` / ``df.age`` also yield their parts."""
+    tokens: list[str] = []
+    for match in _TOKEN_RE.finditer(text):
+        word = match.group(0).lower()
+        if word in _STOPWORDS:
+            continue
+        tokens.append(word)
+        if "_" in word or "." in word:
+            tokens.extend(p for p in re.split(r"[_.]", word) if p and p not in _STOPWORDS)
+    return tokens
+
+
+@dataclass
+class SectionMatch:
+    name: str
+    line_range: str
+    score: float
+
+
+@dataclass
+class TraceLink:
+    """The code sections one rule most likely maps to."""
+
+    rule: str
+    sections: list[SectionMatch] = field(default_factory=list)
+    variables: list[str] = field(default_factory=list)  # rule variables the program also uses
+    # No section matched, so Logic QC checked the rule against every section
+    fallback: bool = False
+
+
+class SectionIndex:
+    """BM25 index over the sections of one ``ParsedCode``."""
+
+    def __init__(
+        self, parsed_code: ParsedCode, k1: float = 1.5, b: float = 0.75, variable_boost: float = 3.0
+    ) -> None:
+        self.sections: list[Section] = parsed_code.sections
+        self.variable_boost = variable_boost
+        self._code_variables = {v.lower(): v for v in parsed_code.variables}
+
+        docs = [tokenize(f"{s.name} {s.description} {s.code_snippet}") for s in self.sections]
+        self._vocab: dict[str, int] = {}
+        rows: list[int] = []
+        cols: list[int] = []
+        for i, doc in enumerate(docs):
+            for token in doc:
+                rows.append(i)
+                cols.append(self._vocab.setdefault(token, len(self._vocab)))
+
+        tf = np.zeros((len(docs), len(self._vocab)), dtype=np.float32)
+        np.add.at(tf, (np.asarray(rows, dtype=np.intp), np.asarray(cols, dtype=np.intp)), 1.0)
+        lengths = tf.sum(axis=1)
+        avg_length = float(lengths.mean()) if len(docs) and lengths.any() else 1.0
+        df = np.count_nonzero(tf, axis=0)
+        idf = np.log1p((len(docs) - df + 0.5) / (df + 0.5)).astype(np.float32)
+        norm = k1 * (1 - b + b * lengths / avg_length)
+        # BM25 weight of every (section, term); a query's score is a sum of columns
+        self._weights = tf * (k1 + 1) / (tf + norm[:, None]) * idf
+
+    def scores(self, rules: list[Rule], var_defs: list[VarDef] | None = None) -> np.ndarray:
+        """Return a (rules × sections) score matrix."""
+        queries = np.zeros((len(rules), len(self._vocab)), dtype=np.float32)
+        boosts = np.zeros_like(queries)
+        for i, rule in enumerate(rules):
+            for token in set(tokenize(_rule_text(rule))):
+                j = self._vocab.get(token)
+                if j is not None:
+                    queries[i, j] = 1.0
+            for variable in self.shared_variables(rule, var_defs):
+                j = self._vocab.get(variable.lower())
+                if j is not None:
+                    boosts[i, j] = self.variable_boost
+        result = queries @ self._weights.T
+        if boosts.any():
+            result += boosts @ (self._weights > 0).T.astype(np.float32)
+        return result
+
+    def shared_variables(self, rule: Rule, var_defs: list[VarDef] | None = None) -> list[str]:
+        """Variables of ``rule`` (and of the spec variables it mentions) the program also uses."""
+        names = list(rule.variables)
+        if var_defs:
+            words = set(tokenize(_rule_text(rule)))
+            names += [v.name for v in var_defs if v.name.lower() in words]
+        shared = (self._code_variables.get(n.lower()) for n in names)
+        return list(dict.fromkeys(v for v in shared if v is not None))
+
+    def top_k(
+        self, rules: list[Rule], k: int, var_defs: list[VarDef] | None = None
+    ) -> list[TraceLink]:
+        """Each rule's ``k`` best-scoring sections (score > 0), best first."""
+        if not rules:
+            return []
+        if not self.sections:
+            return [
+                TraceLink(rule=r.title, variables=self.shared_variables(r, var_defs)) for r in rules
+            ]
+        matrix = self.scores(rules, var_defs)
+        order = np.argsort(-matrix, axis=1, kind="stable")[:, :k]
+        links: list[TraceLink] = []
+        for i, rule in enumerate(rules):
+            matches = [
+                SectionMatch(
+                    name=self.sections[j].name,
+                    line_range=self.sections[j].line_range,
+                    score=round(float(matrix[i, j]), 3),
+                )
+                for j in order[i]
+                if matrix[i, j] > 0
+            ]
+            links.append(
+                TraceLink(
+                    rule=rule.title,
+                    sections=matches,
+                    variables=self.shared_variables(rule, var_defs),
+                )
+            )
+        return links
+
+
+def format_sections(link: TraceLink) -> str:
+    """A link's sections as report text, one per line."""
+    lines = [f"{m.name} (lines {m.line_range})" if m.line_range else m.name for m in link.sections]
+    if lines:
+        return "\n".join(lines)
+    return "No matching section (checked against all sections)" if link.fallback else "No matching section"
+
+
+def _rule_text(rule: Rule) -> str:
+    return " ".join([rule.title, rule.description, *rule.conditions, *rule.variables])
+
+
+def rule_traceability(
+    parsed_doc: ParsedDoc, parsed_code: ParsedCode, settings: dict | None = None
+) -> list[TraceLink]:
+    """The rule → section mapping for every rule, per the ``logic_qc:`` settings."""
+    settings = settings or {}
+    index = SectionIndex(parsed_code, variable_boost=settings.get("variable_boost", 3.0))
+    top_k = settings.get("section_top_k", DEFAULT_TOP_K) or DEFAULT_TOP_K
+    links = index.top_k(parsed_doc.rules, top_k, parsed_doc.variables)
+    for link in links:
+        link.fallback = not link.sections and bool(parsed_code.sections)
+    return links
@@ -0,0 +1,141 @@
+"""Split source-of-truth text into parse-sized chunks and merge the partial results.
+
+``file_reader`` marks the natural boundaries of a specification with
+``=== ... ===`` lines (``=== Sheet: X ===``, ``=== Page N ===``,
+``=== Heading N: X ===``).  Chunks are packed from whole segments between
+those markers; a segment that is larger than a chunk on its own is split on
+line boundaries and its marker repeated so every piece keeps its location.
+"""
+
+import re
+from collections import Counter
+
+from utils.models import ParsedDoc, Rule, VarDef
+
+_MARKER_RE = re.compile(r"^=== .+ ===$")
+
+
+def _segments(text: str) -> list[list[str]]:
+    segments: list[list[str]] = []
+    for line in text.splitlines():
+        if _MARKER_RE.match(line) or not segments:
+            segments.append([line])
+        else:
+            segments[-1].append(line)
+    return segments
+
+
+def _split_oversized(segment: list[str], max_chars: int) -> list[str]:
+    marker = segment[0] if _MARKER_RE.match(segment[0]) else ""
+    body = segment[1:] if marker else segment
+    header = [f"{marker[:-4]} (continued) ==="] if marker else []
+
+    pieces: list[str] = []
+    current: list[str] = [marker] if marker else []
+    size = len(marker)
+    for line in body:
+        if size + len(line) + 1 > max_chars and len(current) > len(header):
+            pieces.append("\n".join(current))
+            current = list(header)
+            size = sum(len(h) for h in header)
+        current.append(line)
+        size += len(line) + 1
+    if current:
+        pieces.append("\n".join(current))
+    return pieces
+
+
+def split_sot_text(text: str, max_chars: int) -> list[str]:
+    """Split ``text`` into chunks of at most ~``max_chars`` on section markers."""
+    if len(text) <= max_chars:
+        return [text]
+
+    chunks: list[str] = []
+    current: list[str] = []
+    size = 0
+    for segment in _segments(text):
+        seg_text = "\n".join(segment)
+        if len(seg_text) > max_chars:
+            if current:
+                chunks.append("\n".join(current))
+                current, size = [], 0
+            chunks.extend(_split_oversized(segment, max_chars))
+            continue
+        if size + len(seg_text) + 1 > max_chars and current:
+            chunks.append("\n".join(current))
+            current, size = [], 0
+        current.append(seg_text)
+        size += len(seg_text) + 1
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+# ---------------------------------------------------------------------------
+# Merge
+# ---------------------------------------------------------------------------
+
+def _key(name: str) -> str:
+    return " ".join(name.lower().split())
+
+
+def _union(a: list[str], b: list[str]) -> list[str]:
+    out = list(a)
+    seen = {_key(x) for x in a}
+    for item in b:
+        if _key(item) not in seen:
+            seen.add(_key(item))
+            out.append(item)
+    return out
+
+
+def _join_refs(a: str, b: str) -> str:
+    refs = [r.strip() for ref in (a, b) for r in ref.split(";") if r.strip()]
+    return "; ".join(dict.fromkeys(refs))
+
+
+def merge_parsed_docs(parts: list[ParsedDoc]) -> ParsedDoc:
+    """Merge per-chunk ``ParsedDoc`` results into one.
+
+    Rules are de-duplicated on title and variables on name (case- and
+    whitespace-insensitive); duplicates are combined, keeping the longer
+    description and every distinct ``source_ref``.
+    """
+    domains = Counter(p.domain.strip() for p in parts if p.domain.strip())
+    domain = domains.most_common(1)[0][0] if domains else ""
+
+    rules: dict[str, Rule] = {}
+    for part in parts:
+        for rule in part.rules:
+            key = _key(rule.title)
+            existing = rules.get(key)
+            if existing is None:
+                rules[key] = rule.model_copy()
+                continue
+            rules[key] = existing.model_copy(
+                update={
+                    "description": max(existing.description, rule.description, key=len),
+                    "variables": _union(existing.variables, rule.variables),
+                    "conditions": _union(existing.conditions, rule.conditions),
+                    "source_ref": _join_refs(existing.source_ref, rule.source_ref),
+                }
+            )
+
+    variables: dict[str, VarDef] = {}
+    for part in parts:
+        for var in part.variables:
+            key = _key(var.name)
+            existing = variables.get(key)
+            if existing is None:
+                variables[key] = var.model_copy()
+                continue
+            variables[key] = existing.model_copy(
+                update={
+                    "definition": max(existing.definition, var.definition, key=len),
+                    "expected_transform": max(
+                        existing.expected_transform, var.expected_transform, key=len
+                    ),
+                }
+            )
+
+    return ParsedDoc(domain=domain, rules=list(rules.values()), variables=list(variables.values()))
@@ -0,0 +1,439 @@
+"""Deterministic static analysis of Python, R and SAS programs.
+
+Computes the mechanical structure-QC dimensions exactly and instantly —
+hardcoded literals, duplicated blocks, function/macro/step length, naming
+consistency and comment density — and turns them into ``QCFinding``s.
+Python is read with ``ast``/``tokenize``; R and SAS with a lightweight
+regex tokenizer.  ``StructureQCAgent`` passes ``facts_text`` to the model so
+it only has to judge the remaining, judgment-heavy dimensions.
+"""
+
+import ast
+import hashlib
+import io
+import re
+import tokenize
+from collections import Counter
+from dataclasses import dataclass, field
+
+from utils.models import QCFinding
+
+# Literals too common to be "magic"
+_TRIVIAL_NUMBERS = {"0", "1", "-1", "2", "0.0", "1.0", "100"}
+
+_STYLES = {
+    "snake_case": re.compile(r"^[a-z][a-z0-9]*(_[a-z0-9]+)+$"),
+    "camelCase": re.compile(r"^[a-z]+[a-z0-9]*[A-Z][A-Za-z0-9]*$"),
+    "PascalCase": re.compile(r"^[A-Z][a-z0-9]+[A-Z][A-Za-z0-9]*$"),
+    "UPPER_CASE": re.compile(r"^[A-Z][A-Z0-9]*(_[A-Z0-9]+)+$"),
+    "dot.case": re.compile(r"^[a-z][a-z0-9]*(\.[a-z0-9]+)+$"),
+}
+
+# Lines that are pure block delimiters and would make every block look duplicated
+_TRIVIAL_LINES = {"", "}", "{", ")", "run;", "quit;", "end;", "%end;", "%mend;", "else", "else {", "pass"}
+
+
+@dataclass
+class CodeUnit:
+    name: str
+    kind: str  # "function" | "class" | "macro" | "data step" | "proc step"
+    start: int
+    end: int
+
+    @property
+    def length(self) -> int:
+        return self.end - self.start + 1
+
+
+@dataclass
+class StaticAnalysis:
+    language: str
+    total_lines: int = 0
+    code_lines: int = 0
+    comment_lines: int = 0
+    literals: list[tuple[str, int]] = field(default_factory=list)  # (literal, line)
+    names: list[str] = field(default_factory=list)
+    units: list[CodeUnit] = field(default_factory=list)
+    duplicates: list[tuple[int, int, int]] = field(default_factory=list)  # (first line, repeat line, length)
+    findings: list[QCFinding] = field(default_factory=list)
+
+    def facts_text(self) -> str:
+        """Summarise the measured facts for the Structure QC prompt."""
+        magic = Counter(lit for lit, _ in self.literals)
+        styles = _style_counts(self.names)
+        lines = [
+            f"Lines: {self.total_lines} total, {self.code_lines} code, {self.comment_lines} comment",
+            f"Units ({len(self.units)}): "
+            + (", ".join(f"{u.kind} {u.name} [{u.start}-{u.end}, {u.length} lines]" for u in self.units[:40]) or "none"),
+            f"Hardcoded literals: {len(self.literals)} occurrences, {len(magic)} distinct; "
+            f"most common: {', '.join(f'{lit} ×{n}' for lit, n in magic.most_common(10)) or 'none'}",
+            f"Duplicated blocks: {len(self.duplicates)}"
+            + "".join(f"; lines {a} and {b} ({n} lines)" for a, b, n in self.duplicates[:10]),
+            "Naming styles: " + (", ".join(f"{s} {n}" for s, n in styles.most_common()) or "n/a"),
+        ]
+        return "\n".join(lines)
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+
+def analyze(raw_code: str, language: str, max_unit_lines: int = 60, duplicate_window: int = 4) -> StaticAnalysis:
+    """Analyse ``raw_code`` and return facts plus mechanical QC findings."""
+    language = language.lower()
+    result = StaticAnalysis(language=language)
+    lines = raw_code.splitlines()
+    result.total_lines = len(lines)
+
+    if language == "python":
+        _scan_python(raw_code, result)
+    elif language == "sas":
+        _scan_sas(raw_code, result)
+    else:
+        _scan_r(raw_code, result)
+
+    comment_free = strip_comments(raw_code, language)
+    result.code_lines = sum(1 for line in comment_free.splitlines() if line.strip())
+    result.duplicates = _find_duplicates(comment_free.splitlines(), duplicate_window)
+    result.findings = [
+        _naming_finding(result),
+        _hardcoded_finding(result),
+        _duplication_finding(result),
+        _unit_length_finding(result, max_unit_lines),
+        _comment_density_finding(result),
+    ]
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Language scanners
+# ---------------------------------------------------------------------------
+
+def _scan_python(raw_code: str, result: StaticAnalysis) -> None:
+    try:
+        tree = ast.parse(raw_code)
+    except SyntaxError:
+        _scan_r(raw_code, result)  # fall back to the generic tokenizer
+        return
+
+    docstrings: set[int] = set()
+    # Literal fragments of f-strings are text, not magic values
+    skipped: set[int] = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.JoinedStr):
+            skipped.update(id(v) for v in node.values if isinstance(v, ast.Constant))
+        if isinstance(node, (ast.Module, ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            body = node.body
+            if body and isinstance(body[0], ast.Expr) and isinstance(getattr(body[0], "value", None), ast.Constant):
+                docstrings.add(id(body[0].value))
+
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            result.units.append(CodeUnit(node.name, "function", node.lineno, node.end_lineno or node.lineno))
+            result.names.append(node.name)
+        elif isinstance(node, ast.ClassDef):
+            result.units.append(CodeUnit(node.name, "class", node.lineno, node.end_lineno or node.lineno))
+        elif isinstance(node, ast.Name) and isinstance(node.ctx, ast.Store):
+            result.names.append(node.id)
+        elif isinstance(node, ast.arg):
+            result.names.append(node.arg)
+        elif isinstance(node, ast.Constant) and id(node) not in docstrings and id(node) not in skipped:
+            value = node.value
+            if isinstance(value, bool) or value is None:
+                continue
+            if isinstance(value, (int, float)):
+                text = repr(value)
+                if text not in _TRIVIAL_NUMBERS:
+                    result.literals.append((text, node.lineno))
+            elif isinstance(value, str) and len(value.strip()) > 1:
+                result.literals.append((repr(value), node.lineno))
+
+    try:
+        tokens = tokenize.generate_tokens(io.StringIO(raw_code).readline)
+        result.comment_lines = len({t.start[0] for t in tokens if t.type == tokenize.COMMENT})
+    except (tokenize.TokenError, SyntaxError):
+        result.comment_lines = sum(1 for line in raw_code.splitlines() if line.strip().startswith("#"))
+    result.comment_lines += sum(
+        (node.end_lineno or node.lineno) - node.lineno + 1
+        for node in ast.walk(tree)
+        if isinstance(node, ast.Constant) and id(node) in docstrings
+    )
+
+
+# A quoted string literal, with a SAS date / time suffix ("01JAN2020"d) if present
+STRING_RE = re.compile(r"""("(?:[^"\\\n]|\\.)*"|'(?:[^'\\\n]|\\.)*')([dD][tT]?|[tT])?""")
+_NUMBER_RE = re.compile(r"(?<![\w.])-?\d+(?:\.\d+)?(?:[eE][-+]?\d+)?(?![\w.])")
+
+
+def _collect_literals(code: str, result: StaticAnalysis) -> None:
+    for lineno, line in enumerate(code.splitlines(), 1):
+        for m in STRING_RE.finditer(line):
+            if len(m.group(1)) > 3:
+                result.literals.append((m.group(0), lineno))
+        unquoted = STRING_RE.sub(" ", line)
+        for m in _NUMBER_RE.finditer(unquoted):
+            if m.group(0) not in _TRIVIAL_NUMBERS:
+                result.literals.append((m.group(0), lineno))
+
+
+def _scan_r(raw_code: str, result: StaticAnalysis) -> None:
+    lines = raw_code.splitlines()
+    result.comment_lines = sum(1 for line in lines if line.strip().startswith("#"))
+    code = strip_comments(raw_code, "r")
+    _collect_literals(code, result)
+
+    code_lines = code.splitlines()
+    assign_re = re.compile(r"^\s*([A-Za-z.][\w.]*)\s*(?:<<?-|=(?!=))")
+    func_re = re.compile(r"^\s*([A-Za-z.][\w.]*)\s*(?:<-|=)\s*function\s*\(")
+    for i, line in enumerate(code_lines):
+        m = assign_re.match(line)
+        if m:
+            result.names.append(m.group(1))
+        m = func_re.match(line)
+        if m:
+            result.units.append(CodeUnit(m.group(1), "function", i + 1, _brace_end(code_lines, i) + 1))
+
+
+def _brace_end(lines: list[str], start: int) -> int:
+    """Return the 0-based index of the line closing the first brace opened at/after ``start``."""
+    depth = 0
+    opened = False
+    for i in range(start, len(lines)):
+        for ch in STRING_RE.sub("", lines[i]):
+            if ch == "{":
+                depth += 1
+                opened = True
+            elif ch == "}":
+                depth -= 1
+                if opened and depth == 0:
+                    return i
+        if not opened and i > start and lines[i].strip():
+            return i  # single-expression function body
+    return len(lines) - 1
+
+
+_SAS_STEP_RE = re.compile(r"^\s*(data|proc)\s+([\w.&]+)?", re.IGNORECASE)
+_SAS_STEP_END_RE = re.compile(r"^\s*(run|quit)\s*;", re.IGNORECASE)
+_SAS_MACRO_RE = re.compile(r"^\s*%macro\s+(\w+)", re.IGNORECASE)
+_SAS_MEND_RE = re.compile(r"^\s*%mend\b", re.IGNORECASE)
+_SAS_ASSIGN_RE = re.compile(r"^\s*([A-Za-z_]\w*)\s*=(?!=)")
+_SAS_LET_RE = re.compile(r"^\s*%let\s+(\w+)\s*=", re.IGNORECASE)
+
+
+def _scan_sas(raw_code: str, result: StaticAnalysis) -> None:
+    code = strip_comments(raw_code, "sas")
+    raw_lines = raw_code.splitlines()
+    code_lines = code.splitlines()
+    result.comment_lines = sum(
+        1 for raw, stripped in zip(raw_lines, code_lines) if raw.strip() and not stripped.strip()
+    )
+    _collect_literals(code, result)
+
+    step: CodeUnit | None = None
+    macros: list[CodeUnit] = []
+    for i, line in enumerate(code_lines, 1):
+        m = _SAS_MACRO_RE.match(line)
+        if m:
+            macros.append(CodeUnit(m.group(1), "macro", i, i))
+            result.names.append(m.group(1))
+            continue
+        if _SAS_MEND_RE.match(line) and macros:
+            unit = macros.pop()
+            unit.end = i
+            result.units.append(unit)
+            continue
+
+        m = _SAS_STEP_RE.match(line)
+        if m and step is None:
+            kind = m.group(1).lower()
+            name = m.group(2) or kind
+            step = CodeUnit(name, f"{kind} step", i, i)
+            if kind == "data" and m.group(2) and m.group(2).lower() != "_null_":
+                result.names.append(m.group(2).split(".")[-1])
+        if step is not None and _SAS_STEP_END_RE.match(line):
+            step.end = i
+            result.units.append(step)
+            step = None
+
+        for regex in (_SAS_ASSIGN_RE, _SAS_LET_RE):
+            m = regex.match(line)
+            if m:
+                result.names.append(m.group(1))
+
+    result.units.sort(key=lambda u: u.start)
+
+
+def strip_comments(raw_code: str, language: str) -> str:
+    """Blank out comments while keeping line numbering intact.
+
+    ``language`` ``"sas"`` strips block and statement comments; anything else
+    strips ``#`` comments (Python, R).
+    """
+    if language == "sas":
+        def blank(m: re.Match) -> str:
+            return re.sub(r"[^\n]", " ", m.group(0))
+
+        code = re.sub(r"/\*.*?\*/", blank, raw_code, flags=re.DOTALL)
+        # Statement comments: "* text;" / "%* text;" at the start of a statement
+        return re.sub(r"(?m)^\s*%?\*[^;]*;", blank, code)
+    return "\n".join(_strip_hash_comment(line) for line in raw_code.splitlines())
+
+
+def _strip_hash_comment(line: str) -> str:
+    """Cut a line at the first ``#`` that is not inside a string literal."""
+    quote = ""
+    escaped = False
+    for i, ch in enumerate(line):
+        if quote:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == quote:
+                quote = ""
+        elif ch in "\"'":
+            quote = ch
+        elif ch == "#":
+            return line[:i]
+    return line
+
+
+def _find_duplicates(lines: list[str], window: int) -> list[tuple[int, int, int]]:
+    """Find repeated runs of ``window``+ normalized, non-trivial lines."""
+    normalized = [(i + 1, " ".join(line.lower().split())) for i, line in enumerate(lines)]
+    meaningful = [(n, text) for n, text in normalized if text not in _TRIVIAL_LINES]
+    if len(meaningful) < window * 2:
+        return []
+
+    seen: dict[str, int] = {}
+    matches: list[tuple[int, int]] = []  # (index of first occurrence, index of repeat)
+    for idx in range(len(meaningful) - window + 1):
+        digest = hashlib.sha1(
+            "\n".join(text for _, text in meaningful[idx:idx + window]).encode("utf-8")
+        ).hexdigest()
+        first = seen.setdefault(digest, idx)
+        if first != idx and idx - first >= window:
+            matches.append((first, idx))
+
+    # Merge consecutive window matches into blocks
+    blocks: list[tuple[int, int, int]] = []
+    for first, idx in matches:
+        if blocks:
+            a, b, n = blocks[-1]
+            if idx - b == n - window + 1 and first - a == idx - b:
+                blocks[-1] = (a, b, n + 1)
+                continue
+        blocks.append((first, idx, window))
+    return [(meaningful[a][0], meaningful[b][0], n) for a, b, n in blocks]
+
+
+# ---------------------------------------------------------------------------
+# Findings
+# ---------------------------------------------------------------------------
+
+_PRIORITY = {"PASS": "Low", "WARNING": "Medium", "FAIL": "High"}
+
+
+def _finding(title: str, status: str, detail: str, recommendation: str) -> QCFinding:
+    return QCFinding(
+        title=title,
+        status=status,
+        detail=detail,
+        recommendation=recommendation if status != "PASS" else "None required",
+        priority=_PRIORITY[status],
+    )
+
+
+def _style_counts(names: list[str]) -> Counter:
+    counts: Counter = Counter()
+    for name in set(names):
+        for style, regex in _STYLES.items():
+            if regex.match(name):
+                counts[style] += 1
+                break
+    return counts
+
+
+def _naming_finding(result: StaticAnalysis) -> QCFinding:
+    counts = _style_counts(result.names)
+    total = sum(counts.values())
+    if total < 3:
+        return _finding(
+            "Naming conventions (static analysis)", "PASS",
+            "Too few multi-word identifiers to assess naming consistency.", "",
+        )
+    style, dominant = counts.most_common(1)[0]
+    share = dominant / total
+    breakdown = ", ".join(f"{s}: {n}" for s, n in counts.most_common())
+    status = "PASS" if share >= 0.8 else "WARNING"
+    return _finding(
+        "Naming conventions (static analysis)",
+        status,
+        f"{share:.0%} of {total} multi-word identifiers use {style} ({breakdown}).",
+        f"Rename the remaining identifiers to {style} so naming is consistent.",
+    )
+
+
+def _hardcoded_finding(result: StaticAnalysis) -> QCFinding:
+    distinct = Counter(lit for lit, _ in result.literals)
+    first_line = {}
+    for lit, line in result.literals:
+        first_line.setdefault(lit, line)
+    examples = ", ".join(f"{lit} (line {first_line[lit]})" for lit, _ in distinct.most_common(8))
+    n = len(distinct)
+    status = "PASS" if n <= 3 else "WARNING" if n <= 10 else "FAIL"
+    return _finding(
+        "Hardcoded values (static analysis)",
+        status,
+        f"{len(result.literals)} literal occurrence(s), {n} distinct"
+        + (f"; most frequent: {examples}." if examples else "."),
+        "Move repeated and domain-specific literals into named constants, macro "
+        "variables or a parameter block at the top of the program.",
+    )
+
+
+def _duplication_finding(result: StaticAnalysis) -> QCFinding:
+    n = len(result.duplicates)
+    status = "PASS" if n == 0 else "WARNING" if n <= 2 else "FAIL"
+    detail = (
+        "No repeated blocks of code found."
+        if n == 0
+        else f"{n} repeated block(s): "
+        + "; ".join(f"lines {a} and {b} ({length} lines)" for a, b, length in result.duplicates[:10])
+        + "."
+    )
+    return _finding(
+        "Duplication (static analysis)",
+        status,
+        detail,
+        "Extract the repeated blocks into a function or macro and call it with parameters.",
+    )
+
+
+def _unit_length_finding(result: StaticAnalysis, max_unit_lines: int) -> QCFinding:
+    long_units = [u for u in result.units if u.kind != "class" and u.length > max_unit_lines]
+    very_long = [u for u in long_units if u.length > max_unit_lines * 2.5]
+    status = "PASS" if not long_units else "FAIL" if very_long else "WARNING"
+    detail = (
+        f"All {len(result.units)} function/macro/step unit(s) are within {max_unit_lines} lines."
+        if not long_units
+        else f"{len(long_units)} unit(s) exceed {max_unit_lines} lines: "
+        + ", ".join(f"{u.kind} {u.name} ({u.length} lines, {u.start}-{u.end})" for u in long_units[:10])
+        + "."
+    )
+    return _finding(
+        "Function/macro length (static analysis)",
+        status,
+        detail,
+        "Split long units into smaller, single-purpose functions, macros or steps.",
+    )
+
+
+def _comment_density_finding(result: StaticAnalysis) -> QCFinding:
+    ratio = result.comment_lines / max(result.code_lines, 1)
+    status = "PASS" if ratio >= 0.10 else "WARNING" if ratio >= 0.05 else "FAIL"
+    return _finding(
+        "Comment density (static analysis)",
+        status,
+        f"{result.comment_lines} comment line(s) for {result.code_lines} code line(s) ({ratio:.0%}).",
+        "Add header and section comments explaining the purpose of each step.",
+    )